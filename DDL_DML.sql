@@ -11,7 +11,7 @@ USE cs;                                  -- Selects 'cs' database to work with
 --  SECTION 2: DROP OLD TABLES (DDL)
 -- ===============================================================
 -- Removes existing tables to avoid duplicate creation when re-running script.
-DROP TABLE IF EXISTS audit_logs, applications, jobs, companies, recruiters, students, admins, users;
+DROP TABLE IF EXISTS archived_audit_logs, archived_applications, archived_jobs, seasons, job_deletions, notifications, interview_assignments, interview_slots, rollup_state, funnel_daily, audit_logs, applications, jobs, recruiters, companies, student_details, students, resume_files, admins, users;
 
 
 -- ===============================================================
@@ -27,6 +27,15 @@ CREATE TABLE users (
     role ENUM('student','recruiter','admin') NOT NULL  -- Role type
 );
 
+-- 1b RESUME FILES TABLE - one row per distinct uploaded resume (content-addressed,
+--    the file itself lives under resumes/<campus>/ on the app server)
+CREATE TABLE resume_files (
+    sha256 CHAR(64) PRIMARY KEY,                       -- SHA-256 of the file content
+    size_bytes INT NOT NULL,
+    mime_type VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- 2️ STUDENTS TABLE - holds student academic and personal info
 CREATE TABLE students (
     id INT PRIMARY KEY,                                -- Links to users.id
@@ -35,29 +44,46 @@ CREATE TABLE students (
     branch VARCHAR(100),
     cgpa DECIMAL(3,2),
     skills TEXT,
+    resume_url TEXT,
+    resume_sha256 CHAR(64),                            -- Uploaded resume (resume_files)
+    updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),  -- Text-match index watermark
+    INDEX idx_students_updated (updated_at),
+    FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (resume_sha256) REFERENCES resume_files(sha256)
+);
+
+-- 2b STUDENT DETAILS TABLE - long free-text profile sections, kept out of the hot
+--    students rows so applicant joins stay narrow (read only by the profile pages)
+CREATE TABLE student_details (
+    student_id INT PRIMARY KEY,                        -- Links to students.id
     internships TEXT,
     hackathons TEXT,
     projects TEXT,
     certificates TEXT,
-    resume_url TEXT,
     coding_profiles TEXT,
-    FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE
-);
-
--- 3️ RECRUITERS TABLE - stores recruiter info (company, approval)
-CREATE TABLE recruiters (
-    id INT PRIMARY KEY,                                -- Linked with users.id
-    company_name VARCHAR(255),
-    is_approved BOOLEAN DEFAULT 0,                     -- 0 = pending, 1 = approved
-    FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE
+    updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),  -- Text-match index watermark
+    INDEX idx_student_details_updated (updated_at),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
 );
 
--- 4️ COMPANIES TABLE - stores unique company names
+-- 3️ COMPANIES TABLE - stores unique company names
 CREATE TABLE companies (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) UNIQUE NOT NULL
 );
 
+-- 4️ RECRUITERS TABLE - stores recruiter info (company, approval)
+CREATE TABLE recruiters (
+    id INT PRIMARY KEY,                                -- Linked with users.id
+    company_id INT,                                    -- Resolved once at registration
+    is_approved BOOLEAN DEFAULT 0,                     -- 0 = pending/rejected, 1 = approved
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,    -- Sign-up time
+    reviewed_at TIMESTAMP NULL,                        -- Set on approve/reject; NULL = awaiting review
+    INDEX idx_recruiters_queue (reviewed_at, created_at, id),  -- Admin approval queue (keyset pages)
+    FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE SET NULL
+);
+
 -- 5️ JOBS TABLE - stores job postings made by recruiters
 CREATE TABLE jobs (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -68,6 +94,9 @@ CREATE TABLE jobs (
     eligibility VARCHAR(255),
     description TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,    -- Time job was created
+    updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),  -- Change-feed watermark
+    deleted_at TIMESTAMP NULL,                         -- Hidden; job_purge.py removes it in the background
+    INDEX idx_jobs_deleted (deleted_at),
     FOREIGN KEY (recruiter_id) REFERENCES recruiters(id) ON DELETE CASCADE,
     FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE
 );
@@ -79,6 +108,10 @@ CREATE TABLE applications (
     student_id INT,
     status ENUM('applied', 'shortlisted', 'rejected', 'accepted') DEFAULT 'applied',
     applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),  -- Change-feed watermark
+    UNIQUE KEY uq_application (job_id, student_id),    -- One application per student per job
+    INDEX idx_applications_job_updated (job_id, updated_at),          -- Recruiter applicant feed
+    INDEX idx_applications_student_updated (student_id, updated_at),  -- Student tracking feed
     FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
     FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
 );
@@ -100,6 +133,138 @@ CREATE TABLE admins (
     FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- 9  FUNNEL DAILY TABLE - placement-funnel rollup per day, job and branch
+--    Maintained incrementally from audit_logs by funnel_rollups.py; no foreign
+--    keys so the history survives deleted jobs
+CREATE TABLE funnel_daily (
+    day DATE NOT NULL,
+    job_id INT NOT NULL,
+    company_id INT,
+    branch VARCHAR(100) NOT NULL DEFAULT '',
+    applied INT NOT NULL DEFAULT 0,
+    shortlisted INT NOT NULL DEFAULT 0,
+    accepted INT NOT NULL DEFAULT 0,
+    rejected INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, job_id, branch)
+);
+
+-- 10 ROLLUP STATE TABLE - high-water mark (last consumed audit_logs.id) per rollup
+CREATE TABLE rollup_state (
+    name VARCHAR(64) PRIMARY KEY,
+    last_id INT NOT NULL
+);
+
+-- 11 INTERVIEW SLOTS TABLE - recruiter-defined interview times per job
+--    capacity = applicants one slot can take (parallel panels)
+CREATE TABLE interview_slots (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    job_id INT NOT NULL,
+    starts_at DATETIME NOT NULL,
+    ends_at DATETIME NOT NULL,
+    capacity INT NOT NULL DEFAULT 1,
+    INDEX idx_interview_slots_job (job_id, starts_at),
+    FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+);
+
+-- 12 INTERVIEW ASSIGNMENTS TABLE - shortlisted application -> slot (interview_scheduler.py)
+--    student_id is copied from the application so clashes across companies are one index lookup
+CREATE TABLE interview_assignments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    slot_id INT NOT NULL,
+    application_id INT NOT NULL UNIQUE,                -- One interview per application
+    student_id INT NOT NULL,
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_interview_assignments_slot (slot_id),
+    INDEX idx_interview_assignments_student (student_id),
+    FOREIGN KEY (slot_id) REFERENCES interview_slots(id) ON DELETE CASCADE,
+    FOREIGN KEY (application_id) REFERENCES applications(id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+);
+
+-- 13 NOTIFICATIONS TABLE - in-app inbox, filled from audit_logs by notifications.py
+--    An unread row absorbs later events of the same kind/ref_id (event_count)
+CREATE TABLE notifications (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    kind VARCHAR(16) NOT NULL,                         -- 'jobs' (new eligible jobs) or 'status'
+    ref_id INT NOT NULL DEFAULT 0,                     -- Application id for 'status', 0 for 'jobs'
+    message VARCHAR(500) NOT NULL,
+    event_count INT NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    read_at TIMESTAMP NULL,
+    INDEX idx_notifications_user (user_id, id),
+    INDEX idx_notifications_unread (user_id, read_at),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- 14 JOB DELETIONS TABLE - queue and progress of background job purges (job_purge.py)
+--    No foreign key: the row outlives the job it describes
+CREATE TABLE job_deletions (
+    job_id INT PRIMARY KEY,
+    recruiter_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    applications INT NOT NULL,                         -- Applications when the deletion was requested
+    removed INT NOT NULL DEFAULT 0,
+    requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL,
+    INDEX idx_job_deletions_pending (finished_at),
+    INDEX idx_job_deletions_recruiter (recruiter_id, requested_at)
+);
+
+-- 15 SEASONS TABLE - placement seasons; the hot tables hold only the open one (seasons.py)
+--    Closing records the last job / audit_logs id of the season, then the rows up
+--    to those ids are moved to the archived_* tables in the background
+CREATE TABLE seasons (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(64) NOT NULL UNIQUE,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    closing_at TIMESTAMP NULL,                         -- Set when the season is closed
+    closed_at TIMESTAMP NULL,                          -- Set when its rows are all archived
+    job_cutoff INT NULL,
+    audit_cutoff INT NULL,
+    jobs INT NOT NULL DEFAULT 0,                       -- Rows archived so far
+    applications INT NOT NULL DEFAULT 0,
+    audit_rows INT NOT NULL DEFAULT 0
+);
+
+-- 16 ARCHIVED JOBS / APPLICATIONS / AUDIT LOGS - closed seasons, read by the history views
+--    Same columns as the hot tables plus season_id; no foreign keys, like funnel_daily
+CREATE TABLE archived_jobs (
+    id INT PRIMARY KEY,
+    season_id INT NOT NULL,
+    recruiter_id INT,
+    company_id INT,
+    title VARCHAR(255) NOT NULL,
+    location VARCHAR(255),
+    eligibility VARCHAR(255),
+    description TEXT,
+    created_at TIMESTAMP NULL,
+    INDEX idx_archived_jobs_season (season_id, company_id)
+);
+
+CREATE TABLE archived_applications (
+    id INT PRIMARY KEY,
+    season_id INT NOT NULL,
+    job_id INT,
+    student_id INT,
+    status VARCHAR(32),
+    applied_at TIMESTAMP NULL,
+    updated_at TIMESTAMP(3) NULL,
+    INDEX idx_archived_applications_season (season_id, job_id),
+    INDEX idx_archived_applications_student (student_id)
+);
+
+CREATE TABLE archived_audit_logs (
+    id INT PRIMARY KEY,
+    season_id INT NOT NULL,
+    created_at TIMESTAMP NULL,
+    action VARCHAR(255),
+    entity VARCHAR(255),
+    entity_id INT,
+    user_email VARCHAR(255),
+    INDEX idx_archived_audit_logs_season (season_id)
+);
+
 
 -- ===============================================================
 --  SECTION 4: TRIGGERS (Automation) 
@@ -135,10 +300,21 @@ CREATE TRIGGER trg_application_status_update
 AFTER UPDATE ON applications
 FOR EACH ROW
 BEGIN
-    -- Logs status changes like shortlisted/rejected/accepted
+    -- Logs status changes like shortlisted/rejected/accepted (not other edits)
+    IF NEW.status <> OLD.status THEN
+        INSERT INTO audit_logs (action, entity, entity_id, user_email)
+        VALUES (CONCAT('STATUS ', NEW.status), 'applications', NEW.id,
+                (SELECT email FROM users WHERE id = NEW.student_id));
+    END IF;
+END$$
+
+-- Trigger 4: Runs when a student applies (start of the placement funnel)
+CREATE TRIGGER trg_application_insert
+AFTER INSERT ON applications
+FOR EACH ROW
+BEGIN
     INSERT INTO audit_logs (action, entity, entity_id, user_email)
-    VALUES (CONCAT('STATUS ', NEW.status), 'applications', NEW.id,
-            (SELECT email FROM users WHERE id = NEW.student_id));
+    VALUES ('INSERT', 'applications', NEW.id, (SELECT email FROM users WHERE id = NEW.student_id));
 END$$
 
 DELIMITER ;
@@ -190,6 +366,107 @@ BEGIN
     SELECT total_apps AS total_apps;
 END$$
 
+--  Procedure 4: register_student_proc (one round trip: users + students in a transaction)
+CREATE PROCEDURE register_student_proc (
+    IN p_email VARCHAR(255),
+    IN p_password VARCHAR(255),
+    IN p_roll_no VARCHAR(50),
+    IN p_full_name VARCHAR(255),
+    IN p_branch VARCHAR(100)
+)
+BEGIN
+    DECLARE v_user_id INT;
+    -- Any error (e.g. duplicate email/roll no) undoes both inserts and is re-raised to the app
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+
+    START TRANSACTION;
+    CALL register_user(p_email, p_password, 'student');
+    SET v_user_id = LAST_INSERT_ID();
+    INSERT INTO students (id, roll_no, full_name, branch)
+    VALUES (v_user_id, p_roll_no, p_full_name, p_branch);
+    COMMIT;
+
+    SELECT v_user_id AS user_id;
+END$$
+
+--  Procedure 5: register_recruiter_proc (users + company lookup/creation + recruiters in a transaction)
+CREATE PROCEDURE register_recruiter_proc (
+    IN p_email VARCHAR(255),
+    IN p_password VARCHAR(255),
+    IN p_company_name VARCHAR(255)
+)
+BEGIN
+    DECLARE v_user_id INT;
+    DECLARE v_company_id INT;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+
+    START TRANSACTION;
+    CALL register_user(p_email, p_password, 'recruiter');
+    SET v_user_id = LAST_INSERT_ID();
+    -- The default collation is case-insensitive, so 'infosys' resolves to 'Infosys'
+    INSERT IGNORE INTO companies (name) VALUES (TRIM(p_company_name));
+    SELECT id INTO v_company_id FROM companies WHERE name = TRIM(p_company_name);
+    INSERT INTO recruiters (id, company_id) VALUES (v_user_id, v_company_id);
+    COMMIT;
+
+    SELECT v_user_id AS user_id;
+END$$
+
+--  Procedure 6: register_admin_proc (users + admins in a transaction)
+CREATE PROCEDURE register_admin_proc (
+    IN p_email VARCHAR(255),
+    IN p_password VARCHAR(255),
+    IN p_department VARCHAR(255)
+)
+BEGIN
+    DECLARE v_user_id INT;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+
+    START TRANSACTION;
+    CALL register_user(p_email, p_password, 'admin');
+    SET v_user_id = LAST_INSERT_ID();
+    INSERT INTO admins (id, department) VALUES (v_user_id, p_department);
+    COMMIT;
+
+    SELECT v_user_id AS user_id;
+END$$
+
+--  Procedure 7: apply_job_proc (duplicate check + insert in one statement)
+CREATE PROCEDURE apply_job_proc (
+    IN p_job_id INT,
+    IN p_student_id INT
+)
+BEGIN
+    INSERT INTO applications (job_id, student_id)
+    SELECT p_job_id, p_student_id FROM DUAL
+    WHERE NOT EXISTS (
+        SELECT 1 FROM applications WHERE job_id = p_job_id AND student_id = p_student_id
+    )
+    AND EXISTS (SELECT 1 FROM jobs WHERE id = p_job_id AND deleted_at IS NULL);
+    -- 1 = application created, 0 = already applied (or the job is being deleted)
+    SELECT ROW_COUNT() AS applied;
+END$$
+
+--  Procedure 8: post_job_proc (recruiter's company_id + add_job)
+CREATE PROCEDURE post_job_proc (
+    IN p_recruiter_id INT,
+    IN p_title VARCHAR(255),
+    IN p_location VARCHAR(255),
+    IN p_eligibility VARCHAR(255),
+    IN p_description TEXT
+)
+BEGIN
+    DECLARE v_company_id INT;
+
+    SELECT company_id INTO v_company_id FROM recruiters WHERE id = p_recruiter_id;
+    IF v_company_id IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Recruiter profile incomplete. Cannot post jobs.';
+    END IF;
+
+    CALL add_job(p_recruiter_id, v_company_id, p_title, p_location, p_eligibility, p_description);
+    SELECT LAST_INSERT_ID() AS job_id;
+END$$
+
 DELIMITER ;
 
 
@@ -216,6 +493,9 @@ DELIMITER ;
 -- ===============================================================
 -- DML = Data Manipulation Language → used to insert data in tables.
 
+-- SEASON (everything below belongs to it)
+INSERT INTO seasons (name) VALUES ('Current season');
+
 -- USERS
 INSERT INTO users (email, password, role) VALUES
 ('mohammedbilal96654@gmail.com', 'bilal@1234', 'student'),
@@ -229,17 +509,17 @@ VALUES
 (1, 'PES2UG23CS344', 'Mohammed Bilal', 'CSE', 8.2),
 (2, 'PES2UG23CS345', 'Nawaz Ahmed', 'ISE', 7.9);
 
+-- COMPANIES
+INSERT INTO companies (name) VALUES ('Infosys'), ('TCS'), ('Google');
+
 -- RECRUITER
-INSERT INTO recruiters (id, company_name, is_approved)
-VALUES (3, 'Infosys', 1);
+INSERT INTO recruiters (id, company_id, is_approved, reviewed_at)
+VALUES (3, 1, 1, CURRENT_TIMESTAMP);
 
 -- ADMIN
 INSERT INTO admins (id, department)
 VALUES (4, 'Placement Cell');
 
--- COMPANIES
-INSERT INTO companies (name) VALUES ('Infosys'), ('TCS'), ('Google');
-
 -- JOBS
 INSERT INTO jobs (recruiter_id, company_id, title, location, eligibility, description)
 VALUES
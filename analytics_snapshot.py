@@ -0,0 +1,289 @@
+# CareerSphere/analytics_snapshot.py
+# Columnar (Parquet) snapshots for the analytics pages.
+#
+# A background job copies the columns analytics needs out of the transactional
+# tables into snapshots/<campus>/<timestamp>/*.parquet, at most every
+# SNAPSHOT_MAX_AGE seconds or sooner after SNAPSHOT_CHANGE_THRESHOLD writes. The
+# analytics pages aggregate the snapshot with Arrow/pandas and show how old it is,
+# so reporting never runs GROUP BYs against tables students and recruiters write to.
+#
+#   CLI:  python analytics_snapshot.py [campus]   (take a snapshot now)
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+
+import streamlit as st
+from database import DEFAULT_TENANT, add_write_listener, execute_query, iter_query, open_background_connection
+
+SNAPSHOT_DIR = "snapshots"
+# Re-snapshot when the current one is older than this (seconds) ...
+SNAPSHOT_MAX_AGE = 15 * 60
+# ... or once this many writes were committed since it was taken
+SNAPSHOT_CHANGE_THRESHOLD = 500
+# How often the scheduler checks the two conditions above (seconds)
+SNAPSHOT_CHECK_INTERVAL = 30
+# Older snapshot directories kept next to the current one
+SNAPSHOT_KEEP = 1
+SNAPSHOT_BATCH_SIZE = 5000
+
+# table -> (SELECT, Arrow type per column). Only what the analytics pages use.
+SNAPSHOT_TABLES = {
+    'applications': ("SELECT id, job_id, student_id, status, applied_at FROM applications",
+                     {'id': 'int', 'job_id': 'int', 'student_id': 'int', 'status': 'str', 'applied_at': 'str'}),
+    'students': ("SELECT id, branch, cgpa FROM students",
+                 {'id': 'int', 'branch': 'str', 'cgpa': 'float'}),
+    'jobs': ("SELECT id, title, company_id, recruiter_id, created_at FROM jobs WHERE deleted_at IS NULL",
+             {'id': 'int', 'title': 'str', 'company_id': 'int', 'recruiter_id': 'int', 'created_at': 'str'}),
+}
+
+
+def snapshot_root(tenant_id):
+    return os.path.join(SNAPSHOT_DIR, tenant_id)
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# --- WRITING ---
+def _convert(value, value_type):
+    if value is None:
+        return None
+    if value_type == 'int':
+        return int(value)
+    if value_type == 'float':
+        return float(value)
+    return str(value)
+
+
+def take_snapshot(tenant_id=DEFAULT_TENANT):
+    """Exports SNAPSHOT_TABLES to a new snapshot directory and makes it current; returns its manifest."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string()}
+    root = snapshot_root(tenant_id)
+    started = time.time()
+    name = time.strftime('%Y%m%d-%H%M%S', time.localtime(started)) + f"-{int(started * 1000) % 1000:03d}"
+    target = os.path.join(root, name)
+    os.makedirs(target, exist_ok=True)
+
+    conn, db_type = open_background_connection(tenant_id)
+    rows = {}
+    try:
+        for table, (query, columns) in SNAPSHOT_TABLES.items():
+            schema = pa.schema([(col, arrow_types[kind]) for col, kind in columns.items()])
+            rows[table] = 0
+            with pq.ParquetWriter(os.path.join(target, f"{table}.parquet"), schema) as writer:
+                for batch in iter_query(conn, query, batch_size=SNAPSHOT_BATCH_SIZE):
+                    arrays = [pa.array([_convert(row[col], kind) for row in batch], type=arrow_types[kind])
+                              for col, kind in columns.items()]
+                    writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                    rows[table] += len(batch)
+    finally:
+        conn.close()
+
+    manifest = {'tenant_id': tenant_id, 'taken_at': started, 'seconds': round(time.time() - started, 3), 'backend': db_type, 'rows': rows}
+    with open(os.path.join(target, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+    # Readers follow LATEST, so switching it is the atomic "publish"
+    pointer = os.path.join(root, 'LATEST')
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(name)
+    os.replace(pointer + '.tmp', pointer)
+
+    _changes[tenant_id] = 0
+    _prune(root, keep={name})
+    return manifest
+
+
+def _prune(root, keep):
+    """Removes old snapshot directories (the newest SNAPSHOT_KEEP besides the current are kept)."""
+    names = sorted((n for n in os.listdir(root) if os.path.isdir(os.path.join(root, n))), reverse=True)
+    for name in [n for n in names if n not in keep][SNAPSHOT_KEEP:]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+# --- SCHEDULING ---
+# tenant_id -> writes committed by this process since its last snapshot
+_changes = defaultdict(int)
+_scheduler_lock = threading.Lock()
+_schedulers = {}
+_snapshot_locks = defaultdict(threading.Lock)
+
+
+def _count_write(tenant_id, tables):
+    _changes[tenant_id] += 1
+
+
+add_write_listener(_count_write)
+
+
+def snapshot_age(tenant_id):
+    """Seconds since the current snapshot was taken, or None if there is none."""
+    manifest = current_manifest(tenant_id)
+    return None if manifest is None else time.time() - manifest['taken_at']
+
+
+def refresh_if_due(tenant_id, force=False):
+    """Takes a snapshot if the current one is too old or enough writes happened; returns True if it did."""
+    age = snapshot_age(tenant_id)
+    if not force and age is not None and age < SNAPSHOT_MAX_AGE and _changes[tenant_id] < SNAPSHOT_CHANGE_THRESHOLD:
+        return False
+    lock = _snapshot_locks[tenant_id]
+    if not lock.acquire(blocking=force):
+        return False # Another thread is already taking it
+    try:
+        take_snapshot(tenant_id)
+        return True
+    finally:
+        lock.release()
+
+
+def _run_scheduler(tenant_id):
+    while True:
+        time.sleep(SNAPSHOT_CHECK_INTERVAL)
+        try:
+            refresh_if_due(tenant_id)
+        except Exception:
+            pass # e.g. database briefly unavailable; the next check retries
+
+
+def start_snapshot_scheduler(tenant_id=DEFAULT_TENANT):
+    """Starts the campus's background snapshot thread once per process."""
+    with _scheduler_lock:
+        thread = _schedulers.get(tenant_id)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_run_scheduler, args=(tenant_id,), name=f"analytics-snapshot:{tenant_id}", daemon=True)
+            thread.start()
+            _schedulers[tenant_id] = thread
+
+
+# --- READING ---
+def current_manifest(tenant_id):
+    root = snapshot_root(tenant_id)
+    try:
+        with open(os.path.join(root, 'LATEST')) as f:
+            name = f.read().strip()
+        with open(os.path.join(root, name, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    manifest['path'] = os.path.join(root, name)
+    return manifest
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _read_tables(path):
+    # Keyed by the snapshot directory, so a new snapshot is read once and shared by all sessions
+    import pyarrow.parquet as pq
+    return {table: pq.read_table(os.path.join(path, f"{table}.parquet")) for table in SNAPSHOT_TABLES}
+
+
+class AnalyticsSnapshot:
+    """Read-only view of one snapshot with the aggregates the analytics pages show."""
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.tables = _read_tables(manifest['path'])
+
+    @property
+    def taken_at(self):
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.manifest['taken_at']))
+
+    @property
+    def age_seconds(self):
+        return time.time() - self.manifest['taken_at']
+
+    def status_counts(self):
+        """DataFrame(status, count), like SELECT status, COUNT(*) ... GROUP BY status."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        counts = pc.value_counts(self.tables['applications']['status'])
+        if not len(counts):
+            return None
+        return pa.Table.from_arrays(counts.flatten(), names=['status', 'count']).to_pandas()
+
+    def cgpa_values(self):
+        """Non-null CGPAs as a NumPy array."""
+        return self.tables['students']['cgpa'].drop_null().to_numpy()
+
+
+class LiveAnalytics:
+    """Same aggregates straight from the live tables; used when pyarrow is not installed."""
+
+    manifest = None
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def status_counts(self):
+        import pandas as pd # Lazy import
+        data = execute_query(self.conn, "SELECT status, COUNT(*) AS count FROM applications GROUP BY status", fetch=True)
+        return pd.DataFrame(data) if data else None
+
+    def cgpa_values(self):
+        import numpy as np
+        data = execute_query(self.conn, "SELECT cgpa FROM students WHERE cgpa IS NOT NULL", fetch=True) or []
+        return np.array([float(d['cgpa']) for d in data], dtype=float)
+
+
+def get_snapshot(tenant_id=DEFAULT_TENANT):
+    """Returns the current AnalyticsSnapshot (taking the first one if needed), or None without pyarrow.
+
+    Also makes sure the background scheduler keeps it fresh.
+    """
+    if not pyarrow_available():
+        return None
+    start_snapshot_scheduler(tenant_id)
+    manifest = current_manifest(tenant_id)
+    if manifest is None:
+        with st.spinner("Building the first analytics snapshot..."):
+            refresh_if_due(tenant_id)
+        manifest = current_manifest(tenant_id)
+    return AnalyticsSnapshot(manifest) if manifest is not None else None
+
+
+def get_analytics_source(conn):
+    """The campus's current snapshot, or LiveAnalytics over `conn` if snapshots are unavailable."""
+    snapshot = get_snapshot(getattr(conn, 'tenant_id', DEFAULT_TENANT))
+    return snapshot if snapshot is not None else LiveAnalytics(conn)
+
+
+def freshness_bar(source, key):
+    """Shows how fresh the analytics are, with a button to take a snapshot right away."""
+    if source.manifest is None:
+        st.warning("pyarrow is not installed: analytics are computed from the live tables.")
+        return
+    col1, col2 = st.columns([4, 1])
+    col1.caption(snapshot_caption(source))
+    if col2.button("🔄 Refresh now", key=key):
+        with st.spinner("Taking a new analytics snapshot..."):
+            refresh_if_due(source.manifest['tenant_id'], force=True)
+        st.rerun()
+
+
+def snapshot_caption(snapshot):
+    """One-line freshness note shown above snapshot-based charts."""
+    minutes = int(snapshot.age_seconds // 60)
+    age = "just now" if minutes == 0 else f"{minutes} min ago"
+    return (f"🗂️ From the analytics snapshot taken {snapshot.taken_at} ({age}, "
+            f"{snapshot.manifest['rows']['applications']} applications). Refreshed every "
+            f"{SNAPSHOT_MAX_AGE // 60} min or after {SNAPSHOT_CHANGE_THRESHOLD} changes.")
+
+
+if __name__ == '__main__':
+    import sys
+
+    tenant = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TENANT
+    m = take_snapshot(tenant)
+    print(f"Snapshot of '{tenant}' taken in {m['seconds']}s from {m['backend']}: {m['rows']}")
@@ -2,6 +2,7 @@
 
 import streamlit as st
 import os
+from startup_profile import timed
 
 # --- PAGE CONFIGURATION & CSS ---
 st.set_page_config(
@@ -10,27 +11,52 @@ st.set_page_config(
     layout="wide",
 )
 
-def load_css(file_name):
-    """Loads custom CSS file."""
+@st.cache_resource(show_spinner=False)
+def read_static_asset(file_name):
+    """Reads a static file once per process (None if it is missing)."""
     # Using os.path.dirname(__file__) ensures the path is relative to app.py
-    css_path = os.path.join(os.path.dirname(__file__), file_name)
+    asset_path = os.path.join(os.path.dirname(__file__), file_name)
     try:
-        with open(css_path) as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        with open(asset_path) as f:
+            return f.read()
     except FileNotFoundError:
+        return None
+
+def load_css(file_name):
+    """Loads custom CSS file."""
+    css = read_static_asset(file_name)
+    if css is None:
         st.warning(f"CSS file '{file_name}' not found. Check path.")
+        return
+    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
 
 # Load the custom CSS file
-load_css('style.css') # Load is relative to the current script directory
+with timed("load style.css"):
+    load_css('style.css') # Load is relative to the current script directory
 
 # --- CORE DB INITIALIZATION FIX ---
 # This ensures db_conn and db_type are ALWAYS in st.session_state before any page runs.
 try:
     # Ensure 'database.py' is in the root 'dbms_project' directory
-    from database import get_db_connection
+    with timed("import database"):
+        from database import DEFAULT_TENANT, TENANTS, get_db_connection, release_session_connection
+    # Sessions start on the default campus; login/registration may switch it
+    if 'tenant_id' not in st.session_state: st.session_state['tenant_id'] = DEFAULT_TENANT
     if 'db_conn' not in st.session_state or st.session_state['db_conn'] is None:
-        st.session_state['db_conn'], st.session_state['db_type'] = get_db_connection()
+        with timed("get_db_connection"):
+            st.session_state['db_conn'], st.session_state['db_type'] = get_db_connection(st.session_state['tenant_id'])
     from database import execute_query # Ensure this function is available globally
+    with timed("import profile_cache"):
+        from profile_cache import clear_profile_cache
+    with timed("import notifications"):
+        from notifications import start_notification_worker
+    start_notification_worker(st.session_state['tenant_id'])
+    with timed("import job_purge"):
+        from job_purge import start_purge_worker
+    start_purge_worker(st.session_state['tenant_id']) # Resumes deletions interrupted by a restart
+    with timed("import seasons"):
+        from seasons import start_archive_worker
+    start_archive_worker(st.session_state['tenant_id']) # Resumes archiving of a closed season
 except ImportError:
     st.error("Could not find 'database.py'. Please ensure it's in the CareerSphere directory.")
     st.stop()
@@ -54,6 +80,8 @@ def logout():
     st.session_state['user_role'] = None
     st.session_state['user_id'] = None
     st.session_state['user_email'] = None
+    clear_profile_cache()
+    release_session_connection() # Back to the campus pool for the next login
     st.success("Logged out successfully!")
     # NOTE: st.rerun() will restart the script, reloading the current page or the main page.
     st.rerun()
@@ -64,6 +92,8 @@ with st.sidebar:
     
     if st.session_state['logged_in']:
         st.success(f"Logged in as: **{st.session_state['user_role'].upper()}**")
+        if len(TENANTS) > 1:
+            st.caption(f"🏫 {TENANTS[st.session_state['tenant_id']]['name']}")
         
         st.markdown("---")
         
@@ -0,0 +1,155 @@
+# CareerSphere/change_feed.py
+# Change feed for the live application lists.
+#
+# `applications` and `jobs` carry an `updated_at` watermark (ON UPDATE on MySQL,
+# triggers on SQLite). A page keeps a DeltaView per list in its session; every poll
+# asks only for rows changed since the view's watermark and merges them by id,
+# instead of re-reading the whole list.
+
+import time
+
+import streamlit as st
+from database import execute_query, watermark_cutoff
+
+# Seconds between background refreshes of a live list
+POLL_INTERVAL = 10
+# A view is rebuilt from scratch this often anyway (picks up e.g. renamed students)
+FULL_RESYNC_INTERVAL = 300
+
+VIEWS_KEY = 'delta_views'
+
+# feed name -> id column, delta query per backend ({since} is filled in), scope row count
+FEEDS = {
+    # pages/applications.py, recruiter review: applicants of one job
+    'job_applicants': {
+        'key': 'app_id',
+        'mysql': """
+        SELECT a.id AS app_id, s.full_name, s.roll_no, s.branch, s.cgpa, a.status, s.resume_url,
+               a.applied_at, a.updated_at
+        FROM applications a
+        JOIN students s ON a.student_id = s.id
+        WHERE a.job_id = %s {since}
+        """,
+        'sqlite': """
+        SELECT a.id AS app_id, s.full_name, s.roll_no, s.branch, s.cgpa, a.status, s.resume_url,
+               a.applied_at, a.updated_at
+        FROM applications a
+        JOIN students s ON a.student_id = s.id
+        WHERE a.job_id = ? {since}
+        """,
+        'since': "AND a.updated_at >= {cutoff}",
+        'count': "SELECT COUNT(*) AS n FROM applications WHERE job_id = %s",
+    },
+    # pages/applications.py, student tracking: one student's applications (job edits count as changes)
+    'student_applications': {
+        'key': 'app_id',
+        'mysql': """
+        SELECT a.id AS app_id, j.title AS job_title, c.name AS company, a.applied_at, a.status,
+               GREATEST(a.updated_at, j.updated_at) AS updated_at
+        FROM applications a
+        JOIN jobs j ON a.job_id = j.id
+        JOIN companies c ON j.company_id = c.id
+        WHERE a.student_id = %s AND j.deleted_at IS NULL {since}
+        """,
+        'sqlite': """
+        SELECT a.id AS app_id, j.title AS job_title, c.name AS company, a.applied_at, a.status,
+               MAX(a.updated_at, j.updated_at) AS updated_at
+        FROM applications a
+        JOIN jobs j ON a.job_id = j.id
+        JOIN companies c ON j.company_id = c.id
+        WHERE a.student_id = ? AND j.deleted_at IS NULL {since}
+        """,
+        'since': "AND (a.updated_at >= {cutoff} OR j.updated_at >= {cutoff})",
+        'count': """
+        SELECT COUNT(*) AS n FROM applications a JOIN jobs j ON j.id = a.job_id
+        WHERE a.student_id = %s AND j.deleted_at IS NULL
+        """,
+    },
+}
+
+
+def changes_since(conn, db_type, feed, scope_id, watermark=None):
+    """Returns (rows, new_watermark): the feed's rows changed since `watermark`.
+
+    With no watermark every row in scope is returned. Rows inside the overlap
+    window come back again on the next call; merge them by id.
+    """
+    spec = FEEDS[feed]
+    query = spec['mysql' if db_type == 'mysql' else 'sqlite']
+    params = [scope_id]
+    if watermark is None:
+        query = query.format(since='')
+    else:
+        condition = spec['since']
+        params.extend([watermark] * condition.count('{cutoff}'))
+        query = query.format(since=condition.format(cutoff=watermark_cutoff(db_type)))
+
+    rows = execute_query(conn, query, tuple(params), fetch=True) or []
+    if rows:
+        latest = max(row['updated_at'] for row in rows)
+        watermark = latest if watermark is None else max(watermark, latest)
+    return rows, watermark
+
+
+def scope_count(conn, feed, scope_id):
+    data = execute_query(conn, FEEDS[feed]['count'], (scope_id,), fetch=True)
+    return data[0]['n'] if data else 0
+
+
+class DeltaView:
+    """A session's merged copy of one feed scope (e.g. the applicants of one job)."""
+
+    def __init__(self, feed, scope_id):
+        self.feed = feed
+        self.scope_id = scope_id
+        self.rows = {}
+        self.watermark = None
+        self.synced_at = 0.0
+        self.version = 0        # Bumped whenever the merged rows change
+        self.last_changes = 0
+        self._frame = None
+
+    def refresh(self, conn, db_type):
+        """Merges the changes since the last refresh; returns how many rows changed."""
+        key = FEEDS[self.feed]['key']
+        if self.watermark is None or time.monotonic() - self.synced_at > FULL_RESYNC_INTERVAL:
+            rows, self.watermark = changes_since(conn, db_type, self.feed, self.scope_id)
+            merged = {row[key]: row for row in rows}
+            self.last_changes = len(merged) if merged != self.rows else 0
+            self.rows = merged
+            self.synced_at = time.monotonic()
+        else:
+            rows, self.watermark = changes_since(conn, db_type, self.feed, self.scope_id, self.watermark)
+            changed = [row for row in rows if self.rows.get(row[key]) != row]
+            self.rows.update((row[key], row) for row in changed)
+            self.last_changes = len(changed)
+            # Deleted rows never show up as changes; a count mismatch forces a resync
+            if len(self.rows) != scope_count(conn, self.feed, self.scope_id):
+                self.watermark = None
+                return self.refresh(conn, db_type)
+
+        if self.last_changes:
+            self.version += 1
+            self._frame = None
+        return self.last_changes
+
+    def __len__(self):
+        return len(self.rows)
+
+    def frame(self, sort_by='applied_at'):
+        """The merged rows as a DataFrame (rebuilt only after a change), newest first."""
+        if self._frame is None:
+            import pandas as pd # Lazy import
+            df = pd.DataFrame(list(self.rows.values()))
+            if not df.empty:
+                df = df.sort_values(sort_by, ascending=False).drop(columns=['updated_at'])
+            self._frame = df
+        return self._frame
+
+
+def get_delta_view(feed, scope_id):
+    """Returns this session's DeltaView for a feed scope, creating it on first use."""
+    views = st.session_state.setdefault(VIEWS_KEY, {})
+    if (feed, scope_id) not in views:
+        views[(feed, scope_id)] = DeltaView(feed, scope_id)
+    return views[(feed, scope_id)]
@@ -1,10 +1,15 @@
 # CareerSphere/database.py (FINALIZED)
 
 import streamlit as st
-import mysql.connector
+import os
+import re
 import sqlite3
-# Note: pandas import kept just in case, though not used in these functions
-import pandas as pd 
+import threading
+import time
+from contextlib import contextmanager
+from write_queue import get_sqlite_writer
+# NOTE: mysql.connector is imported lazily in get_db_connection() so that
+# SQLite-only deployments (and cold starts) don't pay for loading it.
 
 # MySQL Credentials
 MYSQL_HOST = "localhost"
@@ -12,36 +17,488 @@ MYSQL_USER = "root"
 MYSQL_PASSWORD = "bilal@1234"
 MYSQL_DATABASE = "cs"
 
+# MySQL availability settings (seconds unless noted)
+MYSQL_CONNECT_TIMEOUT = 3           # Max time a single connect attempt may block
+HEALTH_PROBE_INTERVAL = 15          # How often the background thread re-checks MySQL
+BREAKER_FAILURE_THRESHOLD = 3       # Consecutive failures (count) before the breaker opens
+BREAKER_RESET_TIMEOUT = 30          # How long the breaker stays open before a half-open retry
+
 # SQLite File
 SQLITE_DB = "cs.db"
 
-def get_db_connection():
-    """Attempts MySQL connection, falls back to SQLite."""
-    # 1. Try MySQL Connection
+# Read replicas (leave empty to send everything to the primary). Replicas use the
+# same backend as the primary connection they serve.
+MYSQL_REPLICAS = []                 # e.g. [{"host": "localhost", "port": 3307}]
+SQLITE_REPLICAS = []                # e.g. ["cs_replica.db"], refreshed with sync_sqlite_replica()
+REPLICA_MAX_LAG = 5                 # Seconds; replicas further behind are skipped
+READ_YOUR_WRITES_WINDOW = 10        # Seconds after a write during which the session reads from the primary
+REPLICA_LAG_CHECK_INTERVAL = 5      # Seconds between lag checks of the same replica
+REPLICA_RETRY_AFTER = 30            # Seconds a failed replica is skipped
+
+# Funnel every SQLite write through one writer thread per file (group commits,
+# no "database is locked" under write surges). See write_queue.py.
+SQLITE_SINGLE_WRITER = True
+
+# Campuses (tenants). Each campus gets its own MySQL database / SQLite file, so one
+# campus's load and data never touch another's tables. The campus is chosen per
+# session at login; with a single entry the campus picker is hidden.
+TENANTS = {
+    'main': {'name': 'Main Campus', 'mysql_database': MYSQL_DATABASE, 'sqlite_db': SQLITE_DB,
+             'mysql_replicas': MYSQL_REPLICAS, 'sqlite_replicas': SQLITE_REPLICAS},
+    # 'north': {'name': 'North Campus', 'mysql_database': 'cs_north', 'sqlite_db': 'cs_north.db'},
+}
+DEFAULT_TENANT = 'main'
+
+# Idle connections kept per campus and backend for reuse by later sessions
+POOL_MAX_IDLE = 8
+
+# Query-plan diagnostics: EXPLAIN each distinct statement execute_query runs and flag
+# full scans, temporary sorts and correlated subqueries (see QueryPlanRecorder). Can
+# also be switched on at runtime from the admin dashboard.
+QUERY_PLAN_CAPTURE = False
+QUERY_PLAN_MAX_STATEMENTS = 500     # Distinct statements remembered per process
+
+# SQLite files whose schema was already created by this process
+_sqlite_schema_ready = set()
+
+# PRAGMA user_version of a SQLite file whose legacy student columns were copied to
+# student_details but could not be dropped (SQLite < 3.35)
+STUDENT_DETAILS_COPIED_VERSION = 1
+
+# Callbacks notified of every committed write (see add_write_listener)
+_write_listeners = []
+
+# Target table of an INSERT / REPLACE / UPDATE / DELETE statement
+_WRITE_TARGET_RE = re.compile(
+    r"^\s*(?:insert(?:\s+or\s+\w+|\s+ignore)?\s+into|replace\s+into|update|delete\s+from)\s+`?(\w+)", re.IGNORECASE)
+
+# Tables each stored procedure writes (for the write listeners)
+PROCEDURE_TABLES = {
+    'register_student_proc': frozenset({'users', 'students'}),
+    'register_recruiter_proc': frozenset({'users', 'companies', 'recruiters'}),
+    'register_admin_proc': frozenset({'users', 'admins'}),
+    'apply_job_proc': frozenset({'applications'}),
+    'post_job_proc': frozenset({'jobs'}),
+}
+
+# Per-thread seconds spent in database calls (read by page_profiler.py via db_time())
+_db_clock = threading.local()
+
+
+# --- MYSQL HEALTH STATE (process level, shared by all sessions) ---
+class CircuitBreaker:
+    """Closed -> open after repeated failures; open -> half-open after a cool-down.
+
+    In the half-open state exactly one trial attempt is let through: success closes
+    the breaker again, failure re-opens it for another cool-down.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class BackendMonitor:
+    """Tracks whether MySQL is usable so new sessions never wait on a dead server.
+
+    A daemon thread probes MySQL every HEALTH_PROBE_INTERVAL seconds through the
+    circuit breaker; get_db_connection() only tries MySQL while the breaker allows it.
+    """
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.last_probe_at = None
+        self.last_error = None
+        self.driver_available = True
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """The backend new sessions will be given ('mysql' or 'sqlite')."""
+        if not self.driver_available or self.breaker.state == 'open':
+            return 'sqlite'
+        return 'mysql'
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mysql-health-probe", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(HEALTH_PROBE_INTERVAL)
+            if self.driver_available and self.breaker.allow_request():
+                conn = self.try_mysql()
+                if conn is not None:
+                    conn.close()
+
+    def try_mysql(self, database=MYSQL_DATABASE):
+        """One guarded connect attempt; returns a connection or None and updates the breaker."""
+        self.last_probe_at = time.time()
+        try:
+            import mysql.connector
+        except ImportError:
+            self.driver_available = False
+            self.last_error = "mysql-connector-python is not installed"
+            return None
+
+        try:
+            conn = mysql.connector.connect(
+                host=MYSQL_HOST,
+                user=MYSQL_USER,
+                password=MYSQL_PASSWORD,
+                database=database,
+                connection_timeout=MYSQL_CONNECT_TIMEOUT,
+            )
+            if conn.is_connected():
+                self.breaker.record_success()
+                self.last_error = None
+                return conn
+            self.last_error = "connection not established"
+        except mysql.connector.Error as e:
+            self.last_error = str(e)
+        self.breaker.record_failure()
+        return None
+
+    def status(self):
+        """Snapshot for the admin dashboard."""
+        return {
+            'backend': self.backend,
+            'breaker_state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'last_probe_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.last_probe_at)) if self.last_probe_at else None,
+            'last_error': self.last_error,
+            'probe_interval_s': HEALTH_PROBE_INTERVAL,
+            'connect_timeout_s': MYSQL_CONNECT_TIMEOUT,
+        }
+
+
+backend_monitor = BackendMonitor()
+
+
+# --- READ REPLICA ROUTING ---
+class SQLiteConnection(sqlite3.Connection):
+    """A plain sqlite3 connection that can also carry a replica_router attribute."""
+
+
+def is_read_only(query):
+    """True for statements that are safe to run on a replica."""
+    q = query.lstrip().lower()
+    if not q.startswith(('select', 'with', 'show', 'explain')):
+        return False
+    # Locking reads and last-insert-id lookups must see the primary
+    return not any(token in q for token in ('for update', 'last_insert_id', 'last_insert_rowid', 'insert ', 'update ', 'delete '))
+
+
+class ReplicaRouter:
+    """Per-session routing of read-only statements to replicas.
+
+    One router is attached to each session's primary connection. Reads are spread
+    round-robin over replicas whose lag is within REPLICA_MAX_LAG; for
+    READ_YOUR_WRITES_WINDOW seconds after this session writes, reads stay on the
+    primary so the user always sees their own change.
+    """
+
+    def __init__(self, primary, db_type, endpoints, database=MYSQL_DATABASE):
+        self.primary = primary
+        self.db_type = db_type
+        self.database = database
+        self.replicas = [{'endpoint': e, 'conn': None, 'lag': None, 'lag_checked_at': 0.0, 'down_until': 0.0} for e in endpoints]
+        self.last_write_at = None
+        self._next = 0
+
+    def note_write(self):
+        self.last_write_at = time.monotonic()
+
+    def read_connection(self):
+        """Returns the connection the next read should use (the primary if no replica qualifies)."""
+        now = time.monotonic()
+        if self.last_write_at is not None and now - self.last_write_at < READ_YOUR_WRITES_WINDOW:
+            return self.primary
+
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(self._next + offset) % len(self.replicas)]
+            if replica['down_until'] > now or not self._ensure_connected(replica):
+                continue
+            lag = self._lag(replica, now)
+            if lag is None or lag > REPLICA_MAX_LAG:
+                continue
+            self._next = (self._next + offset + 1) % len(self.replicas)
+            return replica['conn']
+        return self.primary
+
+    def mark_failed(self, conn):
+        """Takes a replica out of rotation for REPLICA_RETRY_AFTER seconds."""
+        for replica in self.replicas:
+            if replica['conn'] is conn:
+                replica['down_until'] = time.monotonic() + REPLICA_RETRY_AFTER
+                replica['conn'] = None
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def status(self):
+        return [
+            {'endpoint': str(r['endpoint']), 'connected': r['conn'] is not None, 'lag_s': r['lag'],
+             'down': r['down_until'] > time.monotonic()}
+            for r in self.replicas
+        ]
+
+    def _ensure_connected(self, replica):
+        if replica['conn'] is not None:
+            return True
+        try:
+            if self.db_type == 'mysql':
+                import mysql.connector
+                settings = {'user': MYSQL_USER, 'password': MYSQL_PASSWORD, 'database': self.database,
+                            'connection_timeout': MYSQL_CONNECT_TIMEOUT, **replica['endpoint']}
+                replica['conn'] = mysql.connector.connect(**settings)
+            else:
+                # Read-only URI so a misrouted write can never land on the copy
+                replica['conn'] = sqlite3.connect(f"file:{replica['endpoint']}?mode=ro", uri=True, check_same_thread=False)
+            replica['lag_checked_at'] = 0.0
+            return True
+        except Exception:
+            replica['down_until'] = time.monotonic() + REPLICA_RETRY_AFTER
+            return False
+
+    def _lag(self, replica, now):
+        """Replica lag in seconds (cached for REPLICA_LAG_CHECK_INTERVAL); None if unknown."""
+        if now - replica['lag_checked_at'] < REPLICA_LAG_CHECK_INTERVAL:
+            return replica['lag']
+        replica['lag_checked_at'] = now
+        try:
+            if self.db_type == 'mysql':
+                cursor = replica['conn'].cursor(dictionary=True)
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except Exception:
+                    cursor.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+                status = cursor.fetchone()
+                cursor.close()
+                if status is None:
+                    # Not configured as a replica (e.g. a second local instance used for testing)
+                    replica['lag'] = 0
+                else:
+                    replica['lag'] = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            else:
+                # A copied SQLite file is as stale as the writes it has not received yet
+                primary_file = _sqlite_file(self.primary)
+                replica['lag'] = max(0.0, _sqlite_mtime(primary_file) - _sqlite_mtime(replica['endpoint']))
+        except Exception:
+            replica['lag'] = None
+        return replica['lag']
+
+
+def _sqlite_file(conn):
+    """Path of the main database file behind a sqlite3 connection."""
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == 'main':
+            return path
+    return None
+
+
+def _sqlite_mtime(path):
+    """Last modification of a SQLite database, counting its -wal file.
+
+    In WAL mode commits only append to the -wal file; the main file changes at
+    checkpoints, so its mtime alone can trail the data by many commits.
+    """
+    mtime = os.path.getmtime(path)
+    try:
+        return max(mtime, os.path.getmtime(path + '-wal'))
+    except OSError:
+        return mtime # No -wal file: rollback-journal mode, or fully checkpointed and closed
+
+
+def sync_sqlite_replica(primary_conn, replica_path):
+    """Refreshes a SQLite read replica with an online copy of the primary (local testing)."""
+    replica = sqlite3.connect(replica_path)
     try:
-        conn = mysql.connector.connect(
-            host=MYSQL_HOST,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DATABASE
-        )
-        if conn.is_connected():
+        primary_conn.backup(replica)
+    finally:
+        replica.close()
+
+
+# --- PER-CAMPUS CONNECTION POOLS ---
+class ConnectionPool:
+    """Idle connections of one campus and backend, handed to new sessions.
+
+    Sessions return their connection on logout / campus switch, so a login usually
+    reuses an already-open connection instead of paying for a new connect.
+    """
+
+    def __init__(self, max_idle=POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if isinstance(conn, sqlite3.Connection) or conn.is_connected():
+                    break
+            else:
+                return None
+        # The new session has written nothing yet: no read-your-writes pinning, no forced cache refresh
+        if getattr(conn, 'last_write_at', None) is not None:
+            conn.last_write_at = None
+        router = getattr(conn, 'replica_router', None)
+        if router is not None:
+            router.last_write_at = None
+        return conn
+
+    def release(self, conn):
+        try:
+            conn.rollback() # Never hand over another session's half-finished transaction
+        except Exception:
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+_pools = {}
+_tenant_caches = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(tenant_id, db_type):
+    with _pools_lock:
+        return _pools.setdefault((tenant_id, db_type), ConnectionPool())
+
+
+def tenant_cache(tenant_id, name):
+    """A process-level cache dict private to one campus (e.g. search indexes)."""
+    with _pools_lock:
+        return _tenant_caches.setdefault((tenant_id, name), {})
+
+
+def get_db_connection(tenant_id=DEFAULT_TENANT):
+    """Connects to a campus's database on the backend chosen by the process-level health state.
+
+    MySQL is only attempted while its circuit breaker is closed (or half-open), so
+    when MySQL is down new sessions go straight to SQLite without a connect timeout.
+    Pooled idle connections of the campus are reused when available.
+    """
+    tenant = TENANTS[tenant_id]
+    backend_monitor.start()
+
+    # 1. Try MySQL Connection (only if the breaker allows it)
+    if backend_monitor.backend == 'mysql':
+        conn = _pool(tenant_id, 'mysql').acquire()
+        if conn is not None:
+            return conn, 'mysql'
+
+    if backend_monitor.driver_available and backend_monitor.breaker.allow_request():
+        conn = backend_monitor.try_mysql(tenant['mysql_database'])
+        if conn is not None:
             st.success("✅ Connected to MySQL Database.")
+            conn.tenant_id = tenant_id
+            if tenant.get('mysql_replicas'):
+                conn.replica_router = ReplicaRouter(conn, 'mysql', tenant['mysql_replicas'], tenant['mysql_database'])
             return conn, 'mysql'
-    except mysql.connector.Error as e:
-        st.warning(f"⚠️ MySQL Connection failed: {e}. Falling back to SQLite.")
+        st.warning(f"⚠️ MySQL Connection failed: {backend_monitor.last_error}. Falling back to SQLite.")
 
     # 2. Fallback to SQLite
+    conn = _pool(tenant_id, 'sqlite').acquire()
+    if conn is not None:
+        return conn, 'sqlite'
     try:
+        sqlite_db = tenant['sqlite_db']
         # check_same_thread=False is necessary for Streamlit's threading model
-        conn = sqlite3.connect(SQLITE_DB, check_same_thread=False)
+        conn = sqlite3.connect(sqlite_db, check_same_thread=False, factory=SQLiteConnection)
         st.info("ℹ️ Connected to SQLite Database.")
-        create_sqlite_tables(conn)
+        # The schema script only needs to run once per process, not once per session
+        if sqlite_db not in _sqlite_schema_ready:
+            create_sqlite_tables(conn)
+            _sqlite_schema_ready.add(sqlite_db)
+        conn.tenant_id = tenant_id
+        if tenant.get('sqlite_replicas'):
+            conn.replica_router = ReplicaRouter(conn, 'sqlite', tenant['sqlite_replicas'])
         return conn, 'sqlite'
     except Exception as e:
         st.error(f"❌ SQLite Connection failed: {e}")
         return None, None
 
+def open_background_connection(tenant_id=DEFAULT_TENANT):
+    """A private, unpooled connection for background jobs (no Streamlit messages).
+
+    Uses the same backend as new sessions; reads go to a replica when the campus has one.
+    """
+    tenant = TENANTS[tenant_id]
+    conn = None
+    if backend_monitor.backend == 'mysql' and backend_monitor.breaker.allow_request():
+        conn = backend_monitor.try_mysql(tenant['mysql_database'])
+    if conn is not None:
+        db_type = 'mysql'
+        if tenant.get('mysql_replicas'):
+            conn.replica_router = ReplicaRouter(conn, 'mysql', tenant['mysql_replicas'], tenant['mysql_database'])
+    else:
+        db_type = 'sqlite'
+        conn = sqlite3.connect(tenant['sqlite_db'], check_same_thread=False, factory=SQLiteConnection)
+        if tenant.get('sqlite_replicas'):
+            conn.replica_router = ReplicaRouter(conn, 'sqlite', tenant['sqlite_replicas'])
+    conn.tenant_id = tenant_id
+    return conn, db_type
+
+def release_db_connection(conn):
+    """Returns a session's connection to its campus pool."""
+    if conn is None:
+        return
+    db_type = 'sqlite' if isinstance(conn, sqlite3.Connection) else 'mysql'
+    _pool(getattr(conn, 'tenant_id', DEFAULT_TENANT), db_type).release(conn)
+
+def release_session_connection():
+    """Hands the session's connection back to its campus pool (called on logout)."""
+    release_db_connection(st.session_state.pop('db_conn', None))
+    st.session_state.pop('db_type', None)
+
+def switch_tenant(tenant_id):
+    """Points this session at another campus database (called at login/registration)."""
+    if st.session_state.get('tenant_id', DEFAULT_TENANT) == tenant_id and st.session_state.get('db_conn') is not None:
+        return
+    release_db_connection(st.session_state.get('db_conn'))
+    st.session_state['db_conn'], st.session_state['db_type'] = get_db_connection(tenant_id)
+    st.session_state['tenant_id'] = tenant_id
+
 def create_sqlite_tables(conn):
     """Initializes a basic schema for SQLite fallback."""
     cursor = conn.cursor()
@@ -60,18 +517,40 @@ def create_sqlite_tables(conn):
         branch TEXT,
         cgpa REAL,
         skills TEXT,
+        resume_url TEXT,
+        resume_sha256 TEXT,
+        updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+        FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (resume_sha256) REFERENCES resume_files(sha256)
+    );
+    CREATE TABLE IF NOT EXISTS resume_files (
+        sha256 TEXT PRIMARY KEY,
+        size_bytes INTEGER NOT NULL,
+        mime_type TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS student_details (
+        student_id INTEGER PRIMARY KEY,
         internships TEXT,
         hackathons TEXT,
         projects TEXT,
         certificates TEXT,
-        resume_url TEXT,
         coding_profiles TEXT,
-        FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE
+        updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+        FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
     );
     CREATE TABLE IF NOT EXISTS recruiters (
         id INTEGER PRIMARY KEY,
-        company_name TEXT,
+        company_id INTEGER,
         is_approved INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        reviewed_at TEXT,
+        FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE SET NULL
+    );
+    CREATE TABLE IF NOT EXISTS admins (
+        id INTEGER PRIMARY KEY,
+        department TEXT NOT NULL,
         FOREIGN KEY (id) REFERENCES users(id) ON DELETE CASCADE
     );
     CREATE TABLE IF NOT EXISTS companies (
@@ -87,6 +566,8 @@ def create_sqlite_tables(conn):
         eligibility TEXT,
         description TEXT,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+        deleted_at TEXT,
         FOREIGN KEY (recruiter_id) REFERENCES recruiters(id) ON DELETE CASCADE,
         FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE
     );
@@ -96,6 +577,7 @@ def create_sqlite_tables(conn):
         student_id INTEGER,
         status TEXT DEFAULT 'applied',
         applied_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
         FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
         FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
     );
@@ -107,18 +589,542 @@ def create_sqlite_tables(conn):
         entity_id INTEGER,
         user_email TEXT
     );
+    -- Placement-funnel rollups maintained from audit_logs (see funnel_rollups.py)
+    CREATE TABLE IF NOT EXISTS funnel_daily (
+        day TEXT NOT NULL,
+        job_id INTEGER NOT NULL,
+        company_id INTEGER,
+        branch TEXT NOT NULL DEFAULT '',
+        applied INTEGER NOT NULL DEFAULT 0,
+        shortlisted INTEGER NOT NULL DEFAULT 0,
+        accepted INTEGER NOT NULL DEFAULT 0,
+        rejected INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, job_id, branch)
+    );
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL
+    );
+    -- Interview slots and the shortlisted applicants booked into them (see interview_scheduler.py)
+    CREATE TABLE IF NOT EXISTS interview_slots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL,
+        starts_at TEXT NOT NULL,
+        ends_at TEXT NOT NULL,
+        capacity INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_interview_slots_job ON interview_slots (job_id, starts_at);
+    CREATE TABLE IF NOT EXISTS interview_assignments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        slot_id INTEGER NOT NULL,
+        application_id INTEGER NOT NULL UNIQUE,
+        student_id INTEGER NOT NULL,
+        assigned_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (slot_id) REFERENCES interview_slots(id) ON DELETE CASCADE,
+        FOREIGN KEY (application_id) REFERENCES applications(id) ON DELETE CASCADE,
+        FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_interview_assignments_slot ON interview_assignments (slot_id);
+    CREATE INDEX IF NOT EXISTS idx_interview_assignments_student ON interview_assignments (student_id);
+    -- In-app inbox filled from audit_logs (see notifications.py)
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        ref_id INTEGER NOT NULL DEFAULT 0,
+        message TEXT NOT NULL,
+        event_count INTEGER NOT NULL DEFAULT 1,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        read_at TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications (user_id, id);
+    CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications (user_id, read_at);
+    -- Queue and progress of background job purges (see job_purge.py)
+    CREATE TABLE IF NOT EXISTS job_deletions (
+        job_id INTEGER PRIMARY KEY,
+        recruiter_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        applications INTEGER NOT NULL,
+        removed INTEGER NOT NULL DEFAULT 0,
+        requested_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        finished_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_deletions_pending ON job_deletions (finished_at);
+    CREATE INDEX IF NOT EXISTS idx_job_deletions_recruiter ON job_deletions (recruiter_id, requested_at);
+    -- Placement seasons; closed ones live in the archived_* tables (see seasons.py)
+    CREATE TABLE IF NOT EXISTS seasons (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        closing_at TEXT,
+        closed_at TEXT,
+        job_cutoff INTEGER,
+        audit_cutoff INTEGER,
+        jobs INTEGER NOT NULL DEFAULT 0,
+        applications INTEGER NOT NULL DEFAULT 0,
+        audit_rows INTEGER NOT NULL DEFAULT 0
+    );
+    INSERT INTO seasons (name, started_at)
+    SELECT 'Current season', COALESCE((SELECT MIN(created_at) FROM jobs), CURRENT_TIMESTAMP)
+    WHERE NOT EXISTS (SELECT 1 FROM seasons);
+    CREATE TABLE IF NOT EXISTS archived_jobs (
+        id INTEGER PRIMARY KEY,
+        season_id INTEGER NOT NULL,
+        recruiter_id INTEGER,
+        company_id INTEGER,
+        title TEXT NOT NULL,
+        location TEXT,
+        eligibility TEXT,
+        description TEXT,
+        created_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_archived_jobs_season ON archived_jobs (season_id, company_id);
+    CREATE TABLE IF NOT EXISTS archived_applications (
+        id INTEGER PRIMARY KEY,
+        season_id INTEGER NOT NULL,
+        job_id INTEGER,
+        student_id INTEGER,
+        status TEXT,
+        applied_at TEXT,
+        updated_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_archived_applications_season ON archived_applications (season_id, job_id);
+    CREATE INDEX IF NOT EXISTS idx_archived_applications_student ON archived_applications (student_id);
+    CREATE TABLE IF NOT EXISTS archived_audit_logs (
+        id INTEGER PRIMARY KEY,
+        season_id INTEGER NOT NULL,
+        created_at TEXT,
+        action TEXT,
+        entity TEXT,
+        entity_id INTEGER,
+        user_email TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_archived_audit_logs_season ON archived_audit_logs (season_id);
+
+    -- Same audit triggers as DDL_DML.sql
+    CREATE TRIGGER IF NOT EXISTS trg_user_insert AFTER INSERT ON users
+    BEGIN
+        INSERT INTO audit_logs (action, entity, entity_id, user_email) VALUES ('INSERT', 'users', NEW.id, NEW.email);
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_job_insert AFTER INSERT ON jobs
+    BEGIN
+        INSERT INTO audit_logs (action, entity, entity_id, user_email)
+        VALUES ('INSERT', 'jobs', NEW.id, (SELECT email FROM users WHERE id = NEW.recruiter_id));
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_application_insert AFTER INSERT ON applications
+    BEGIN
+        INSERT INTO audit_logs (action, entity, entity_id, user_email)
+        VALUES ('INSERT', 'applications', NEW.id, (SELECT email FROM users WHERE id = NEW.student_id));
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_application_status_update AFTER UPDATE OF status ON applications
+    WHEN NEW.status IS NOT OLD.status
+    BEGIN
+        INSERT INTO audit_logs (action, entity, entity_id, user_email)
+        VALUES ('STATUS ' || NEW.status, 'applications', NEW.id, (SELECT email FROM users WHERE id = NEW.student_id));
+    END;
+    """)
+    conn.commit()
+    _migrate_student_details(conn)
+    _migrate_recruiter_company(conn)
+    _migrate_recruiter_review(conn)
+    _migrate_job_deletion(conn)
+    _migrate_change_watermarks(conn)
+    _migrate_resume_store(conn)
+
+# Free-text profile sections that live in student_details, not students
+STUDENT_DETAIL_COLUMNS = ('internships', 'hackathons', 'projects', 'certificates', 'coding_profiles')
+
+def _migrate_student_details(conn):
+    """Moves the cold columns of a pre-split students table into student_details."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(students)")}
+    legacy = [col for col in STUDENT_DETAIL_COLUMNS if col in existing]
+    if not legacy:
+        return
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= STUDENT_DETAILS_COPIED_VERSION:
+        return # Copied on an earlier start; this SQLite could not drop the leftover columns
+
+    cols = ", ".join(legacy)
+    conn.execute(f"""
+    INSERT OR IGNORE INTO student_details (student_id, {cols})
+    SELECT id, {cols} FROM students
+    WHERE {' OR '.join(f'{col} IS NOT NULL' for col in legacy)}
     """)
+    try:
+        for col in legacy:
+            conn.execute(f"ALTER TABLE students DROP COLUMN {col}")
+    except sqlite3.OperationalError:
+        # SQLite < 3.35 cannot drop columns; the copies left in students are simply unused.
+        # Record that the copy is done so later starts skip it, and skip the VACUUM too
+        conn.execute(f"PRAGMA user_version = {STUDENT_DETAILS_COPIED_VERSION}")
+        conn.commit()
+        return
+    conn.commit()
+    # Dropping columns rewrites each row in place, leaving the now-narrow rows one per
+    # page; rebuild the file once so the hot table is actually compact
+    conn.execute("VACUUM")
+
+def _migrate_recruiter_company(conn):
+    """Replaces recruiters.company_name with a company_id backfilled from companies."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(recruiters)")}
+    if 'company_name' not in existing:
+        return
+
+    if 'company_id' not in existing:
+        conn.execute("ALTER TABLE recruiters ADD COLUMN company_id INTEGER REFERENCES companies(id) ON DELETE SET NULL")
+    # One companies row per name, ignoring case and surrounding spaces (first spelling wins)
+    conn.execute("""
+    INSERT INTO companies (name)
+    SELECT MIN(TRIM(company_name)) FROM recruiters r
+    WHERE TRIM(company_name) <> ''
+      AND NOT EXISTS (SELECT 1 FROM companies c WHERE c.name = TRIM(r.company_name) COLLATE NOCASE)
+    GROUP BY TRIM(company_name) COLLATE NOCASE
+    """)
+    conn.execute("""
+    UPDATE recruiters SET company_id = (
+        SELECT MIN(c.id) FROM companies c WHERE c.name = TRIM(recruiters.company_name) COLLATE NOCASE
+    )
+    WHERE company_id IS NULL
+    """)
+    try:
+        conn.execute("ALTER TABLE recruiters DROP COLUMN company_name")
+    except sqlite3.OperationalError:
+        pass # SQLite < 3.35: the stale column stays behind, unused
     conn.commit()
 
-def execute_query(conn, query, params=(), fetch=False, commit=False):
-    """General function to execute SQL queries."""
+def _migrate_recruiter_review(conn):
+    """Adds recruiters.created_at / reviewed_at and the pending-approval queue index (see recruiter_queue.py)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(recruiters)")}
+    if 'created_at' not in existing:
+        # ADD COLUMN cannot take a non-constant default; the insert trigger covers new rows.
+        # Existing recruiters signed up when their users row was audited, if that was logged.
+        conn.execute("ALTER TABLE recruiters ADD COLUMN created_at TEXT")
+        conn.execute("""
+        UPDATE recruiters SET created_at = COALESCE(
+            (SELECT MIN(l.created_at) FROM audit_logs l WHERE l.entity = 'users' AND l.entity_id = recruiters.id),
+            CURRENT_TIMESTAMP)
+        """)
+    if 'reviewed_at' not in existing:
+        conn.execute("ALTER TABLE recruiters ADD COLUMN reviewed_at TEXT")
+        conn.execute("UPDATE recruiters SET reviewed_at = CURRENT_TIMESTAMP WHERE is_approved = 1")
+    conn.executescript("""
+    CREATE TRIGGER IF NOT EXISTS trg_recruiters_stamp AFTER INSERT ON recruiters
+    WHEN NEW.created_at IS NULL
+    BEGIN
+        UPDATE recruiters SET created_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+    END;
+    CREATE INDEX IF NOT EXISTS idx_recruiters_queue ON recruiters (reviewed_at, created_at, id);
+    """)
+    conn.commit()
+
+def _migrate_resume_store(conn):
+    """Adds students.resume_sha256 (uploaded resume, see resume_store.py)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(students)")}
+    if 'resume_sha256' not in existing:
+        conn.execute("ALTER TABLE students ADD COLUMN resume_sha256 TEXT REFERENCES resume_files(sha256)")
+        conn.commit()
+
+def _migrate_job_deletion(conn):
+    """Adds jobs.deleted_at (set when a deletion is requested, see job_purge.py)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if 'deleted_at' not in existing:
+        conn.execute("ALTER TABLE jobs ADD COLUMN deleted_at TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_deleted ON jobs (deleted_at)")
+    conn.commit()
+
+# Columns whose change moves a row past the change-feed watermark (see change_feed.py;
+# the students/student_details ones feed text_match.py and eligibility_index.py)
+WATERMARKED_TABLES = {
+    'applications': ('job_id', 'student_id', 'status'),
+    'jobs': ('recruiter_id', 'company_id', 'title', 'location', 'eligibility', 'description', 'deleted_at'),
+    'students': ('branch', 'cgpa', 'skills'),
+    'student_details': ('internships', 'hackathons', 'projects', 'certificates'),
+}
+
+# Seconds re-read behind a watermark on every delta read: MySQL transactions can
+# commit out of timestamp order, and a read may land on a replica that is up to
+# REPLICA_MAX_LAG seconds behind the one the watermark came from
+WATERMARK_OVERLAP = REPLICA_MAX_LAG + 2
+
+def watermark_cutoff(db_type):
+    """SQL for 'the watermark minus WATERMARK_OVERLAP' (the watermark is bound as a parameter)."""
+    if db_type == 'mysql':
+        return f"%s - INTERVAL {WATERMARK_OVERLAP} SECOND"
+    return f"strftime('%Y-%m-%d %H:%M:%f', ?, '-{WATERMARK_OVERLAP} seconds')"
+
+def _migrate_change_watermarks(conn):
+    """Adds updated_at to the WATERMARKED_TABLES and the triggers that maintain it.
+
+    MySQL does this with ON UPDATE CURRENT_TIMESTAMP(3); SQLite needs triggers.
+    """
+    now = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+    for table, columns in WATERMARKED_TABLES.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if 'updated_at' not in existing:
+            # ADD COLUMN cannot take a non-constant default; the insert trigger covers new rows
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TEXT")
+            conn.execute(f"UPDATE {table} SET updated_at = {now}")
+        # The touch trigger is recreated so its column list follows WATERMARKED_TABLES
+        conn.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_stamp AFTER INSERT ON {table}
+        WHEN NEW.updated_at IS NULL
+        BEGIN
+            UPDATE {table} SET updated_at = {now} WHERE rowid = NEW.rowid;
+        END;
+        DROP TRIGGER IF EXISTS trg_{table}_touch;
+        CREATE TRIGGER trg_{table}_touch AFTER UPDATE OF {', '.join(columns)} ON {table}
+        BEGIN
+            UPDATE {table} SET updated_at = {now} WHERE rowid = NEW.rowid;
+        END;
+        """)
+    conn.executescript("""
+    CREATE INDEX IF NOT EXISTS idx_applications_job_updated ON applications (job_id, updated_at);
+    CREATE INDEX IF NOT EXISTS idx_applications_student_updated ON applications (student_id, updated_at);
+    CREATE INDEX IF NOT EXISTS idx_students_updated ON students (updated_at);
+    CREATE INDEX IF NOT EXISTS idx_student_details_updated ON student_details (updated_at);
+    """)
+    conn.commit()
+
+# --- QUERY PLAN DIAGNOSTICS ---
+# Problem -> weight used to rank the report (higher = look at it first)
+PLAN_FLAG_WEIGHTS = {'full scan': 3, 'correlated subquery': 2, 'temp sort': 1}
+
+
+def _plan_flags_sqlite(detail):
+    """Flags for one EXPLAIN QUERY PLAN line."""
+    flags = set()
+    # "SCAN t" reads the whole table; "SCAN t USING INDEX", constant rows and scans of
+    # materialized subqueries ("SCAN SUBQUERY 1" / "SCAN (subquery-1)") do not
+    if detail.startswith('SCAN ') and 'INDEX' not in detail and \
+            not detail.startswith(('SCAN CONSTANT ROW', 'SCAN SUBQUERY', 'SCAN (')):
+        flags.add('full scan')
+    if 'USE TEMP B-TREE' in detail:
+        flags.add('temp sort')
+    if 'CORRELATED' in detail:
+        flags.add('correlated subquery')
+    return flags
+
+
+def _plan_flags_mysql(row):
+    """Flags for one EXPLAIN row."""
+    flags = set()
+    extra = row.get('Extra') or ''
+    if row.get('type') == 'ALL':
+        flags.add('full scan')
+    if 'Using temporary' in extra or 'Using filesort' in extra:
+        flags.add('temp sort')
+    if (row.get('select_type') or '').startswith('DEPENDENT'):
+        flags.add('correlated subquery')
+    return flags
+
+
+class QueryPlanRecorder:
+    """Process-wide EXPLAIN capture for the statements execute_query runs.
+
+    While enabled, the first execution of each distinct statement is followed by an
+    EXPLAIN (MySQL) / EXPLAIN QUERY PLAN (SQLite) with the same parameters; later
+    executions only add to its call count and time.
+    """
+
+    EXPLAINABLE = ('select', 'with', 'update', 'delete')
+
+    def __init__(self, enabled=QUERY_PLAN_CAPTURE):
+        self.enabled = enabled
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def observe(self, conn, query, params, elapsed):
+        text = " ".join(query.split())
+        if not text.lower().startswith(self.EXPLAINABLE):
+            return
+        db_type = 'sqlite' if isinstance(conn, sqlite3.Connection) else 'mysql'
+        key = (db_type, text)
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is not None:
+                entry['calls'] += 1
+                entry['total_ms'] += elapsed * 1000
+                return
+            if len(self._plans) >= QUERY_PLAN_MAX_STATEMENTS:
+                return
+            # Reserve the slot so concurrent sessions explain it only once
+            entry = self._plans[key] = {'db_type': db_type, 'statement': text, 'calls': 1,
+                                        'total_ms': elapsed * 1000, 'plan': [], 'flags': set()}
+        try:
+            entry['plan'], entry['flags'] = self._explain(conn, db_type, query, params)
+        except Exception as e:
+            entry['plan'] = [f"EXPLAIN failed: {e}"]
+
+    @staticmethod
+    def _explain(conn, db_type, query, params):
+        if db_type == 'sqlite':
+            rows = conn.execute("EXPLAIN QUERY PLAN " + query.replace('%s', '?'), params).fetchall()
+            plan = [row[3] for row in rows]
+            return plan, set().union(*(_plan_flags_sqlite(line) for line in plan))
+
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("EXPLAIN " + query, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        plan = [f"{r.get('select_type')} {r.get('table')} type={r.get('type')} key={r.get('key')} "
+                f"rows={r.get('rows')} {r.get('Extra') or ''}".strip() for r in rows]
+        return plan, set().union(*(_plan_flags_mysql(r) for r in rows))
+
+    def report(self):
+        """Captured statements, worst first: by flag weight, then by total time."""
+        with self._lock:
+            entries = [dict(e) for e in self._plans.values()]
+        for e in entries:
+            e['weight'] = sum(PLAN_FLAG_WEIGHTS[f] for f in e['flags'])
+            e['flags'] = ", ".join(sorted(e['flags'], key=PLAN_FLAG_WEIGHTS.get, reverse=True))
+            e['avg_ms'] = round(e['total_ms'] / e['calls'], 2)
+            e['total_ms'] = round(e['total_ms'], 1)
+        return sorted(entries, key=lambda e: (e['weight'], e['total_ms']), reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+
+plan_recorder = QueryPlanRecorder()
+
+
+def execute_query(conn, query, params=(), fetch=False, commit=False, primary=False):
+    """General function to execute SQL queries.
+
+    When read replicas are configured, read-only fetches are sent to a replica
+    (see ReplicaRouter) unless `primary` is set; writes and everything else run
+    on `conn`, the primary.
+    With plan_recorder enabled, each distinct statement is also EXPLAINed once.
+    """
     if conn is None:
         return None
-        
+
+    start = time.perf_counter()
+    try:
+        result = _execute_query(conn, query, params, fetch, commit, primary)
+    finally:
+        elapsed = time.perf_counter() - start
+        _db_clock.seconds = db_time() + elapsed
+    if plan_recorder.enabled:
+        plan_recorder.observe(conn, query, params, elapsed)
+    return result
+
+def db_time():
+    """Seconds the calling thread has spent in execute_query, call_procedure and run_in_transaction."""
+    return getattr(_db_clock, 'seconds', 0.0)
+
+@contextmanager
+def _db_timed():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _db_clock.seconds = db_time() + time.perf_counter() - start
+
+def _execute_query(conn, query, params, fetch, commit, primary):
+    router = getattr(conn, 'replica_router', None)
+    read_only = is_read_only(query) and not commit
+    if router is not None and fetch and read_only and not primary:
+        replica = router.read_connection()
+        if replica is not conn:
+            try:
+                return _execute_on(replica, query, params, fetch, commit)
+            except Exception:
+                router.mark_failed(replica) # Fall through and retry on the primary
+
+    if commit and not read_only and _uses_single_writer(conn):
+        result = _execute_via_writer(conn, query, params, fetch)
+    else:
+        result = _execute_on(conn, query, params, fetch, commit)
+    if not read_only:
+        _note_write(conn, written_tables(query))
+    return result
+
+def written_tables(query):
+    """frozenset with the table a write statement targets, or None if it cannot tell."""
+    match = _WRITE_TARGET_RE.match(query)
+    return frozenset({match.group(1).lower()}) if match else None
+
+class _RecordingCursor:
+    """A transaction cursor that notes which tables its statements write."""
+
+    def __init__(self, cursor, tables):
+        self._cursor = cursor
+        self._tables = tables
+
+    def _record(self, query):
+        found = written_tables(query)
+        if found is not None:
+            self._tables.update(found)
+        elif not query.lstrip().lower().startswith(('select', 'with', 'show', 'pragma')):
+            self._tables.add(None) # Unknown target: listeners assume any table changed
+
+    def execute(self, query, params=()):
+        self._record(query)
+        return self._cursor.execute(query, params)
+
+    def executemany(self, query, seq_of_params):
+        self._record(query)
+        return self._cursor.executemany(query, seq_of_params)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+def add_write_listener(fn):
+    """Registers fn(tenant_id, tables), called after every write this process commits.
+
+    `tables` is a frozenset of the lower-case table names written, or None when
+    they are unknown (listeners should then assume any table changed).
+    """
+    _write_listeners.append(fn)
+
+def _note_write(conn, tables=None):
+    try:
+        conn.last_write_at = time.monotonic() # Lets caches refresh at once after the session's own writes
+    except AttributeError:
+        pass # A plain sqlite3.Connection takes no attributes; its caches just follow their own throttle
+    router = getattr(conn, 'replica_router', None)
+    if router is not None:
+        router.note_write()
+    if tables is not None and None in tables:
+        tables = None
+    elif tables is not None:
+        tables = frozenset(tables)
+    tenant_id = getattr(conn, 'tenant_id', DEFAULT_TENANT)
+    for listener in _write_listeners:
+        listener(tenant_id, tables)
+
+def _uses_single_writer(conn):
+    return SQLITE_SINGLE_WRITER and isinstance(conn, sqlite3.Connection)
+
+def _execute_via_writer(conn, query, params, fetch):
+    """Runs a committing SQLite statement on the file's single writer thread."""
+    query = query.replace('%s', '?')
+
+    def write(cursor):
+        cursor.execute(query, params)
+        if fetch:
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return True
+
+    # Raises WriteQueueFull when the queue is at capacity
+    return get_sqlite_writer(_sqlite_file(conn)).execute(write)
+
+def _execute_on(conn, query, params=(), fetch=False, commit=False):
+    """Runs one statement on a specific connection (no routing)."""
     try:
         # ✅ FIX: Use isinstance() to check the connection type correctly
-        # This resolves the AttributeError: 'CMySQLConnection' object has no attribute 'client_library'
-        if isinstance(conn, mysql.connector.MySQLConnection) or isinstance(conn, mysql.connector.CMySQLConnection):
+        # Anything that is not a sqlite3 connection is a MySQL connection (pure-Python
+        # or C extension), which also avoids importing mysql.connector here.
+        if not isinstance(conn, sqlite3.Connection):
             # This block is for MySQL
             cursor = conn.cursor(dictionary=True)
             cursor.execute(query, params)
@@ -153,4 +1159,105 @@ def execute_query(conn, query, params=(), fetch=False, commit=False):
         # This allows register.py to catch specific errors like 'Duplicate Entry'
         raise e 
         
-    return None
\ No newline at end of file
+    return None
+
+def iter_query(conn, query, params=(), batch_size=1000):
+    """Yields SELECT results in batches (lists of dicts) straight from the cursor.
+
+    Unlike execute_query(fetch=True), the full result set is never materialized,
+    so memory stays flat no matter how many rows the query returns.
+    """
+    if conn is None:
+        return
+
+    # Large exports are exactly the reads replicas are for
+    router = getattr(conn, 'replica_router', None)
+    if router is not None and is_read_only(query):
+        conn = router.read_connection()
+
+    if isinstance(conn, sqlite3.Connection):
+        query = query.replace('%s', '?')
+        cursor = conn.cursor()
+        as_dicts = False
+    else:
+        # MySQL cursors are unbuffered by default, so rows stay on the server until fetched
+        cursor = conn.cursor(dictionary=True)
+        as_dicts = True
+
+    try:
+        cursor.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows if as_dicts else [dict(zip(columns, row)) for row in rows]
+    finally:
+        cursor.close()
+
+class ProcedureUnavailable(RuntimeError):
+    """Raised when call_procedure is given a SQLite connection (SQLite has no stored procedures)."""
+
+def call_procedure(conn, proc_name, args=(), commit=False):
+    """Calls a MySQL stored procedure and returns every result set it produced.
+
+    The return value is a list of result sets, each a list of dicts (the same row
+    shape execute_query(fetch=True) returns). Stored procedures only exist on
+    MySQL; SQLite callers use transaction() with the equivalent statements.
+    """
+    if conn is None:
+        return None
+    if isinstance(conn, sqlite3.Connection):
+        raise ProcedureUnavailable(f"Stored procedure '{proc_name}' needs a MySQL connection.")
+
+    with _db_timed():
+        cursor = conn.cursor()
+        try:
+            cursor.callproc(proc_name, args)
+            result_sets = []
+            for result in cursor.stored_results():
+                columns = result.column_names
+                result_sets.append([row if isinstance(row, dict) else dict(zip(columns, row)) for row in result.fetchall()])
+            if commit:
+                conn.commit()
+        finally:
+            cursor.close()
+
+    if commit:
+        _note_write(conn, PROCEDURE_TABLES.get(proc_name))
+    return result_sets
+
+def run_in_transaction(conn, fn):
+    """Runs fn(cursor) atomically and returns its result.
+
+    On SQLite the work is handed to the single writer thread (so it is part of a
+    group commit); elsewhere it runs inside transaction(conn).
+    """
+    with _db_timed():
+        if _uses_single_writer(conn):
+            tables = set()
+            result = get_sqlite_writer(_sqlite_file(conn)).execute(lambda cursor: fn(_RecordingCursor(cursor, tables)))
+            _note_write(conn, tables)
+            return result
+        with transaction(conn) as cursor:
+            return fn(cursor)
+
+@contextmanager
+def transaction(conn):
+    """Yields a cursor whose statements commit together or roll back together.
+
+    Statements run on the primary; use the backend's own placeholder style
+    ('%s' for MySQL, '?' for SQLite) since no rewriting happens here.
+    """
+    cursor = conn.cursor()
+    tables = set()
+    try:
+        yield _RecordingCursor(cursor, tables)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    _note_write(conn, tables)
@@ -0,0 +1,209 @@
+# CareerSphere/eligibility_index.py
+# Live "how many students qualify" count for recruiters drafting a job.
+#
+# Each campus keeps one EligibilityIndex per process (database.tenant_cache): CGPAs
+# sorted in a numpy array (a minimum CGPA is one searchsorted away) plus an id set
+# per branch and per skill, so a count is a couple of set intersections instead of
+# a query. The index re-reads only students past the students.updated_at watermark
+# (see database.WATERMARKED_TABLES), at once after a write by this process and at
+# most ELIGIBILITY_MAX_AGE seconds late for writes from elsewhere.
+
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from database import DEFAULT_TENANT, add_write_listener, execute_query, iter_query, tenant_cache, watermark_cutoff
+
+# Seconds the index is trusted without checking the watermark
+ELIGIBILITY_MAX_AGE = 30
+ELIGIBILITY_BATCH_SIZE = 5000
+
+STUDENT_QUERY = "SELECT id, cgpa, branch, skills, updated_at FROM students {since}"
+
+# Pieces of a job's eligibility text (see parse_eligibility)
+_CGPA_RE = re.compile(r"CGPA\s*(?:>=?|≥)\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_BRANCH_RE = re.compile(r"Branch(?:es)?\s*:\s*([^,;\n]+)", re.IGNORECASE)
+_SKILLS_LABEL_RE = re.compile(r"Skills?\s*:", re.IGNORECASE)
+
+# Tables whose writes can change a student's eligibility (users: deletes cascade to students)
+ELIGIBILITY_TABLES = frozenset({'students', 'users'})
+
+# tenant_id -> writes to ELIGIBILITY_TABLES committed by this process so far
+_writes = defaultdict(int)
+
+
+def _count_write(tenant_id, tables):
+    if tables is None or tables & ELIGIBILITY_TABLES:
+        _writes[tenant_id] += 1
+
+
+add_write_listener(_count_write)
+
+
+def parse_skills(text):
+    """Normalized skill names from a comma / slash separated list."""
+    return frozenset(s.strip().lower() for s in re.split(r'[,/;]', text or '') if s.strip())
+
+
+def normalize_branch(branch):
+    return (branch or '').strip().upper()
+
+
+def parse_eligibility(text):
+    """(min_cgpa, branches, skills) of an eligibility text, e.g. one eligibility_text() wrote."""
+    text = text or ''
+    cgpa = _CGPA_RE.search(text)
+    branch = _BRANCH_RE.search(text)
+    branches = [normalize_branch(b) for b in re.split(r'[/|]', branch.group(1)) if b.strip()] if branch else []
+    rest = _SKILLS_LABEL_RE.sub(',', _BRANCH_RE.sub(',', _CGPA_RE.sub(',', text)))
+    return (float(cgpa.group(1)) if cgpa else None), branches, sorted(parse_skills(rest))
+
+
+class EligibilityIndex:
+    """Sorted CGPAs and per-branch / per-skill student id sets of one campus."""
+
+    def __init__(self):
+        self.students = {}          # id -> (cgpa, branch, skills)
+        self.watermark = None
+        self.checked_at = 0.0
+        self.writes_seen = None
+        self._view = None           # Immutable lookup structures, swapped whole on change
+        self._lock = threading.Lock()
+
+    def refresh(self, conn, db_type, writes):
+        """Applies students changed since the last refresh (if due); returns how many."""
+        with self._lock:
+            if writes == self.writes_seen and time.monotonic() - self.checked_at < ELIGIBILITY_MAX_AGE:
+                return 0
+            full = self.watermark is None
+            changed = self._read(conn, db_type)
+            # Deleted students never show up as changes; a count mismatch forces a reload
+            if not full and len(self.students) != _student_count(conn):
+                self.students, self.watermark = {}, None
+                changed = self._read(conn, db_type)
+            if changed or self._view is None:
+                self._view = self._build()
+            self.checked_at = time.monotonic()
+            self.writes_seen = writes
+            return changed
+
+    def _read(self, conn, db_type):
+        if self.watermark is None:
+            query, params = STUDENT_QUERY.format(since=''), ()
+        else:
+            query, params = STUDENT_QUERY.format(since=f"WHERE updated_at >= {watermark_cutoff(db_type)}"), (self.watermark,)
+        changed = 0
+        for batch in iter_query(conn, query, params, batch_size=ELIGIBILITY_BATCH_SIZE):
+            for row in batch:
+                entry = (float(row['cgpa'] or 0.0), normalize_branch(row['branch']), parse_skills(row['skills']))
+                if self.students.get(row['id']) != entry:
+                    self.students[row['id']] = entry
+                    changed += 1
+                if row['updated_at'] is not None:
+                    self.watermark = row['updated_at'] if self.watermark is None else max(self.watermark, row['updated_at'])
+        return changed
+
+    def _build(self):
+        import numpy as np # Lazy import
+        ids = np.fromiter(self.students.keys(), dtype=np.int64, count=len(self.students))
+        cgpas = np.fromiter((s[0] for s in self.students.values()), dtype=np.float64, count=len(self.students))
+        order = np.argsort(cgpas, kind='stable')
+        branches, skills = defaultdict(set), defaultdict(set)
+        for student_id, (_, branch, student_skills) in self.students.items():
+            if branch:
+                branches[branch].add(student_id)
+            for skill in student_skills:
+                skills[skill].add(student_id)
+        return {
+            'ids': ids[order],
+            'cgpa': cgpas[order],
+            'cgpa_by_id': {student_id: entry[0] for student_id, entry in self.students.items()},
+            'branches': dict(branches),
+            'skills': dict(skills),
+            'skill_counts': Counter({skill: len(ids) for skill, ids in skills.items()}),
+        }
+
+    # --- lookups ---
+    @staticmethod
+    def _pool(view, branches, skills):
+        sets = []
+        if branches:
+            sets.append(set().union(*(view['branches'].get(normalize_branch(b), ()) for b in branches)))
+        sets.extend(view['skills'].get(skill.strip().lower(), set()) for skill in skills)
+        sets.sort(key=len) # Intersect starting from the smallest set
+        return sets[0].intersection(*sets[1:])
+
+    def count(self, min_cgpa=None, branches=(), skills=()):
+        """Students with CGPA >= min_cgpa, in any of `branches`, having every one of `skills`."""
+        import numpy as np # Lazy import
+        view = self._view
+        if view is None:
+            return 0
+        start = int(np.searchsorted(view['cgpa'], min_cgpa, side='left')) if min_cgpa else 0
+        if not branches and not skills:
+            return len(view['ids']) - start
+        pool = self._pool(view, branches, skills)
+        if not start:
+            return len(pool)
+        return sum(1 for student_id in pool if view['cgpa_by_id'][student_id] >= min_cgpa)
+
+    def matching(self, min_cgpa=None, branches=(), skills=()):
+        """Ids of the students count() counts, as a numpy int64 array."""
+        import numpy as np # Lazy import
+        view = self._view
+        if view is None:
+            return np.zeros(0, dtype=np.int64)
+        start = int(np.searchsorted(view['cgpa'], min_cgpa, side='left')) if min_cgpa else 0
+        if not branches and not skills:
+            return view['ids'][start:]
+        pool = self._pool(view, branches, skills)
+        if start:
+            pool = (student_id for student_id in pool if view['cgpa_by_id'][student_id] >= min_cgpa)
+        return np.fromiter(pool, dtype=np.int64)
+
+    def eligible_for(self, eligibility):
+        """Ids of the students meeting a job's eligibility text (see parse_eligibility).
+
+        Only listed skills some student has count as requirements; free text such as
+        'good communication' would otherwise rule everyone out.
+        """
+        min_cgpa, branches, skills = parse_eligibility(eligibility)
+        known = self._view['skills'] if self._view else {}
+        return self.matching(min_cgpa, branches, [skill for skill in skills if skill in known])
+
+    def branch_names(self):
+        return sorted(self._view['branches']) if self._view else []
+
+    def top_skills(self, limit=50):
+        return [skill for skill, _ in self._view['skill_counts'].most_common(limit)] if self._view else []
+
+    def __len__(self):
+        return len(self.students)
+
+
+def _student_count(conn):
+    data = execute_query(conn, "SELECT COUNT(*) AS n FROM students", fetch=True)
+    return data[0]['n'] if data else 0
+
+
+def get_eligibility_index(conn, db_type):
+    """The campus's EligibilityIndex, refreshed first if it is due."""
+    tenant_id = getattr(conn, 'tenant_id', DEFAULT_TENANT)
+    index = tenant_cache(tenant_id, 'eligibility').setdefault('index', EligibilityIndex())
+    index.refresh(conn, db_type, _writes[tenant_id])
+    return index
+
+
+def eligibility_text(min_cgpa, branches, skills):
+    """Eligibility criteria for the job posting, e.g. 'CGPA > 7.5, python, sql, Branch: CSE/IT'.
+
+    Skills are listed bare so the shortlisting score's keyword match picks up each one.
+    """
+    parts = []
+    if min_cgpa:
+        parts.append(f"CGPA > {min_cgpa:g}")
+    parts.extend(skills)
+    if branches:
+        parts.append(f"Branch: {'/'.join(branches)}")
+    return ", ".join(parts)
@@ -0,0 +1,139 @@
+# CareerSphere/exports.py
+# Streaming applicant export (CSV / Parquet) shared by the recruiter pages.
+
+import csv
+import io
+import tempfile
+
+import streamlit as st
+from database import iter_query
+
+# Rows pulled from the cursor per round trip while exporting
+EXPORT_BATCH_SIZE = 1000
+
+# Rows kept in memory before the export file spills over to disk
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Export label -> (SQL expression, value type used for the Parquet schema)
+APPLICANT_EXPORT_COLUMNS = {
+    'app_id': ('a.id', 'int'),
+    'full_name': ('s.full_name', 'str'),
+    'roll_no': ('s.roll_no', 'str'),
+    'branch': ('s.branch', 'str'),
+    'cgpa': ('s.cgpa', 'float'),
+    'skills': ('s.skills', 'str'),
+    'status': ('a.status', 'str'),
+    'applied_at': ('a.applied_at', 'str'),
+    'resume_url': ('s.resume_url', 'str'),
+}
+
+APPLICATION_STATUSES = ['applied', 'shortlisted', 'rejected', 'accepted']
+
+
+def build_applicant_export_query(db_type, job_id, columns, statuses=None, min_cgpa=None):
+    """Builds the applicant export SELECT with column selection and filters pushed into SQL."""
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    select_list = ", ".join(f"{APPLICANT_EXPORT_COLUMNS[col][0]} AS {col}" for col in columns)
+    conditions = [f"a.job_id = {ph}"]
+    params = [job_id]
+
+    if statuses:
+        conditions.append(f"a.status IN ({', '.join([ph] * len(statuses))})")
+        params.extend(statuses)
+    if min_cgpa:
+        conditions.append(f"s.cgpa >= {ph}")
+        params.append(min_cgpa)
+
+    query = f"""
+    SELECT {select_list}
+    FROM applications a
+    JOIN students s ON a.student_id = s.id
+    WHERE {' AND '.join(conditions)}
+    ORDER BY a.applied_at DESC
+    """
+    return query, tuple(params)
+
+
+def _convert(value, value_type):
+    """Normalizes DB values (Decimal, datetime, ...) to plain Python types."""
+    if value is None:
+        return None
+    if value_type == 'int':
+        return int(value)
+    if value_type == 'float':
+        return float(value)
+    return str(value)
+
+
+def export_csv(conn, query, params, columns):
+    """Streams query results into a spooled CSV file and returns it rewound."""
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES, mode='w+b')
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(columns)
+
+    for batch in iter_query(conn, query, params, batch_size=EXPORT_BATCH_SIZE):
+        writer.writerows([row[col] for col in columns] for row in batch)
+
+    text.flush()
+    text.detach()  # Keep the underlying binary file open for the download
+    out.seek(0)
+    return out
+
+
+def export_parquet(conn, query, params, columns):
+    """Streams query results into a spooled Parquet file, one row group per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string()}
+    schema = pa.schema([(col, arrow_types[APPLICANT_EXPORT_COLUMNS[col][1]]) for col in columns])
+
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES, mode='w+b')
+    with pq.ParquetWriter(out, schema) as writer:
+        for batch in iter_query(conn, query, params, batch_size=EXPORT_BATCH_SIZE):
+            arrays = [
+                pa.array([_convert(row[col], APPLICANT_EXPORT_COLUMNS[col][1]) for row in batch], type=schema.field(col).type)
+                for col in columns
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    out.seek(0)
+    return out
+
+
+def applicant_export_widget(conn, db_type, job_id, job_title, key_prefix):
+    """Renders the export controls for one job; the file is only built when the user clicks download."""
+    with st.expander("⬇️ Export Applicants (CSV / Parquet)"):
+        columns = st.multiselect(
+            "Columns", list(APPLICANT_EXPORT_COLUMNS.keys()),
+            default=['app_id', 'full_name', 'roll_no', 'branch', 'cgpa', 'status'],
+            key=f"{key_prefix}_export_cols",
+        )
+        col1, col2, col3 = st.columns(3)
+        statuses = col1.multiselect("Status", APPLICATION_STATUSES, key=f"{key_prefix}_export_status")
+        min_cgpa = col2.number_input("Min CGPA", min_value=0.0, max_value=10.0, value=0.0, step=0.1, key=f"{key_prefix}_export_cgpa")
+        file_format = col3.radio("Format", ["CSV", "Parquet"], horizontal=True, key=f"{key_prefix}_export_format")
+
+        if not columns:
+            st.info("Select at least one column to export.")
+            return
+
+        query, params = build_applicant_export_query(db_type, job_id, columns, statuses, min_cgpa)
+        safe_title = "".join(c if c.isalnum() else "_" for c in job_title).strip("_") or "job"
+
+        if file_format == "Parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                st.warning("Parquet export needs `pyarrow` (pip install pyarrow). Use CSV instead.")
+                return
+            data, mime, ext = (lambda: export_parquet(conn, query, params, columns)), "application/vnd.apache.parquet", "parquet"
+        else:
+            data, mime, ext = (lambda: export_csv(conn, query, params, columns)), "text/csv", "csv"
+
+        # Passing a callable defers the export until the button is clicked
+        st.download_button(
+            f"Download {file_format}", data=data, file_name=f"applicants_{safe_title}_{job_id}.{ext}",
+            mime=mime, on_click="ignore", key=f"{key_prefix}_export_btn",
+        )
@@ -0,0 +1,201 @@
+# CareerSphere/funnel_rollups.py
+# Placement-funnel rollups: applied / shortlisted / accepted / rejected per day, job
+# and branch, kept in funnel_daily.
+#
+# The audit triggers log every new application and every status change. Each
+# refresh consumes only the audit_logs rows past the high-water mark stored in
+# rollup_state (last consumed id), adds their counts onto funnel_daily and moves the
+# mark, in one transaction. The trend view reads funnel_daily alone, never the
+# applications or audit_logs tables.
+#
+#   CLI:  python funnel_rollups.py [campus]   (bring the rollups up to date)
+
+from datetime import date, timedelta
+
+from database import execute_query, run_in_transaction
+
+ROLLUP_NAME = 'funnel_daily'
+# audit_logs rows consumed per transaction
+ROLLUP_BATCH_SIZE = 5000
+# MySQL hands out AUTO_INCREMENT ids before commit, so a slow transaction can commit
+# an id below ones already visible; rows younger than this are left for the next run
+ROLLUP_SETTLE_SECONDS = 5
+
+FUNNEL_COLUMNS = ('applied', 'shortlisted', 'accepted', 'rejected')
+
+# Dimension shown by the trend view -> (label SQL, GROUP BY, join)
+FUNNEL_DIMENSIONS = {
+    'Company': ("COALESCE(c.name, 'Unknown company')", "f.company_id, c.name",
+                "LEFT JOIN companies c ON c.id = f.company_id"),
+    'Branch': ("CASE WHEN f.branch = '' THEN 'Not set' ELSE f.branch END", "f.branch", ""),
+    'Job': ("COALESCE(j.title, aj.title, 'Deleted job')", "f.job_id, j.title, aj.title",
+            "LEFT JOIN jobs j ON j.id = f.job_id LEFT JOIN archived_jobs aj ON aj.id = f.job_id"),
+}
+
+# New audit events per (day, job, company, branch); dimensions are resolved through
+# the application, so events of since-deleted applications are skipped. Applications
+# and jobs a closed season archived before their events were consumed (MySQL's
+# settle window) are read from the archive tables.
+EVENTS_QUERY = """
+SELECT DATE(l.created_at), COALESCE(a.job_id, aa.job_id), COALESCE(j.company_id, aj.company_id), COALESCE(s.branch, ''),
+       SUM(l.action = 'INSERT'), SUM(l.action = 'STATUS shortlisted'),
+       SUM(l.action = 'STATUS accepted'), SUM(l.action = 'STATUS rejected')
+FROM audit_logs l
+LEFT JOIN applications a ON a.id = l.entity_id
+LEFT JOIN archived_applications aa ON a.id IS NULL AND aa.id = l.entity_id
+LEFT JOIN jobs j ON j.id = COALESCE(a.job_id, aa.job_id)
+LEFT JOIN archived_jobs aj ON j.id IS NULL AND aj.id = COALESCE(a.job_id, aa.job_id)
+JOIN students s ON s.id = COALESCE(a.student_id, aa.student_id)
+WHERE l.entity = 'applications' AND l.id > {ph} AND l.id <= {ph} AND COALESCE(j.id, aj.id) IS NOT NULL
+GROUP BY DATE(l.created_at), COALESCE(a.job_id, aa.job_id), COALESCE(j.company_id, aj.company_id), COALESCE(s.branch, '')
+"""
+
+# First run: the applications that predate the rollup. Only the current status is
+# known, so it is counted on the day the application last changed.
+BOOTSTRAP_QUERIES = (
+    """
+    SELECT DATE(a.applied_at), a.job_id, j.company_id, COALESCE(s.branch, ''), COUNT(*), 0, 0, 0
+    FROM applications a JOIN jobs j ON j.id = a.job_id JOIN students s ON s.id = a.student_id
+    GROUP BY DATE(a.applied_at), a.job_id, j.company_id, COALESCE(s.branch, '')
+    """,
+    """
+    SELECT DATE(a.updated_at), a.job_id, j.company_id, COALESCE(s.branch, ''), 0,
+           SUM(a.status = 'shortlisted'), SUM(a.status = 'accepted'), SUM(a.status = 'rejected')
+    FROM applications a JOIN jobs j ON j.id = a.job_id JOIN students s ON s.id = a.student_id
+    WHERE a.status <> 'applied'
+    GROUP BY DATE(a.updated_at), a.job_id, j.company_id, COALESCE(s.branch, '')
+    """,
+)
+
+
+class _StaleMark(Exception):
+    """Another refresh moved the high-water mark first; this one rolls back."""
+
+
+def _upsert_query(db_type, ph):
+    cols = "day, job_id, company_id, branch, " + ", ".join(FUNNEL_COLUMNS)
+    values = ", ".join([ph] * (4 + len(FUNNEL_COLUMNS)))
+    if db_type == 'mysql':
+        add = ", ".join(f"{col} = {col} + VALUES({col})" for col in FUNNEL_COLUMNS)
+        return f"INSERT INTO funnel_daily ({cols}) VALUES ({values}) ON DUPLICATE KEY UPDATE {add}"
+    add = ", ".join(f"{col} = {col} + excluded.{col}" for col in FUNNEL_COLUMNS)
+    return f"INSERT INTO funnel_daily ({cols}) VALUES ({values}) ON CONFLICT(day, job_id, branch) DO UPDATE SET {add}"
+
+
+def _add_counts(cursor, db_type, ph, rows):
+    rows = [(str(r[0]), r[1], r[2], r[3], *(int(n or 0) for n in r[4:])) for r in rows]
+    if rows:
+        cursor.executemany(_upsert_query(db_type, ph), rows)
+
+
+def _consume_batch(conn, db_type):
+    """Rolls up the next batch of audit events; returns how many audit rows it consumed."""
+    ph = '%s' if db_type == 'mysql' else '?'
+    if db_type == 'mysql':
+        next_ids = f"""
+        SELECT COUNT(*), MAX(id) FROM (
+            SELECT id FROM audit_logs
+            WHERE id > %s AND created_at < NOW() - INTERVAL {ROLLUP_SETTLE_SECONDS} SECOND
+            ORDER BY id LIMIT {ROLLUP_BATCH_SIZE}
+        ) AS batch
+        """
+    else:
+        # The single SQLite writer commits ids in order, so there is nothing to wait for
+        next_ids = f"SELECT COUNT(*), MAX(id) FROM (SELECT id FROM audit_logs WHERE id > ? ORDER BY id LIMIT {ROLLUP_BATCH_SIZE})"
+
+    def consume(cursor):
+        # fetchall() throughout: MySQL's unbuffered cursors refuse a new execute with rows left unread
+        cursor.execute(f"SELECT last_id FROM rollup_state WHERE name = {ph}", (ROLLUP_NAME,))
+        rows = cursor.fetchall()
+        if not rows:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM audit_logs")
+            mark = int(cursor.fetchall()[0][0])
+            insert = "INSERT IGNORE INTO" if db_type == 'mysql' else "INSERT OR IGNORE INTO"
+            cursor.execute(f"{insert} rollup_state (name, last_id) VALUES ({ph}, {ph})", (ROLLUP_NAME, mark))
+            if cursor.rowcount != 1:
+                raise _StaleMark()
+            for query in BOOTSTRAP_QUERIES:
+                cursor.execute(query)
+                _add_counts(cursor, db_type, ph, cursor.fetchall())
+            return 0
+
+        last_id = int(rows[0][0])
+        cursor.execute(next_ids, (last_id,))
+        count, upper = cursor.fetchall()[0]
+        if not count:
+            return 0
+        cursor.execute(EVENTS_QUERY.format(ph=ph), (last_id, upper))
+        _add_counts(cursor, db_type, ph, cursor.fetchall())
+        cursor.execute(f"UPDATE rollup_state SET last_id = {ph} WHERE name = {ph} AND last_id = {ph}",
+                       (upper, ROLLUP_NAME, last_id))
+        if cursor.rowcount != 1:
+            raise _StaleMark()
+        return int(count)
+
+    try:
+        return run_in_transaction(conn, consume)
+    except _StaleMark:
+        return 0
+
+
+def refresh_funnel(conn, db_type):
+    """Brings funnel_daily up to date with audit_logs; returns how many audit rows were consumed."""
+    total = 0
+    while True:
+        consumed = _consume_batch(conn, db_type)
+        total += consumed
+        if consumed < ROLLUP_BATCH_SIZE:
+            return total
+
+
+# --- READS (funnel_daily only) ---
+def _since(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def _frame(rows, columns):
+    import pandas as pd # Lazy import
+    df = pd.DataFrame(rows or [], columns=columns)
+    for col in FUNNEL_COLUMNS:
+        df[col] = df[col].fillna(0).astype(int)
+    return df
+
+
+def funnel_trend(conn, days=30):
+    """DataFrame(day, applied, shortlisted, accepted, rejected) for the last `days` days."""
+    sums = ", ".join(f"SUM({col}) AS {col}" for col in FUNNEL_COLUMNS)
+    query = f"SELECT day, {sums} FROM funnel_daily WHERE day >= %s GROUP BY day ORDER BY day"
+    df = _frame(execute_query(conn, query, (_since(days),), fetch=True), ['day', *FUNNEL_COLUMNS])
+    if not df.empty:
+        import pandas as pd
+        df['day'] = pd.to_datetime(df['day'])
+    return df
+
+
+def funnel_breakdown(conn, dimension, days=30):
+    """DataFrame(label, counts..., shortlist_rate, accept_rate) per `dimension` (see FUNNEL_DIMENSIONS)."""
+    label, group_by, join = FUNNEL_DIMENSIONS[dimension]
+    sums = ", ".join(f"SUM(f.{col}) AS {col}" for col in FUNNEL_COLUMNS)
+    query = f"""
+    SELECT {label} AS label, {sums}
+    FROM funnel_daily f {join}
+    WHERE f.day >= %s
+    GROUP BY {group_by}
+    """
+    df = _frame(execute_query(conn, query, (_since(days),), fetch=True), ['label', *FUNNEL_COLUMNS])
+    applied = df['applied'].where(df['applied'] > 0)
+    df['shortlist_rate'] = (df['shortlisted'] / applied).fillna(0).round(3)
+    df['accept_rate'] = (df['accepted'] / applied).fillna(0).round(3)
+    return df.sort_values('applied', ascending=False)
+
+
+if __name__ == '__main__':
+    import sys
+    from database import DEFAULT_TENANT, open_background_connection
+
+    tenant = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TENANT
+    db_conn, backend = open_background_connection(tenant)
+    try:
+        print(f"Consumed {refresh_funnel(db_conn, backend)} audit rows for '{tenant}' ({backend}).")
+    finally:
+        db_conn.close()
@@ -0,0 +1,425 @@
+# CareerSphere/interview_scheduler.py
+# Interview scheduling for shortlisted applicants.
+#
+# A recruiter defines interview slots for a job (interview_slots; capacity = parallel
+# panels). schedule_job() books the job's shortlisted, not yet booked applicants into
+# them (interview_assignments) so that no student ends up with two overlapping
+# interviews, whichever companies they are with. It is a bipartite matching,
+# applicants x slots with an edge wherever the slot does not clash with the
+# student's existing interviews, solved as a maximum matching:
+#   1. greedy pass in application order, each applicant takes the earliest free slot
+#   2. Hopcroft-Karp augmenting phases (slots with capacity > 1 are kept as one node
+#      holding several applicants) book whoever the greedy pass left out, if possible
+# is_maximum() re-checks a result with a plain augmenting-path search; the CLI runs
+# it on the benchmark and on random small instances.
+# The matching runs outside any transaction; the booking transaction then re-checks
+# every proposal against the interviews committed meanwhile and skips the clashes.
+# Only shortlisted applications hold a booking: set_application_status() cancels it
+# in the same transaction that moves an application out of 'shortlisted'.
+#
+#   CLI:  python interview_scheduler.py [applicants] [slots] [capacity]   (matching benchmark)
+
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from database import execute_query, run_in_transaction
+
+SLOT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Ids per IN (...) list when reading or locking students
+SCHEDULE_BATCH_SIZE = 500
+
+_UNREACHED = float('inf')
+
+
+def _as_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _clashes(busy, start, end):
+    return any(b_start < end and start < b_end for b_start, b_end in busy)
+
+
+# --- MATCHING ---
+def match_slots(applicants, slots, busy):
+    """Maximum clash-free assignment of applicants to slots.
+
+    applicants: [(application_id, student_id)] in booking priority order
+    slots:      [(slot_id, starts_at, ends_at, free_places)] in time order
+    busy:       {student_id: [(starts_at, ends_at)]} interviews the students already have
+    Returns {application_id: slot_id}.
+    """
+    capacity = [free for _, _, _, free in slots]
+    open_slots = [j for j, free in enumerate(capacity) if free > 0]
+    adj = []
+    for _, student_id in applicants:
+        intervals = busy.get(student_id)
+        if not intervals:
+            adj.append(open_slots) # Shared list: most students have no other interviews
+        else:
+            adj.append([j for j in open_slots if not _clashes(intervals, slots[j][1], slots[j][2])])
+
+    booked = [[] for _ in slots]   # slot -> applicant indexes
+    slot_of = [None] * len(applicants)
+
+    # 1. Greedy: earliest free slot, in priority order
+    for u, edges in enumerate(adj):
+        for j in edges:
+            if len(booked[j]) < capacity[j]:
+                booked[j].append(u)
+                slot_of[u] = j
+                break
+
+    # 2. Hopcroft-Karp phases over the applicants left unbooked
+    while True:
+        free = [u for u in range(len(applicants)) if slot_of[u] is None and adj[u]]
+        if not free:
+            break
+        dist = _layers(free, adj, booked, capacity)
+        if dist is None:
+            break
+        augmented = sum(_augment(u, adj, booked, capacity, slot_of, dist) for u in free)
+        if not augmented:
+            break
+
+    return {applicants[u][0]: slots[j][0] for u, j in enumerate(slot_of) if j is not None}
+
+
+def _layers(free, adj, booked, capacity):
+    """BFS layers from the unbooked applicants; None if no slot with room is reachable."""
+    dist = {u: 0 for u in free}
+    queue = deque(free)
+    reachable = False
+    while queue:
+        u = queue.popleft()
+        for j in adj[u]:
+            if len(booked[j]) < capacity[j]:
+                reachable = True
+            elif not reachable: # Only the shortest augmenting paths are used in a phase
+                for w in booked[j]:
+                    if w not in dist:
+                        dist[w] = dist[u] + 1
+                        queue.append(w)
+    return dist if reachable else None
+
+
+def _augment(root, adj, booked, capacity, slot_of, dist):
+    """Iterative DFS along the layers for one augmenting path from `root`; True if it moved anyone."""
+    frames = [[root, 0, 0]] # applicant, position in adj, position in the slot's booked list
+    while frames:
+        frame = frames[-1]
+        u, i, k = frame
+        edges = adj[u]
+        descended = False
+        while i < len(edges):
+            j = edges[i]
+            if len(booked[j]) < capacity[j]:
+                frame[1] = i
+                _apply_path(frames, booked, slot_of, j)
+                return True
+            members = booked[j]
+            while k < len(members):
+                w = members[k]
+                k += 1
+                if dist.get(w) == dist[u] + 1:
+                    frame[1], frame[2] = i, k
+                    frames.append([w, 0, 0])
+                    descended = True
+                    break
+            if descended:
+                break
+            i, k = i + 1, 0
+        if not descended:
+            dist[u] = _UNREACHED # Dead end for the rest of this phase
+            frames.pop()
+    return False
+
+
+def _apply_path(frames, booked, slot_of, free_slot):
+    """Shifts everyone on the path one slot along: the last applicant takes the free slot."""
+    target = free_slot
+    for u, _, _ in reversed(frames):
+        previous = slot_of[u]
+        if previous is not None:
+            booked[previous].remove(u)
+        booked[target].append(u)
+        slot_of[u] = target
+        target = previous # The applicant before this one on the path moves in here
+
+
+def is_maximum(applicants, slots, busy, assignment):
+    """True if `assignment` (as match_slots returns it) is clash-free, within capacity and maximum.
+
+    Independent of match_slots: a breadth-first search for an augmenting path from any
+    unbooked applicant, alternating free edges into slots and booked edges back out.
+    """
+    times = {slot_id: (start, end) for slot_id, start, end, _ in slots}
+    room = {slot_id: free for slot_id, _, _, free in slots}
+    members = {slot_id: [] for slot_id in times}
+    student_of = dict(applicants)
+    for app_id, slot_id in assignment.items():
+        if app_id not in student_of or slot_id not in times:
+            return False
+        if _clashes(busy.get(student_of[app_id], ()), *times[slot_id]):
+            return False
+        members[slot_id].append(app_id)
+        room[slot_id] -= 1
+    if any(free < 0 for free in room.values()):
+        return False
+
+    def edges(app_id):
+        intervals = busy.get(student_of[app_id], ())
+        return [slot_id for slot_id, _, _, free in slots if free > 0 and not _clashes(intervals, *times[slot_id])]
+
+    seen_apps = {app_id for app_id, _ in applicants if app_id not in assignment}
+    seen_slots = set()
+    queue = deque(seen_apps)
+    while queue:
+        app_id = queue.popleft()
+        for slot_id in edges(app_id):
+            if slot_id in seen_slots or slot_id == assignment.get(app_id):
+                continue
+            if room[slot_id] > 0:
+                return False # Augmenting path: one more applicant could be booked
+            seen_slots.add(slot_id)
+            for other in members[slot_id]:
+                if other not in seen_apps:
+                    seen_apps.add(other)
+                    queue.append(other)
+    return True
+
+
+# --- SLOTS ---
+def add_slots(conn, db_type, job_id, first_start, minutes, count, capacity=1, gap_minutes=0):
+    """Adds `count` consecutive slots of `minutes` each (with `gap_minutes` between); returns how many."""
+    ph = '%s' if db_type == 'mysql' else '?'
+    rows = []
+    start = first_start
+    for _ in range(count):
+        end = start + timedelta(minutes=minutes)
+        rows.append((job_id, start.strftime(SLOT_TIME_FORMAT), end.strftime(SLOT_TIME_FORMAT), capacity))
+        start = end + timedelta(minutes=gap_minutes)
+
+    def insert(cursor):
+        cursor.executemany(f"INSERT INTO interview_slots (job_id, starts_at, ends_at, capacity) VALUES ({ph}, {ph}, {ph}, {ph})", rows)
+        return len(rows)
+
+    return run_in_transaction(conn, insert)
+
+
+def remove_empty_slots(conn, db_type, job_id):
+    """Deletes the job's slots nobody is booked into; returns how many."""
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def delete(cursor):
+        cursor.execute(f"""
+        DELETE FROM interview_slots
+        WHERE job_id = {ph} AND id NOT IN (SELECT slot_id FROM interview_assignments)
+        """, (job_id,))
+        return cursor.rowcount
+
+    return run_in_transaction(conn, delete)
+
+
+def clear_schedule(conn, db_type, job_id):
+    """Cancels every booking of the job (its slots stay); returns how many."""
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def delete(cursor):
+        cursor.execute(f"DELETE FROM interview_assignments WHERE slot_id IN (SELECT id FROM interview_slots WHERE job_id = {ph})", (job_id,))
+        return cursor.rowcount
+
+    return run_in_transaction(conn, delete)
+
+
+def set_application_status(conn, db_type, app_id, status):
+    """Sets an application's status, cancelling its interview unless it stays shortlisted.
+
+    Returns False if there is no such application.
+    """
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def update(cursor):
+        cursor.execute(f"UPDATE applications SET status = {ph} WHERE id = {ph}", (status, app_id))
+        if not cursor.rowcount:
+            return False
+        if status != 'shortlisted':
+            cursor.execute(f"DELETE FROM interview_assignments WHERE application_id = {ph}", (app_id,))
+        return True
+
+    return run_in_transaction(conn, update)
+
+
+def job_slots(conn, job_id):
+    """The job's slots in time order, with how many applicants each has booked."""
+    query = """
+    SELECT s.id, s.starts_at, s.ends_at, s.capacity, COUNT(a.id) AS booked
+    FROM interview_slots s
+    LEFT JOIN interview_assignments a ON a.slot_id = s.id
+    WHERE s.job_id = %s
+    GROUP BY s.id, s.starts_at, s.ends_at, s.capacity
+    ORDER BY s.starts_at, s.id
+    """
+    return execute_query(conn, query, (job_id,), fetch=True) or []
+
+
+def job_interviews(conn, job_id):
+    """Booked interviews of a job, in time order."""
+    query = """
+    SELECT s.starts_at, s.ends_at, st.full_name, st.roll_no, st.branch, a.application_id AS app_id
+    FROM interview_assignments a
+    JOIN interview_slots s ON s.id = a.slot_id
+    JOIN students st ON st.id = a.student_id
+    WHERE s.job_id = %s
+    ORDER BY s.starts_at, st.full_name
+    """
+    return execute_query(conn, query, (job_id,), fetch=True) or []
+
+
+def student_interviews(conn, student_id):
+    """A student's booked interviews across companies, in time order."""
+    query = """
+    SELECT s.starts_at, s.ends_at, j.title AS job_title, COALESCE(c.name, '') AS company
+    FROM interview_assignments a
+    JOIN interview_slots s ON s.id = a.slot_id
+    JOIN jobs j ON j.id = s.job_id
+    LEFT JOIN companies c ON c.id = j.company_id
+    WHERE a.student_id = %s AND j.deleted_at IS NULL
+    ORDER BY s.starts_at
+    """
+    return execute_query(conn, query, (student_id,), fetch=True) or []
+
+
+# --- SCHEDULING ---
+def _busy_query(ph, count):
+    return f"""
+    SELECT a.student_id, s.starts_at, s.ends_at
+    FROM interview_assignments a JOIN interview_slots s ON s.id = a.slot_id
+    WHERE a.student_id IN ({', '.join([ph] * count)})
+    """
+
+
+def _busy_intervals(rows):
+    busy = {}
+    for student_id, starts_at, ends_at in rows:
+        busy.setdefault(student_id, []).append((_as_datetime(starts_at), _as_datetime(ends_at)))
+    return busy
+
+
+def schedule_job(conn, db_type, job_id):
+    """Books the job's unbooked shortlisted applicants into its free slots without clashes.
+
+    Returns {'applicants', 'booked', 'unbooked', 'seconds'}.
+    """
+    started = time.perf_counter()
+    applicants = [(row['id'], row['student_id']) for row in execute_query(conn, """
+    SELECT a.id, a.student_id
+    FROM applications a
+    LEFT JOIN interview_assignments ia ON ia.application_id = a.id
+    WHERE a.job_id = %s AND a.status = 'shortlisted' AND ia.id IS NULL
+    ORDER BY a.applied_at, a.id
+    """, (job_id,), fetch=True) or []]
+    slots = [(row['id'], _as_datetime(row['starts_at']), _as_datetime(row['ends_at']), row['capacity'] - row['booked'])
+             for row in job_slots(conn, job_id)]
+    result = {'applicants': len(applicants), 'booked': 0, 'unbooked': len(applicants), 'seconds': 0.0}
+    if not applicants or not any(free > 0 for *_, free in slots):
+        result['seconds'] = time.perf_counter() - started
+        return result
+
+    student_ids = sorted({student_id for _, student_id in applicants})
+    busy = {}
+    for start in range(0, len(student_ids), SCHEDULE_BATCH_SIZE):
+        batch = student_ids[start:start + SCHEDULE_BATCH_SIZE]
+        rows = execute_query(conn, _busy_query('%s', len(batch)), tuple(batch), fetch=True) or []
+        for student_id, intervals in _busy_intervals((r['student_id'], r['starts_at'], r['ends_at']) for r in rows).items():
+            busy.setdefault(student_id, []).extend(intervals)
+
+    proposal = match_slots(applicants, slots, busy)
+    booked = run_in_transaction(conn, lambda cursor: _book(cursor, db_type, job_id, applicants, slots, proposal))
+    result.update(booked=booked, unbooked=len(applicants) - booked, seconds=time.perf_counter() - started)
+    return result
+
+
+def _book(cursor, db_type, job_id, applicants, slots, proposal):
+    """Inserts the proposed bookings that still fit; returns how many were made."""
+    ph = '%s' if db_type == 'mysql' else '?'
+    student_of = dict(applicants)
+    student_ids = sorted({student_of[app_id] for app_id in proposal})
+
+    # Current state, read inside the transaction. On MySQL the students' rows are
+    # locked first so two recruiters scheduling the same students take turns.
+    busy = {}
+    for start in range(0, len(student_ids), SCHEDULE_BATCH_SIZE):
+        batch = tuple(student_ids[start:start + SCHEDULE_BATCH_SIZE])
+        if db_type == 'mysql':
+            cursor.execute(f"SELECT id FROM students WHERE id IN ({', '.join([ph] * len(batch))}) FOR UPDATE", batch)
+            cursor.fetchall()
+        cursor.execute(_busy_query(ph, len(batch)), batch)
+        for student_id, intervals in _busy_intervals(cursor.fetchall()).items():
+            busy.setdefault(student_id, []).extend(intervals)
+    cursor.execute(f"""
+    SELECT s.id, s.capacity - COUNT(a.id)
+    FROM interview_slots s LEFT JOIN interview_assignments a ON a.slot_id = s.id
+    WHERE s.job_id = {ph}
+    GROUP BY s.id, s.capacity
+    """, (job_id,))
+    free = dict(cursor.fetchall())
+    times = {slot_id: (start, end) for slot_id, start, end, _ in slots}
+    # Applications moved out of 'shortlisted' since the matching get no booking
+    cursor.execute(f"SELECT id FROM applications WHERE job_id = {ph} AND status = 'shortlisted'", (job_id,))
+    shortlisted = {row[0] for row in cursor.fetchall()}
+
+    rows = []
+    for app_id, slot_id in proposal.items():
+        student_id = student_of[app_id]
+        start, end = times[slot_id]
+        if app_id not in shortlisted:
+            continue
+        if free.get(slot_id, 0) <= 0 or _clashes(busy.get(student_id, ()), start, end):
+            continue # Booked by someone else meanwhile; left for the next run
+        free[slot_id] -= 1
+        busy.setdefault(student_id, []).append((start, end))
+        rows.append((slot_id, app_id, student_id))
+
+    ignore = "INSERT IGNORE" if db_type == 'mysql' else "INSERT OR IGNORE"
+    cursor.executemany(f"{ignore} INTO interview_assignments (slot_id, application_id, student_id) VALUES ({ph}, {ph}, {ph})", rows)
+    return len(rows)
+
+
+if __name__ == '__main__':
+    import random
+    import sys
+
+    n_applicants = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    n_slots = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    capacity = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    rng = random.Random(47)
+    day = datetime(2025, 1, 6, 9)
+    slots = [(j, day + timedelta(minutes=30 * j), day + timedelta(minutes=30 * j + 30), capacity) for j in range(n_slots)]
+    applicants = [(i, i) for i in range(n_applicants)]
+    # A third of the students already have 1-4 interviews with other companies in the same window
+    busy = {}
+    for student_id in rng.sample(range(n_applicants), n_applicants // 3):
+        for _ in range(rng.randint(1, 4)):
+            start = day + timedelta(minutes=15 * rng.randrange(2 * n_slots))
+            busy.setdefault(student_id, []).append((start, start + timedelta(minutes=45)))
+
+    started = time.perf_counter()
+    booked = match_slots(applicants, slots, busy)
+    elapsed = time.perf_counter() - started
+    print(f"{n_applicants} applicants, {n_slots} slots x {capacity}: booked {len(booked)} in {elapsed:.2f}s")
+    assert is_maximum(applicants, slots, busy, booked), "benchmark booking is not a maximum matching"
+
+    # Small random instances, where greedy alone often falls short of the maximum
+    for _ in range(500):
+        n, m = rng.randint(1, 12), rng.randint(1, 6)
+        small_slots = [(j, day + timedelta(minutes=30 * j), day + timedelta(minutes=30 * j + 30), rng.randint(0, 2)) for j in range(m)]
+        small_busy = {}
+        for student_id in range(n):
+            for _ in range(rng.randint(0, 3)):
+                start = day + timedelta(minutes=15 * rng.randrange(2 * m))
+                small_busy.setdefault(student_id, []).append((start, start + timedelta(minutes=rng.choice((15, 45, 75)))))
+        small_applicants = [(i, i) for i in range(n)]
+        assert is_maximum(small_applicants, small_slots, small_busy, match_slots(small_applicants, small_slots, small_busy))
+    print("maximum matching verified on the benchmark and 500 random instances")
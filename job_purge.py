@@ -0,0 +1,189 @@
+# CareerSphere/job_purge.py
+# Background deletion of job postings.
+#
+# Deleting a job used to be one DELETE FROM jobs whose ON DELETE CASCADE removed
+# every application in the same transaction, holding locks (and on SQLite the
+# single writer) for as long as that took. Now a deletion request only sets
+# jobs.deleted_at, which hides the job everywhere at once, and queues a
+# job_deletions row. A background worker per campus then deletes the job's
+# applications by primary key, PURGE_CHUNK_SIZE per transaction, so concurrent
+# applications to other jobs only ever wait for one small chunk. After each chunk
+# it pauses at least as long as the chunk took. Once nothing is left it deletes
+# the job's interview slots and the job itself. job_deletions.removed records the
+# progress shown to the recruiter. Unfinished deletions resume after a restart.
+#
+#   CLI:  python job_purge.py [campus]   (finish the pending deletions now)
+
+import threading
+import time
+from collections import defaultdict
+
+import streamlit as st
+from database import DEFAULT_TENANT, execute_query, open_background_connection, run_in_transaction
+
+# Applications deleted per transaction
+PURGE_CHUNK_SIZE = 500
+# Minimum seconds between two chunks (the pause is never shorter than the chunk itself)
+PURGE_PAUSE = 0.05
+# Seconds between checks without a wake-up (deletions queued by other processes)
+PURGE_INTERVAL = 60
+# Seconds between refreshes of the recruiter's progress bars
+PURGE_PROGRESS_POLL = 2
+# Finished deletions still listed under "Recent deletions"
+PURGE_RECENT = 5
+
+
+# --- REQUEST ---
+def request_job_deletion(conn, db_type, job_id, recruiter_id):
+    """Hides the recruiter's job and queues it for purging; returns its application count, or None.
+
+    None means the job is not the recruiter's or is already being deleted.
+    """
+    ph = '%s' if db_type == 'mysql' else '?'
+    # Counted before the transaction: a plain read, so no application rows get locked
+    data = execute_query(conn, "SELECT COUNT(*) AS n FROM applications WHERE job_id = %s", (job_id,), fetch=True)
+    applications = data[0]['n'] if data else 0
+
+    def hide(cursor):
+        cursor.execute(f"UPDATE jobs SET deleted_at = CURRENT_TIMESTAMP WHERE id = {ph} AND recruiter_id = {ph} AND deleted_at IS NULL",
+                       (job_id, recruiter_id))
+        if cursor.rowcount != 1:
+            return False
+        cursor.execute(f"""
+        INSERT INTO job_deletions (job_id, recruiter_id, title, applications)
+        SELECT id, recruiter_id, title, {ph} FROM jobs WHERE id = {ph}
+        """, (applications, job_id))
+        return True
+
+    if not run_in_transaction(conn, hide):
+        return None
+    tenant_id = getattr(conn, 'tenant_id', DEFAULT_TENANT)
+    start_purge_worker(tenant_id)
+    _wakeups[tenant_id].set()
+    return applications
+
+
+# --- PURGE ---
+def _purge_chunk(conn, db_type, job_id):
+    """Deletes the job's next chunk of applications; returns how many, or None once the job itself is gone."""
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def purge(cursor):
+        # fetchall(): MySQL's unbuffered cursors refuse a new execute with rows left unread
+        cursor.execute(f"SELECT id FROM applications WHERE job_id = {ph} ORDER BY id LIMIT {PURGE_CHUNK_SIZE}", (job_id,))
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            # By primary key: only these rows are locked, never a range other jobs insert into
+            marks = ", ".join([ph] * len(ids))
+            cursor.execute(f"DELETE FROM interview_assignments WHERE application_id IN ({marks})", ids)
+            cursor.execute(f"DELETE FROM applications WHERE id IN ({marks})", ids)
+            removed = cursor.rowcount
+            cursor.execute(f"UPDATE job_deletions SET removed = removed + {ph} WHERE job_id = {ph}", (removed, job_id))
+            return removed
+
+        # Explicit deletes rather than ON DELETE CASCADE, which SQLite does not enforce here
+        cursor.execute(f"DELETE FROM interview_assignments WHERE slot_id IN (SELECT id FROM interview_slots WHERE job_id = {ph})", (job_id,))
+        cursor.execute(f"DELETE FROM interview_slots WHERE job_id = {ph}", (job_id,))
+        cursor.execute(f"DELETE FROM jobs WHERE id = {ph} AND deleted_at IS NOT NULL", (job_id,))
+        cursor.execute(f"UPDATE job_deletions SET finished_at = CURRENT_TIMESTAMP WHERE job_id = {ph}", (job_id,))
+        return None
+
+    return run_in_transaction(conn, purge)
+
+
+def purge_job(conn, db_type, job_id, pause=PURGE_PAUSE):
+    """Deletes a hidden job chunk by chunk; returns how many applications it removed."""
+    total = 0
+    while True:
+        started = time.monotonic()
+        removed = _purge_chunk(conn, db_type, job_id)
+        if removed is None:
+            return total
+        total += removed
+        time.sleep(max(pause, time.monotonic() - started))
+
+
+def purge_pending(conn, db_type):
+    """Finishes every queued deletion of the campus; returns how many applications were removed."""
+    pending = execute_query(conn, "SELECT job_id FROM job_deletions WHERE finished_at IS NULL ORDER BY requested_at", fetch=True) or []
+    return sum(purge_job(conn, db_type, row['job_id']) for row in pending)
+
+
+# --- WORKER ---
+# tenant_id -> set when this process queues a deletion
+_wakeups = defaultdict(threading.Event)
+_worker_lock = threading.Lock()
+_workers = {}
+
+
+def _run_worker(tenant_id):
+    wake = _wakeups[tenant_id]
+    while True:
+        wake.clear()
+        try:
+            conn, db_type = open_background_connection(tenant_id)
+            try:
+                purge_pending(conn, db_type)
+            finally:
+                conn.close()
+        except Exception:
+            pass # e.g. database briefly unavailable; the next round resumes where this one stopped
+        wake.wait(PURGE_INTERVAL)
+
+
+def start_purge_worker(tenant_id=DEFAULT_TENANT):
+    """Starts the campus's background purge thread once per process."""
+    with _worker_lock:
+        thread = _workers.get(tenant_id)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_run_worker, args=(tenant_id,), name=f"job-purge:{tenant_id}", daemon=True)
+            thread.start()
+            _workers[tenant_id] = thread
+
+
+# --- PROGRESS ---
+def recent_deletions(conn, recruiter_id, limit=PURGE_RECENT):
+    query = f"""
+    SELECT job_id, title, applications, removed, requested_at, finished_at FROM job_deletions
+    WHERE recruiter_id = %s ORDER BY requested_at DESC LIMIT {int(limit)}
+    """
+    return execute_query(conn, query, (recruiter_id,), fetch=True) or []
+
+
+def deletion_progress_widget(conn, recruiter_id):
+    """Progress of the recruiter's recent deletions, polled while any is still running."""
+    deletions = recent_deletions(conn, recruiter_id)
+    if any(d['finished_at'] is None for d in deletions):
+        _live_progress(conn, recruiter_id)
+    elif deletions:
+        _show_progress(deletions)
+
+
+@st.fragment(run_every=PURGE_PROGRESS_POLL)
+def _live_progress(conn, recruiter_id):
+    deletions = recent_deletions(conn, recruiter_id)
+    _show_progress(deletions)
+    if all(d['finished_at'] is not None for d in deletions):
+        st.rerun() # Last one done: redraw the page once and stop polling
+
+
+def _show_progress(deletions):
+    with st.expander("🗑️ Recent deletions", expanded=any(d['finished_at'] is None for d in deletions)):
+        for d in deletions:
+            if d['finished_at'] is not None:
+                st.caption(f"✅ {d['title']} (ID {d['job_id']}): deleted with {d['applications']:,} applications.")
+                continue
+            total = max(d['applications'], d['removed'], 1)
+            st.progress(min(d['removed'] / total, 1.0),
+                        text=f"Deleting {d['title']} (ID {d['job_id']}): {d['removed']:,} of {d['applications']:,} applications removed")
+
+
+if __name__ == '__main__':
+    import sys
+
+    tenant = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TENANT
+    db_conn, backend = open_background_connection(tenant)
+    try:
+        print(f"Removed {purge_pending(db_conn, backend)} applications of deleted jobs for '{tenant}' ({backend}).")
+    finally:
+        db_conn.close()
@@ -0,0 +1,297 @@
+# CareerSphere/load_test.py
+# Placement-day load test: drives the real page scripts headlessly with Streamlit's
+# AppTest against a generated SQLite database and reports per-page latency.
+#
+#   python load_test.py [--students 200] [--recruiters 30] [--admins 5] [--duration 60] [--workers N]
+#
+# Every virtual session logs in through pages/login.py (run under app.py, as in the
+# browser) and then follows its role's click mix (CLICK_MIX) with random think time
+# in between, carrying its session state from page to page like a browser tab
+# would. AppTest keeps global state per run, so sessions are spread over worker
+# processes; each worker interleaves its share of sessions the way one Streamlit
+# server interleaves reruns, and the workers hit the same database file concurrently.
+
+import argparse
+import heapq
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRYPOINT = os.path.join(ROOT, "app.py")
+LOAD_PASSWORD = "load"
+# Seconds a single page run may take before it counts as a failure
+PAGE_TIMEOUT = 30
+# Session state a browser session keeps between pages
+CARRIED_KEYS = ('db_conn', 'db_type', 'tenant_id', 'logged_in', 'user_role', 'user_id', 'user_email',
+                'profile_cache', 'delta_views')
+
+# role -> [(weight, page, action)]; actions are LoadSession methods
+CLICK_MIX = {
+    'student': [
+        (35, 'job_postings', None),
+        (15, 'job_postings', 'apply'),
+        (35, 'applications', None),
+        (15, 'student_dashboard', None),
+    ],
+    'recruiter': [
+        (35, 'recruiter_dashboard', None),
+        (35, 'applications', 'review'),
+        (20, 'applications', 'update_status'),
+        (10, 'job_postings', 'post_job'),
+    ],
+    'admin': [
+        (40, 'admin_dashboard', None),
+        (30, 'analytics', None),
+        (30, 'profile_update', None),
+    ],
+}
+
+BRANCHES = ('CSE', 'ISE', 'ECE', 'EEE', 'ME')
+SKILLS = ('python', 'sql', 'java', 'react', 'ml', 'c++', 'aws', 'docker')
+
+
+# --- DATA ---
+def generate_database(path, students, recruiters, companies, jobs, apps_per_student, seed=344):
+    """Builds a campus database with the real schema; returns {role: [user ids]}."""
+    from database import create_sqlite_tables
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    create_sqlite_tables(conn)
+    users = {'student': [], 'recruiter': [], 'admin': []}
+
+    def add_user(email, role):
+        cursor = conn.execute("INSERT INTO users (email, password, role) VALUES (?, ?, ?)", (email, LOAD_PASSWORD, role))
+        users[role].append(cursor.lastrowid)
+        return cursor.lastrowid
+
+    conn.executemany("INSERT INTO companies (name) VALUES (?)", [(f"Company {i}",) for i in range(1, companies + 1)])
+    for i in range(1, students + 1):
+        sid = add_user(f"student{i}@load.test", 'student')
+        conn.execute(
+            "INSERT INTO students (id, roll_no, full_name, branch, cgpa, skills) VALUES (?, ?, ?, ?, ?, ?)",
+            (sid, f"LT{i:06d}", f"Student {i}", rng.choice(BRANCHES), round(rng.uniform(6, 10), 2),
+             ", ".join(rng.sample(SKILLS, 3))),
+        )
+        conn.execute("INSERT INTO student_details (student_id, projects, internships) VALUES (?, ?, ?)",
+                     (sid, "project " * rng.randint(2, 40), "internship " * rng.randint(0, 10)))
+    for i in range(1, recruiters + 1):
+        rid = add_user(f"recruiter{i}@load.test", 'recruiter')
+        conn.execute("INSERT INTO recruiters (id, company_id, is_approved, reviewed_at) VALUES (?, ?, 1, CURRENT_TIMESTAMP)",
+                     (rid, rng.randint(1, companies)))
+    add_user("admin@load.test", 'admin')
+
+    job_rows = []
+    for j in range(1, jobs + 1):
+        rid = rng.choice(users['recruiter'])
+        company_id = conn.execute("SELECT company_id FROM recruiters WHERE id = ?", (rid,)).fetchone()[0]
+        job_rows.append((rid, company_id, f"Role {j}", "Bengaluru", f"CGPA > {rng.choice([6.5, 7.0, 7.5])}, "
+                         f"{', '.join(rng.sample(SKILLS, 2))}", "description " * 20))
+    conn.executemany("INSERT INTO jobs (recruiter_id, company_id, title, location, eligibility, description) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", job_rows)
+    for sid in users['student']:
+        conn.executemany("INSERT INTO applications (job_id, student_id, status) VALUES (?, ?, ?)",
+                         [(job_id, sid, rng.choice(['applied', 'applied', 'shortlisted', 'rejected']))
+                          for job_id in rng.sample(range(1, jobs + 1), min(apps_per_student, jobs))])
+    conn.commit()
+    conn.close()
+    return users
+
+
+# --- SESSIONS ---
+class LoadSession:
+    """One virtual browser session: its session state and its role's click mix."""
+
+    def __init__(self, role, user_id, email, rng):
+        self.role = role
+        self.user_id = user_id
+        self.email = email
+        self.rng = rng
+        self.state = {}
+        self.logged_in = False
+
+    def _app(self, page):
+        from streamlit.testing.v1 import AppTest
+        # Pages run under the entrypoint, as in the browser, so st.page_link resolves
+        at = AppTest.from_file(ENTRYPOINT, default_timeout=PAGE_TIMEOUT)
+        for key, value in self.state.items():
+            at.session_state[key] = value
+        return at.switch_page(f"pages/{page}.py")
+
+    def _keep_state(self, at):
+        for key in CARRIED_KEYS:
+            if key in at.session_state:
+                self.state[key] = at.session_state[key]
+
+    def _timed(self, results, label, fn):
+        start = time.perf_counter()
+        error = None
+        try:
+            at = fn()
+            if at.exception:
+                error = 'exception'
+            elif at.error:
+                error = 'error message'
+        except Exception:
+            at, error = None, 'exception'
+        results.append((label, time.perf_counter() - start, error))
+        if at is not None:
+            self._keep_state(at)
+        return at
+
+    def step(self, results):
+        if not self.logged_in:
+            self.login(results)
+            return
+        weights, choices = zip(*[(w, (page, action)) for w, page, action in CLICK_MIX[self.role]])
+        page, action = self.rng.choices(choices, weights)[0]
+        at = self._timed(results, page, self._app(page).run)
+        if action and at is not None and not at.exception:
+            getattr(self, action)(results, at)
+
+    # --- actions ---
+    def login(self, results):
+        at = self._timed(results, 'login', self._app('login').run)
+        if at is None:
+            return
+        at.text_input[0].input(self.email)
+        at.text_input[1].input(LOAD_PASSWORD)
+        at = self._timed(results, 'login:submit', _button(at, "Login").click().run)
+        self.logged_in = bool(at is not None and at.session_state['logged_in'])
+
+    def apply(self, results, at):
+        select = at.selectbox[0]
+        select.set_value(int(self.rng.choice(select.options)))
+        self._timed(results, 'job_postings:apply', _button(at, "Submit Application").click().run)
+
+    def review(self, results, at):
+        if at.selectbox:
+            picker = at.selectbox[0]
+            picker.select_index(self.rng.randrange(len(picker.options)))
+            self._timed(results, 'applications:review', at.run)
+
+    def update_status(self, results, at):
+        if not at.dataframe:
+            return
+        app_ids = at.dataframe[0].value['App ID'].tolist()
+        next(n for n in at.number_input if n.label == "Application ID to Update").set_value(int(self.rng.choice(app_ids)))
+        next(r for r in at.radio if r.label == "New Status").set_value(self.rng.choice(['shortlisted', 'rejected', 'accepted']))
+        self._timed(results, 'applications:update_status', _button(at, "Update Status").click().run)
+
+    def post_job(self, results, at):
+        at.text_input[0].input(f"Load Role {self.rng.randint(1, 10 ** 6)}")
+        at.text_input[1].input("Remote")
+        at.text_area[0].input("CGPA > 7.0, python")
+        at.text_area[1].input("Posted by the load test")
+        self._timed(results, 'job_postings:post_job', _button(at, "Post Job").click().run)
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _worker(args):
+    """Runs one worker's sessions until the deadline; returns [(label, seconds, error)]."""
+    db_path, workdir, sessions, deadline, think, seed = args
+    os.chdir(workdir) # Snapshots, resumes and profiles of the run stay in the scratch dir
+    import database
+    # The generated file stands in for the default campus; MySQL is kept out of the run
+    database.TENANTS[database.DEFAULT_TENANT] = {'name': 'Load Test Campus', 'sqlite_db': db_path,
+                                                 'mysql_database': database.MYSQL_DATABASE}
+    database.backend_monitor.driver_available = False
+
+    rng = random.Random(seed)
+    queue = [(time.time() + rng.uniform(0, think), i, LoadSession(role, uid, email, random.Random(seed * 1000 + i)))
+             for i, (role, uid, email) in enumerate(sessions)]
+    heapq.heapify(queue)
+    results = []
+    while queue:
+        due, i, session = heapq.heappop(queue)
+        if due > deadline:
+            break
+        time.sleep(max(0.0, due - time.time()))
+        session.step(results)
+        heapq.heappush(queue, (time.time() + rng.expovariate(1 / think), i, session))
+    return results
+
+
+# --- REPORT ---
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def summarize(results, elapsed):
+    """Per-label rows: requests, p50/p95/p99 ms and error rate, slowest p95 first."""
+    by_label = defaultdict(list)
+    for label, seconds, error in results:
+        by_label[label].append((seconds, error))
+    rows = []
+    for label, runs in by_label.items():
+        times = sorted(s for s, _ in runs)
+        errors = sum(1 for _, e in runs if e)
+        rows.append({
+            'page': label, 'requests': len(runs), 'rps': round(len(runs) / elapsed, 2),
+            'p50_ms': round(_percentile(times, 0.50) * 1000, 1),
+            'p95_ms': round(_percentile(times, 0.95) * 1000, 1),
+            'p99_ms': round(_percentile(times, 0.99) * 1000, 1),
+            'error_rate': round(errors / len(runs), 4),
+        })
+    return sorted(rows, key=lambda r: r['p95_ms'], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the CareerSphere pages.")
+    parser.add_argument('--students', type=int, default=200, help="concurrent student sessions")
+    parser.add_argument('--recruiters', type=int, default=30, help="concurrent recruiter sessions")
+    parser.add_argument('--admins', type=int, default=5, help="concurrent admin sessions")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to run")
+    parser.add_argument('--think', type=float, default=2.0, help="mean think time between clicks (seconds)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help="worker processes")
+    parser.add_argument('--db-students', type=int, default=3000, help="students in the generated database")
+    parser.add_argument('--db-recruiters', type=int, default=60)
+    parser.add_argument('--db-jobs', type=int, default=200)
+    parser.add_argument('--apps-per-student', type=int, default=6)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='cs_load_test_')
+    db_path = os.path.join(workdir, 'cs_load.db')
+    print(f"Generating {args.db_students} students, {args.db_recruiters} recruiters, {args.db_jobs} jobs in {db_path} ...")
+    users = generate_database(db_path, args.db_students, args.db_recruiters, max(1, args.db_recruiters // 2),
+                              args.db_jobs, args.apps_per_student)
+
+    email = {'student': "student{}@load.test", 'recruiter': "recruiter{}@load.test"}
+    sessions = []
+    for role, count in (('student', args.students), ('recruiter', args.recruiters), ('admin', args.admins)):
+        for n in range(count):
+            uid_index = n % len(users[role])
+            address = "admin@load.test" if role == 'admin' else email[role].format(uid_index + 1)
+            sessions.append((role, users[role][uid_index], address))
+    random.Random(7).shuffle(sessions)
+
+    workers = max(1, min(args.workers, len(sessions)))
+    deadline = time.time() + args.duration
+    shares = [(db_path, workdir, sessions[w::workers], deadline, args.think, w + 1) for w in range(workers)]
+    print(f"{len(sessions)} sessions ({args.students} students, {args.recruiters} recruiters, {args.admins} admins) "
+          f"on {workers} workers for {args.duration:.0f}s ...")
+    start = time.time()
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        results = [row for share in pool.map(_worker, shares) for row in share]
+    elapsed = time.time() - start
+
+    rows = summarize(results, elapsed)
+    print(f"\n{'page':<30}{'requests':>9}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for r in rows:
+        print(f"{r['page']:<30}{r['requests']:>9}{r['rps']:>8}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['error_rate']:>9.2%}")
+    total_errors = sum(1 for _, _, e in results if e)
+    print(f"\n{len(results)} requests in {elapsed:.0f}s, {total_errors} errors ({total_errors / max(1, len(results)):.2%})")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+-- ===============================================================
+--  MIGRATION 001: split students into hot and cold column groups
+-- ===============================================================
+-- For MySQL databases created before student_details existed
+-- (fresh installs get the new layout from DDL_DML.sql).
+-- SQLite files are migrated automatically by database.create_sqlite_tables().
+
+USE cs;
+
+CREATE TABLE IF NOT EXISTS student_details (
+    student_id INT PRIMARY KEY,
+    internships TEXT,
+    hackathons TEXT,
+    projects TEXT,
+    certificates TEXT,
+    coding_profiles TEXT,
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+);
+
+START TRANSACTION;
+
+-- Copy the free-text sections of every student who filled any of them in
+INSERT IGNORE INTO student_details (student_id, internships, hackathons, projects, certificates, coding_profiles)
+SELECT id, internships, hackathons, projects, certificates, coding_profiles
+FROM students
+WHERE COALESCE(internships, hackathons, projects, certificates, coding_profiles) IS NOT NULL;
+
+COMMIT;
+
+-- Drop the cold columns from the hot table (rebuilds students)
+ALTER TABLE students
+    DROP COLUMN internships,
+    DROP COLUMN hackathons,
+    DROP COLUMN projects,
+    DROP COLUMN certificates,
+    DROP COLUMN coding_profiles;
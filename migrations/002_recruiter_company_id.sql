@@ -0,0 +1,76 @@
+-- ===============================================================
+--  MIGRATION 002: recruiters.company_name -> recruiters.company_id
+-- ===============================================================
+-- Recruiters now reference their company by id, resolved once at registration,
+-- instead of a name that every job post had to look up (and that drifted with
+-- spelling). SQLite files are migrated automatically by create_sqlite_tables().
+
+USE cs;
+
+ALTER TABLE recruiters
+    ADD COLUMN company_id INT NULL AFTER id,
+    ADD CONSTRAINT fk_recruiters_company FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE SET NULL;
+
+START TRANSACTION;
+
+-- Every company a recruiter registered with gets a companies row (the default
+-- collation is case-insensitive, so spelling variants collapse onto one row)
+INSERT IGNORE INTO companies (name)
+SELECT DISTINCT TRIM(company_name) FROM recruiters
+WHERE company_name IS NOT NULL AND TRIM(company_name) <> '';
+
+UPDATE recruiters r
+JOIN companies c ON c.name = TRIM(r.company_name)
+SET r.company_id = c.id;
+
+COMMIT;
+
+ALTER TABLE recruiters DROP COLUMN company_name;
+
+-- Procedures that read recruiters.company_name (same definitions as DDL_DML.sql)
+DROP PROCEDURE IF EXISTS register_recruiter_proc;
+DROP PROCEDURE IF EXISTS post_job_proc;
+
+DELIMITER $$
+
+CREATE PROCEDURE register_recruiter_proc (
+    IN p_email VARCHAR(255),
+    IN p_password VARCHAR(255),
+    IN p_company_name VARCHAR(255)
+)
+BEGIN
+    DECLARE v_user_id INT;
+    DECLARE v_company_id INT;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+
+    START TRANSACTION;
+    CALL register_user(p_email, p_password, 'recruiter');
+    SET v_user_id = LAST_INSERT_ID();
+    INSERT IGNORE INTO companies (name) VALUES (TRIM(p_company_name));
+    SELECT id INTO v_company_id FROM companies WHERE name = TRIM(p_company_name);
+    INSERT INTO recruiters (id, company_id) VALUES (v_user_id, v_company_id);
+    COMMIT;
+
+    SELECT v_user_id AS user_id;
+END$$
+
+CREATE PROCEDURE post_job_proc (
+    IN p_recruiter_id INT,
+    IN p_title VARCHAR(255),
+    IN p_location VARCHAR(255),
+    IN p_eligibility VARCHAR(255),
+    IN p_description TEXT
+)
+BEGIN
+    DECLARE v_company_id INT;
+
+    SELECT company_id INTO v_company_id FROM recruiters WHERE id = p_recruiter_id;
+    IF v_company_id IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Recruiter profile incomplete. Cannot post jobs.';
+    END IF;
+
+    CALL add_job(p_recruiter_id, v_company_id, p_title, p_location, p_eligibility, p_description);
+    SELECT LAST_INSERT_ID() AS job_id;
+END$$
+
+DELIMITER ;
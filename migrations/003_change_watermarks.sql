@@ -0,0 +1,16 @@
+-- ===============================================================
+--  MIGRATION 003: change-feed watermarks on applications and jobs
+-- ===============================================================
+-- updated_at moves forward on every change, so the live list pages can ask for
+-- "rows changed since X" (change_feed.py). SQLite files get the same column, kept
+-- current by triggers, from database.create_sqlite_tables().
+
+USE cs;
+
+ALTER TABLE jobs
+    ADD COLUMN updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3) AFTER created_at;
+
+ALTER TABLE applications
+    ADD COLUMN updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3) AFTER applied_at,
+    ADD INDEX idx_applications_job_updated (job_id, updated_at),
+    ADD INDEX idx_applications_student_updated (student_id, updated_at);
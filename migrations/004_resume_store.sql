@@ -0,0 +1,18 @@
+-- ===============================================================
+--  MIGRATION 004: uploaded resumes (content-addressed store)
+-- ===============================================================
+-- The files live under resumes/<campus>/ on the app server (resume_store.py);
+-- the database records each distinct file once and which one a student uses.
+
+USE cs;
+
+CREATE TABLE IF NOT EXISTS resume_files (
+    sha256 CHAR(64) PRIMARY KEY,
+    size_bytes INT NOT NULL,
+    mime_type VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE students
+    ADD COLUMN resume_sha256 CHAR(64) AFTER resume_url,
+    ADD CONSTRAINT fk_students_resume FOREIGN KEY (resume_sha256) REFERENCES resume_files(sha256);
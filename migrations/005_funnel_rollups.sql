@@ -0,0 +1,58 @@
+-- ===============================================================
+--  MIGRATION 005: placement-funnel rollups
+-- ===============================================================
+-- funnel_daily holds applied/shortlisted/accepted/rejected counts per day, job and
+-- branch, maintained by funnel_rollups.py from audit_logs rows past the high-water
+-- mark kept in rollup_state. Applications now log their creation, and status
+-- events are only logged when the status actually changes. SQLite files get the
+-- same tables and triggers from database.create_sqlite_tables().
+--
+-- The first refresh_funnel() call seeds funnel_daily from the applications
+-- already in the database, so no backfill is needed here.
+
+USE cs;
+
+CREATE TABLE funnel_daily (
+    day DATE NOT NULL,
+    job_id INT NOT NULL,
+    company_id INT,
+    branch VARCHAR(100) NOT NULL DEFAULT '',
+    applied INT NOT NULL DEFAULT 0,
+    shortlisted INT NOT NULL DEFAULT 0,
+    accepted INT NOT NULL DEFAULT 0,
+    rejected INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, job_id, branch)
+);
+
+CREATE TABLE rollup_state (
+    name VARCHAR(64) PRIMARY KEY,
+    last_id INT NOT NULL
+);
+
+-- Same definitions as DDL_DML.sql
+DROP TRIGGER IF EXISTS trg_application_status_update;
+DROP TRIGGER IF EXISTS trg_application_insert;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_application_status_update
+AFTER UPDATE ON applications
+FOR EACH ROW
+BEGIN
+    -- Logs status changes like shortlisted/rejected/accepted (not other edits)
+    IF NEW.status <> OLD.status THEN
+        INSERT INTO audit_logs (action, entity, entity_id, user_email)
+        VALUES (CONCAT('STATUS ', NEW.status), 'applications', NEW.id,
+                (SELECT email FROM users WHERE id = NEW.student_id));
+    END IF;
+END$$
+
+CREATE TRIGGER trg_application_insert
+AFTER INSERT ON applications
+FOR EACH ROW
+BEGIN
+    INSERT INTO audit_logs (action, entity, entity_id, user_email)
+    VALUES ('INSERT', 'applications', NEW.id, (SELECT email FROM users WHERE id = NEW.student_id));
+END$$
+
+DELIMITER ;
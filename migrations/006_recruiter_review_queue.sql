@@ -0,0 +1,23 @@
+-- ===============================================================
+--  MIGRATION 006: recruiter approval queue
+-- ===============================================================
+-- recruiters.created_at (sign-up time) and reviewed_at (approve/reject time,
+-- NULL while pending) back the admin's paginated approval queue
+-- (recruiter_queue.py), served by idx_recruiters_queue. SQLite files are migrated
+-- automatically by create_sqlite_tables().
+
+USE cs;
+
+ALTER TABLE recruiters
+    ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP AFTER is_approved,
+    ADD COLUMN reviewed_at TIMESTAMP NULL AFTER created_at,
+    ADD INDEX idx_recruiters_queue (reviewed_at, created_at, id);
+
+-- Existing recruiters: sign-up time from the audit trail where it was logged,
+-- and already-approved accounts count as reviewed
+UPDATE recruiters r
+LEFT JOIN (
+    SELECT entity_id, MIN(created_at) AS signed_up FROM audit_logs WHERE entity = 'users' GROUP BY entity_id
+) l ON l.entity_id = r.id
+SET r.created_at = COALESCE(l.signed_up, r.created_at),
+    r.reviewed_at = IF(r.is_approved, CURRENT_TIMESTAMP, NULL);
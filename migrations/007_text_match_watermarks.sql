@@ -0,0 +1,17 @@
+-- ===============================================================
+--  MIGRATION 007: text-match watermarks on students and student_details
+-- ===============================================================
+-- The TF-IDF index behind the shortlist's Text Match column (text_match.py) keeps
+-- term counts per profile in memory and re-reads only the profiles changed since
+-- its last refresh. SQLite files get the same columns, kept current by triggers,
+-- from database.create_sqlite_tables().
+
+USE cs;
+
+ALTER TABLE students
+    ADD COLUMN updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    ADD INDEX idx_students_updated (updated_at);
+
+ALTER TABLE student_details
+    ADD COLUMN updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    ADD INDEX idx_student_details_updated (updated_at);
@@ -0,0 +1,32 @@
+-- ===============================================================
+--  MIGRATION 008: interview scheduling
+-- ===============================================================
+-- Recruiters define interview slots per job; interview_scheduler.py books the
+-- job's shortlisted applicants into them so that no student has two overlapping
+-- interviews across companies. SQLite files get the same tables from
+-- database.create_sqlite_tables().
+
+USE cs;
+
+CREATE TABLE interview_slots (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    job_id INT NOT NULL,
+    starts_at DATETIME NOT NULL,
+    ends_at DATETIME NOT NULL,
+    capacity INT NOT NULL DEFAULT 1,
+    INDEX idx_interview_slots_job (job_id, starts_at),
+    FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+);
+
+CREATE TABLE interview_assignments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    slot_id INT NOT NULL,
+    application_id INT NOT NULL UNIQUE,
+    student_id INT NOT NULL,
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_interview_assignments_slot (slot_id),
+    INDEX idx_interview_assignments_student (student_id),
+    FOREIGN KEY (slot_id) REFERENCES interview_slots(id) ON DELETE CASCADE,
+    FOREIGN KEY (application_id) REFERENCES applications(id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+);
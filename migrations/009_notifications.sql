@@ -0,0 +1,23 @@
+-- ===============================================================
+--  MIGRATION 009: notification inbox
+-- ===============================================================
+-- notifications.py fans the job postings and status changes logged in audit_logs
+-- out to students' inboxes. Its high-water mark is a row in rollup_state, created
+-- on the first run. SQLite files get the same table from
+-- database.create_sqlite_tables().
+
+USE cs;
+
+CREATE TABLE notifications (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    kind VARCHAR(16) NOT NULL,
+    ref_id INT NOT NULL DEFAULT 0,
+    message VARCHAR(500) NOT NULL,
+    event_count INT NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    read_at TIMESTAMP NULL,
+    INDEX idx_notifications_user (user_id, id),
+    INDEX idx_notifications_unread (user_id, read_at),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
@@ -0,0 +1,47 @@
+-- ===============================================================
+--  MIGRATION 010: background job deletion
+-- ===============================================================
+-- Deleting a job now only sets jobs.deleted_at, which hides it at once, and
+-- queues a job_deletions row. job_purge.py then removes the job's applications
+-- in small transactions and finally deletes the job. SQLite files are migrated
+-- automatically by create_sqlite_tables().
+
+USE cs;
+
+ALTER TABLE jobs
+    ADD COLUMN deleted_at TIMESTAMP NULL AFTER updated_at,
+    ADD INDEX idx_jobs_deleted (deleted_at);
+
+CREATE TABLE job_deletions (
+    job_id INT PRIMARY KEY,
+    recruiter_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    applications INT NOT NULL,
+    removed INT NOT NULL DEFAULT 0,
+    requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL,
+    INDEX idx_job_deletions_pending (finished_at),
+    INDEX idx_job_deletions_recruiter (recruiter_id, requested_at)
+);
+
+-- Applying to a hidden job is refused (same definition as DDL_DML.sql)
+DROP PROCEDURE IF EXISTS apply_job_proc;
+
+DELIMITER $$
+
+CREATE PROCEDURE apply_job_proc (
+    IN p_job_id INT,
+    IN p_student_id INT
+)
+BEGIN
+    INSERT INTO applications (job_id, student_id)
+    SELECT p_job_id, p_student_id FROM DUAL
+    WHERE NOT EXISTS (
+        SELECT 1 FROM applications WHERE job_id = p_job_id AND student_id = p_student_id
+    )
+    AND EXISTS (SELECT 1 FROM jobs WHERE id = p_job_id AND deleted_at IS NULL);
+    -- 1 = application created, 0 = already applied (or the job is being deleted)
+    SELECT ROW_COUNT() AS applied;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,62 @@
+-- ===============================================================
+--  MIGRATION 011: placement seasons and archive tables
+-- ===============================================================
+-- The hot tables now hold only the open placement season. Closing a season
+-- (seasons.py) moves its jobs, applications and audit rows into the archived_*
+-- tables, which the history views read. Everything already in the database
+-- becomes the first season. SQLite files get the same tables from
+-- database.create_sqlite_tables().
+
+USE cs;
+
+CREATE TABLE seasons (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(64) NOT NULL UNIQUE,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    closing_at TIMESTAMP NULL,                         -- Set when the season is closed
+    closed_at TIMESTAMP NULL,                          -- Set when its rows are all archived
+    job_cutoff INT NULL,
+    audit_cutoff INT NULL,
+    jobs INT NOT NULL DEFAULT 0,                       -- Rows archived so far
+    applications INT NOT NULL DEFAULT 0,
+    audit_rows INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE archived_jobs (
+    id INT PRIMARY KEY,
+    season_id INT NOT NULL,
+    recruiter_id INT,
+    company_id INT,
+    title VARCHAR(255) NOT NULL,
+    location VARCHAR(255),
+    eligibility VARCHAR(255),
+    description TEXT,
+    created_at TIMESTAMP NULL,
+    INDEX idx_archived_jobs_season (season_id, company_id)
+);
+
+CREATE TABLE archived_applications (
+    id INT PRIMARY KEY,
+    season_id INT NOT NULL,
+    job_id INT,
+    student_id INT,
+    status VARCHAR(32),
+    applied_at TIMESTAMP NULL,
+    updated_at TIMESTAMP(3) NULL,
+    INDEX idx_archived_applications_season (season_id, job_id),
+    INDEX idx_archived_applications_student (student_id)
+);
+
+CREATE TABLE archived_audit_logs (
+    id INT PRIMARY KEY,
+    season_id INT NOT NULL,
+    created_at TIMESTAMP NULL,
+    action VARCHAR(255),
+    entity VARCHAR(255),
+    entity_id INT,
+    user_email VARCHAR(255),
+    INDEX idx_archived_audit_logs_season (season_id)
+);
+
+INSERT INTO seasons (name, started_at)
+SELECT 'Current season', COALESCE(MIN(created_at), CURRENT_TIMESTAMP) FROM jobs;
@@ -0,0 +1,65 @@
+-- ===============================================================
+--  MIGRATION 012: registration procedures and one application per job
+-- ===============================================================
+-- workflows.py registers students and admins through register_student_proc and
+-- register_admin_proc, and apply_to_job relies on uq_application to turn the
+-- loser of two concurrent submits into "already applied". Both were only in
+-- DDL_DML.sql, so databases upgraded with 001-011 lacked them. SQLite files
+-- need nothing: their writes already go through one writer thread.
+
+USE cs;
+
+-- Duplicates left by racing submits: keep the first application of each pair
+-- (their interview bookings go with them via ON DELETE CASCADE)
+DELETE a FROM applications a
+JOIN applications keep ON keep.job_id = a.job_id AND keep.student_id = a.student_id AND keep.id < a.id;
+
+ALTER TABLE applications ADD UNIQUE KEY uq_application (job_id, student_id);
+
+-- Same definitions as DDL_DML.sql
+DROP PROCEDURE IF EXISTS register_student_proc;
+DROP PROCEDURE IF EXISTS register_admin_proc;
+
+DELIMITER $$
+
+CREATE PROCEDURE register_student_proc (
+    IN p_email VARCHAR(255),
+    IN p_password VARCHAR(255),
+    IN p_roll_no VARCHAR(50),
+    IN p_full_name VARCHAR(255),
+    IN p_branch VARCHAR(100)
+)
+BEGIN
+    DECLARE v_user_id INT;
+    -- Any error (e.g. duplicate email/roll no) undoes both inserts and is re-raised to the app
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+
+    START TRANSACTION;
+    CALL register_user(p_email, p_password, 'student');
+    SET v_user_id = LAST_INSERT_ID();
+    INSERT INTO students (id, roll_no, full_name, branch)
+    VALUES (v_user_id, p_roll_no, p_full_name, p_branch);
+    COMMIT;
+
+    SELECT v_user_id AS user_id;
+END$$
+
+CREATE PROCEDURE register_admin_proc (
+    IN p_email VARCHAR(255),
+    IN p_password VARCHAR(255),
+    IN p_department VARCHAR(255)
+)
+BEGIN
+    DECLARE v_user_id INT;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+
+    START TRANSACTION;
+    CALL register_user(p_email, p_password, 'admin');
+    SET v_user_id = LAST_INSERT_ID();
+    INSERT INTO admins (id, department) VALUES (v_user_id, p_department);
+    COMMIT;
+
+    SELECT v_user_id AS user_id;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,336 @@
+# CareerSphere/notifications.py
+# In-app notifications for students: new jobs they are eligible for and status
+# changes of their applications, optionally also sent by email.
+#
+# The audit triggers already log every job posting and every status change, so
+# audit_logs is the event queue. A background worker per campus consumes it past
+# its own high-water mark in rollup_state (as funnel_rollups.py does), up to
+# NOTIFY_BATCH_SIZE events per transaction. A burst of writes wakes it once, after
+# NOTIFY_COALESCE_WINDOW seconds. Per batch it resolves each new job to the
+# students whose profile meets its eligibility (eligibility_index.py) and keeps
+# only the latest status per application. It then writes one inbox row per
+# student per kind, merged with the student's unread row of that kind if there
+# is one: ten new jobs make one "10 new jobs" notice. The inbox and the unread
+# count read one user's rows through idx_notifications_user /
+# idx_notifications_unread.
+#
+#   CLI:  python notifications.py [campus]   (fan out the pending events now)
+
+import threading
+import time
+from collections import defaultdict
+
+import streamlit as st
+from database import (DEFAULT_TENANT, add_write_listener, execute_query, open_background_connection,
+                      run_in_transaction)
+from eligibility_index import get_eligibility_index
+from funnel_rollups import ROLLUP_SETTLE_SECONDS
+
+NOTIFY_NAME = 'notifications'       # rollup_state row holding the worker's high-water mark
+# audit_logs rows consumed per transaction
+NOTIFY_BATCH_SIZE = 500
+# Seconds the worker waits after a write wakes it, so a burst goes out as one batch
+NOTIFY_COALESCE_WINDOW = 2
+# Seconds between checks without a wake-up (covers writes by other processes)
+NOTIFY_INTERVAL = 30
+# Ids per IN (...) list
+NOTIFY_CHUNK_SIZE = 500
+INBOX_SIZE = 20
+
+# Email copies: None keeps notifications in-app only. For local testing point it at
+# a stand-in SMTP server, e.g. `python -m aiosmtpd -n -l localhost:1025`.
+NOTIFY_SMTP_HOST = None
+NOTIFY_SMTP_PORT = 1025
+NOTIFY_SMTP_TIMEOUT = 10
+NOTIFY_MAIL_FROM = "placements@careersphere.local"
+
+# New jobs in the batch, with what their audience is resolved from
+JOB_EVENTS_QUERY = """
+SELECT j.id, j.title, COALESCE(c.name, '') AS company, j.eligibility
+FROM audit_logs l
+JOIN jobs j ON j.id = l.entity_id
+LEFT JOIN companies c ON c.id = j.company_id
+WHERE l.entity = 'jobs' AND l.action = 'INSERT' AND l.id > {ph} AND l.id <= {ph} AND j.deleted_at IS NULL
+ORDER BY l.id
+"""
+
+# Status changes in the batch, oldest first (the last one per application wins). A
+# closed season may archive the application and job before the event is consumed
+# (MySQL's settle window), so the archive tables stand in for the hot ones.
+STATUS_EVENTS_QUERY = """
+SELECT COALESCE(a.id, aa.id) AS id, COALESCE(a.student_id, aa.student_id) AS student_id,
+       SUBSTR(l.action, 8) AS status, COALESCE(j.title, aj.title) AS title, COALESCE(c.name, '') AS company
+FROM audit_logs l
+LEFT JOIN applications a ON a.id = l.entity_id
+LEFT JOIN archived_applications aa ON a.id IS NULL AND aa.id = l.entity_id
+LEFT JOIN jobs j ON j.id = COALESCE(a.job_id, aa.job_id)
+LEFT JOIN archived_jobs aj ON j.id IS NULL AND aj.id = COALESCE(a.job_id, aa.job_id)
+LEFT JOIN companies c ON c.id = COALESCE(j.company_id, aj.company_id)
+WHERE l.entity = 'applications' AND l.action LIKE 'STATUS %' AND l.id > {ph} AND l.id <= {ph}
+  AND COALESCE(a.id, aa.id) IS NOT NULL AND (j.deleted_at IS NULL AND j.id IS NOT NULL OR aj.id IS NOT NULL)
+ORDER BY l.id
+"""
+
+
+class _StaleMark(Exception):
+    """Another worker moved the high-water mark first; this batch rolls back."""
+
+
+def _chunks(values, size=NOTIFY_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _message(kind, count, detail):
+    if kind == 'status':
+        title, company, status = detail
+        return f"Your application for {title} at {company} is now {status.capitalize()}."
+    title, company = detail
+    if count == 1:
+        return f"New job you are eligible for: {title} at {company}."
+    return f"{count} new jobs you are eligible for, latest: {title} at {company}."
+
+
+def _job_notices(index, jobs):
+    """{(student_id, 'jobs', 0): [new jobs, (title, company) of the newest]} for the batch's jobs."""
+    import numpy as np # Lazy import
+    audiences = [index.eligible_for(job[3]) for job in jobs]
+    sizes = [len(ids) for ids in audiences]
+    if not sum(sizes):
+        return {}
+    students = np.concatenate(audiences)
+    job_of = np.repeat(np.arange(len(jobs)), sizes)
+    order = np.lexsort((job_of, students)) # By student, then by job (oldest first)
+    students, job_of = students[order], job_of[order]
+    last = np.flatnonzero(np.append(students[1:] != students[:-1], True))
+    counts = np.diff(np.append(-1, last))
+    return {(student_id, 'jobs', 0): [count, (jobs[job][1], jobs[job][2])]
+            for student_id, job, count in zip(students[last].tolist(), job_of[last].tolist(), counts.tolist())}
+
+
+def _consume_batch(conn, db_type, index):
+    """Fans out the next batch of audit events; returns (events consumed, {user_id: [messages]})."""
+    ph = '%s' if db_type == 'mysql' else '?'
+    settle = f"AND created_at < NOW() - INTERVAL {ROLLUP_SETTLE_SECONDS} SECOND" if db_type == 'mysql' else ""
+    next_ids = f"""
+    SELECT COUNT(*), MAX(id) FROM (
+        SELECT id FROM audit_logs WHERE id > {ph} {settle} ORDER BY id LIMIT {NOTIFY_BATCH_SIZE}
+    ) AS batch
+    """
+
+    def consume(cursor):
+        # fetchall() throughout: MySQL's unbuffered cursors refuse a new execute with rows left unread
+        cursor.execute(f"SELECT last_id FROM rollup_state WHERE name = {ph}", (NOTIFY_NAME,))
+        rows = cursor.fetchall()
+        if not rows:
+            # First run: only events from now on are news
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM audit_logs")
+            insert = "INSERT IGNORE INTO" if db_type == 'mysql' else "INSERT OR IGNORE INTO"
+            cursor.execute(f"{insert} rollup_state (name, last_id) VALUES ({ph}, {ph})",
+                           (NOTIFY_NAME, int(cursor.fetchall()[0][0])))
+            return 0, {}
+
+        last_id = int(rows[0][0])
+        cursor.execute(next_ids, (last_id,))
+        count, upper = cursor.fetchall()[0]
+        if not count:
+            return 0, {}
+        cursor.execute(f"UPDATE rollup_state SET last_id = {ph} WHERE name = {ph} AND last_id = {ph}",
+                       (upper, NOTIFY_NAME, last_id))
+        if cursor.rowcount != 1:
+            raise _StaleMark()
+
+        # (user_id, kind, ref_id) -> [events, detail]
+        cursor.execute(JOB_EVENTS_QUERY.format(ph=ph), (last_id, upper))
+        notices = _job_notices(index, cursor.fetchall())
+        cursor.execute(STATUS_EVENTS_QUERY.format(ph=ph), (last_id, upper))
+        for app_id, student_id, status, title, company in cursor.fetchall():
+            notice = notices.setdefault((student_id, 'status', app_id), [0, None])
+            notice[0] += 1
+            notice[1] = (title, company, status)
+        if not notices:
+            return int(count), {}
+
+        # Unread rows for the same thing are replaced by one row carrying both counts
+        users = {user_id for user_id, _, _ in notices}
+        merged = []
+        for chunk in _chunks(users):
+            cursor.execute(f"""
+            SELECT id, user_id, kind, ref_id, event_count FROM notifications
+            WHERE read_at IS NULL AND user_id IN ({', '.join([ph] * len(chunk))})
+            """, chunk)
+            for row_id, user_id, kind, ref_id, events in cursor.fetchall():
+                notice = notices.get((user_id, kind, ref_id))
+                if notice is not None:
+                    notice[0] += events
+                    merged.append((row_id,))
+        if merged:
+            cursor.executemany(f"DELETE FROM notifications WHERE id = {ph}", merged)
+
+        # INSERT ... SELECT skips students deleted since the eligibility index last saw them
+        rows = [(kind, ref_id, _message(kind, events, detail), events, user_id)
+                for (user_id, kind, ref_id), (events, detail) in notices.items()]
+        cursor.executemany(f"""
+        INSERT INTO notifications (user_id, kind, ref_id, message, event_count)
+        SELECT id, {ph}, {ph}, {ph}, {ph} FROM users WHERE id = {ph}
+        """, rows)
+
+        inbox = defaultdict(list)
+        for _, _, message, _, user_id in rows:
+            inbox[user_id].append(message)
+        return int(count), inbox
+
+    # Plain reads first: an idle round takes no write lock and signals no write
+    mark = execute_query(conn, "SELECT last_id FROM rollup_state WHERE name = %s", (NOTIFY_NAME,), fetch=True)
+    if mark and not execute_query(conn, f"SELECT id FROM audit_logs WHERE id > %s {settle} LIMIT 1",
+                                  (mark[0]['last_id'],), fetch=True):
+        return 0, {}
+    try:
+        return run_in_transaction(conn, consume)
+    except _StaleMark:
+        return 0, {}
+
+
+def fan_out(conn, db_type):
+    """Delivers every pending job posting / status change; returns (events consumed, notifications written)."""
+    index = get_eligibility_index(conn, db_type) # Refreshed here, read inside the transaction
+    events = written = 0
+    while True:
+        consumed, inbox = _consume_batch(conn, db_type, index)
+        events += consumed
+        written += sum(len(messages) for messages in inbox.values())
+        if inbox and NOTIFY_SMTP_HOST:
+            send_emails(conn, inbox)
+        if consumed < NOTIFY_BATCH_SIZE:
+            return events, written
+
+
+# --- EMAIL ---
+def send_emails(conn, inbox):
+    """Sends each user one email listing their new notifications; returns how many were sent.
+
+    Email is best effort: the inbox rows are already committed, so an unreachable
+    SMTP server only skips the copies.
+    """
+    import smtplib
+    from email.message import EmailMessage
+
+    emails = {}
+    for chunk in _chunks(inbox):
+        query = f"SELECT id, email FROM users WHERE id IN ({', '.join(['%s'] * len(chunk))})"
+        emails.update((row['id'], row['email']) for row in execute_query(conn, query, tuple(chunk), fetch=True) or [])
+
+    sent = 0
+    try:
+        with smtplib.SMTP(NOTIFY_SMTP_HOST, NOTIFY_SMTP_PORT, timeout=NOTIFY_SMTP_TIMEOUT) as smtp:
+            for user_id, messages in inbox.items():
+                if user_id not in emails:
+                    continue
+                msg = EmailMessage()
+                msg['From'] = NOTIFY_MAIL_FROM
+                msg['To'] = emails[user_id]
+                msg['Subject'] = messages[0] if len(messages) == 1 else f"CareerSphere: {len(messages)} updates"
+                msg.set_content("\n".join(f"- {m}" for m in messages) + "\n\nSee your CareerSphere dashboard for details.")
+                smtp.send_message(msg)
+                sent += 1
+    except (OSError, smtplib.SMTPException):
+        pass
+    return sent
+
+
+# --- WORKER ---
+# Tables whose writes log the audit events fanned out here (the audit triggers' tables)
+NOTIFY_SOURCE_TABLES = frozenset({'users', 'jobs', 'applications', 'audit_logs'})
+
+# tenant_id -> set on writes to NOTIFY_SOURCE_TABLES this process commits, except the worker's own
+_wakeups = defaultdict(threading.Event)
+_worker_lock = threading.Lock()
+_workers = {}
+
+
+def _wake(tenant_id, tables):
+    if tables is not None and not tables & NOTIFY_SOURCE_TABLES:
+        return
+    # The worker's own writes are no news to it; waking on them would make it spin
+    if threading.current_thread() is not _workers.get(tenant_id):
+        _wakeups[tenant_id].set()
+
+
+add_write_listener(_wake)
+
+
+def _run_worker(tenant_id):
+    wake = _wakeups[tenant_id]
+    while True:
+        try:
+            conn, db_type = open_background_connection(tenant_id)
+            try:
+                fan_out(conn, db_type)
+            finally:
+                conn.close()
+        except Exception:
+            pass # e.g. database briefly unavailable; the next round retries
+        wake.wait(NOTIFY_INTERVAL)
+        time.sleep(NOTIFY_COALESCE_WINDOW)
+        wake.clear()
+
+
+def start_notification_worker(tenant_id=DEFAULT_TENANT):
+    """Starts the campus's background fan-out thread once per process."""
+    with _worker_lock:
+        thread = _workers.get(tenant_id)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_run_worker, args=(tenant_id,), name=f"notifications:{tenant_id}", daemon=True)
+            thread.start()
+            _workers[tenant_id] = thread
+
+
+# --- INBOX ---
+def unread_count(conn, user_id):
+    data = execute_query(conn, "SELECT COUNT(*) AS n FROM notifications WHERE user_id = %s AND read_at IS NULL",
+                         (user_id,), fetch=True)
+    return data[0]['n'] if data else 0
+
+
+def inbox(conn, user_id, limit=INBOX_SIZE):
+    """The user's newest notifications, read or not."""
+    query = f"""
+    SELECT id, message, event_count, created_at, read_at FROM notifications
+    WHERE user_id = %s ORDER BY id DESC LIMIT {int(limit)}
+    """
+    return execute_query(conn, query, (user_id,), fetch=True) or []
+
+
+def mark_all_read(conn, user_id):
+    return execute_query(conn, "UPDATE notifications SET read_at = CURRENT_TIMESTAMP WHERE user_id = %s AND read_at IS NULL",
+                         (user_id,), commit=True)
+
+
+def inbox_widget(conn, user_id):
+    """Notification list with the unread ones marked, plus a "mark all as read" button."""
+    start_notification_worker(getattr(conn, 'tenant_id', DEFAULT_TENANT))
+    unread = unread_count(conn, user_id)
+    st.header(f"🔔 Notifications ({unread} unread)" if unread else "🔔 Notifications")
+    notices = inbox(conn, user_id)
+    if not notices:
+        st.info("No notifications yet. New jobs you are eligible for and application updates show up here.")
+        return
+    for notice in notices:
+        marker = "🆕 " if notice['read_at'] is None else ""
+        st.markdown(f"{marker}{notice['message']}  \n:gray[{notice['created_at']}]")
+    if unread and st.button("Mark all as read", key="inbox_mark_read"):
+        mark_all_read(conn, user_id)
+        st.rerun()
+
+
+if __name__ == '__main__':
+    import sys
+
+    tenant = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TENANT
+    db_conn, backend = open_background_connection(tenant)
+    try:
+        consumed_events, notified = fan_out(db_conn, backend)
+        print(f"Consumed {consumed_events} audit events for '{tenant}' ({backend}), wrote {notified} notifications.")
+    finally:
+        db_conn.close()
@@ -0,0 +1,226 @@
+# CareerSphere/page_profiler.py
+# Per-page rerun profiler.
+#
+# Every page under pages/ runs inside profiled_page(), which records the rerun's
+# wall time split into:
+#   db      - exact, from database.db_time() (execute_query, transactions, procedures)
+#   render  - Streamlit / matplotlib work (DataFrame->Arrow serialization, st.pyplot,
+#             charts), estimated by sampling the script thread's stack
+#   python  - everything else in the page script (pandas, apply, loops)
+# An admin can also capture the next N reruns with cProfile (.prof, for pstats or
+# snakeviz) or the sampler (.folded stacks, for flamegraph tools); the files are
+# saved under profiles/ and offered for download on the admin dashboard.
+
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+from database import db_time
+
+PROFILE_DIR = "profiles"
+# Seconds between stack samples of a page that is rerunning
+PROFILE_SAMPLE_INTERVAL = 0.005
+# Reruns kept per page for the timing report
+PROFILE_HISTORY = 200
+# Capture files kept on disk (oldest are deleted first)
+PROFILE_MAX_FILES = 50
+
+# Frames from these packages count as rendering
+RENDER_PACKAGES = ('streamlit', 'matplotlib', 'altair')
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_DB_FILES = {os.path.join(_PROJECT_DIR, name) for name in ('database.py', 'write_queue.py')}
+
+
+def _bucket(frame):
+    """Classifies a stack sample: the innermost project or render frame decides."""
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(_PROJECT_DIR) and 'site-packages' not in path:
+            return 'db' if path in _DB_FILES else 'python'
+        if any(f"{os.sep}{pkg}{os.sep}" in path for pkg in RENDER_PACKAGES):
+            return 'render'
+        frame = frame.f_back
+    return 'python'
+
+
+def _folded(frame):
+    """'outer;...;inner' stack line in the folded format flamegraph tools read."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Rerun:
+    def __init__(self, page, capture):
+        self.page = page
+        self.capture = capture        # None, 'cprofile' or 'sampling'
+        self.samples = Counter()      # bucket -> samples
+        self.stacks = Counter()       # folded stack -> samples (sampling captures only)
+
+
+class PageProfiler:
+    """Process-wide rerun timings plus the sampler thread and pending captures."""
+
+    def __init__(self):
+        self.history = defaultdict(lambda: deque(maxlen=PROFILE_HISTORY))
+        self._active = {}             # thread id -> _Rerun
+        self._capture = {'mode': None, 'remaining': 0, 'page': None}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # --- capture requests (admin dashboard) ---
+    def request_capture(self, mode, reruns, page=None):
+        """Profiles the next `reruns` reruns (of `page`, or of any page) with 'cprofile' or 'sampling'."""
+        with self._lock:
+            self._capture = {'mode': mode, 'remaining': reruns, 'page': page}
+
+    def pending_capture(self):
+        with self._lock:
+            return dict(self._capture) if self._capture['remaining'] else None
+
+    def _take_capture(self, page):
+        with self._lock:
+            capture = self._capture
+            if capture['remaining'] and capture['page'] in (None, page):
+                capture['remaining'] -= 1
+                return capture['mode']
+        return None
+
+    # --- sampling ---
+    def _ensure_sampler(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._sample_loop, name="page-profiler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            self._wake.wait()
+            time.sleep(PROFILE_SAMPLE_INTERVAL)
+            with self._lock:
+                active = dict(self._active)
+                if not active:
+                    self._wake.clear() # Under the lock, so a rerun starting now re-sets it
+                    continue
+            frames = sys._current_frames()
+            for thread_id, run in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                run.samples[_bucket(frame)] += 1
+                if run.capture == 'sampling':
+                    run.stacks[_folded(frame)] += 1
+
+    # --- one rerun ---
+    @contextmanager
+    def profile(self, page):
+        run = _Rerun(page, self._take_capture(page))
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active[thread_id] = run
+            self._ensure_sampler()
+            self._wake.set()
+
+        profiler = cProfile.Profile() if run.capture == 'cprofile' else None
+        db_start = db_time()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            total = time.perf_counter() - start
+            db = min(db_time() - db_start, total)
+            with self._lock:
+                self._active.pop(thread_id, None)
+            self._record(run, total, db)
+            if run.capture:
+                self._save_capture(run, profiler)
+
+    def _record(self, run, total, db):
+        # DB time is exact; the rest is split by the share of render vs python samples
+        rest = total - db
+        sampled = run.samples['render'] + run.samples['python']
+        render = rest * run.samples['render'] / sampled if sampled else 0.0
+        self.history[run.page].append({
+            'at': time.time(), 'total': total, 'db': db, 'render': render, 'python': rest - render,
+        })
+
+    def _save_capture(self, run, profiler):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}"
+        base = os.path.join(PROFILE_DIR, f"{stamp}_{run.page}")
+        if profiler is not None:
+            profiler.dump_stats(base + '.prof')
+        else:
+            with open(base + '.folded', 'w') as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in run.stacks.most_common())
+        for old in list_captures()[PROFILE_MAX_FILES:]:
+            os.remove(old['path'])
+
+    # --- report ---
+    def report(self):
+        """One row per page: reruns, mean and p95 wall time, and the mean split (ms)."""
+        rows = []
+        for page, runs in list(self.history.items()):
+            runs = list(runs)
+            if not runs:
+                continue
+            totals = sorted(r['total'] for r in runs)
+            n = len(runs)
+            rows.append({
+                'page': page,
+                'reruns': n,
+                'avg_ms': round(sum(totals) / n * 1000, 1),
+                'p95_ms': round(totals[min(n - 1, int(n * 0.95))] * 1000, 1),
+                'db_ms': round(sum(r['db'] for r in runs) / n * 1000, 1),
+                'python_ms': round(sum(r['python'] for r in runs) / n * 1000, 1),
+                'render_ms': round(sum(r['render'] for r in runs) / n * 1000, 1),
+                'last_at': time.strftime('%H:%M:%S', time.localtime(runs[-1]['at'])),
+            })
+        return sorted(rows, key=lambda r: r['avg_ms'], reverse=True)
+
+    def clear(self):
+        self.history.clear()
+
+
+page_profiler = PageProfiler()
+
+
+def profiled_page(page):
+    """Context manager the page scripts run their page function in."""
+    return page_profiler.profile(page)
+
+
+def list_captures():
+    """Saved capture files, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(('.prof', '.folded')):
+            path = os.path.join(PROFILE_DIR, name)
+            entries.append({'name': name, 'path': path, 'size_kb': round(os.path.getsize(path) / 1024, 1)})
+    return sorted(entries, key=lambda e: e['name'], reverse=True)
+
+
+def capture_summary(path, limit=25):
+    """Text summary of a capture: top functions by cumulative time, or hottest stacks."""
+    if path.endswith('.prof'):
+        import io
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+    with open(path) as f:
+        lines = [line.rsplit(' ', 1) for line in f.read().splitlines()[:limit]]
+    return "\n".join(f"{count:>6}  {stack.split(';')[-1]}  <- {';'.join(stack.split(';')[-4:-1])}" for stack, count in lines)
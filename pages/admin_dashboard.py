@@ -1,78 +1,63 @@
 # CareerSphere/pages/admin_dashboard.py (INTEGRATED VERSION with Analytics Tab)
 
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
-from database import execute_query
+from analytics_snapshot import freshness_bar, get_analytics_source
+from database import DEFAULT_TENANT, PLAN_FLAG_WEIGHTS, TENANTS, backend_monitor, call_procedure, execute_query, plan_recorder
+from page_profiler import capture_summary, list_captures, page_profiler, profiled_page
+from search_index import search_picker
+from seasons import season_admin_widget
+from startup_profile import import_report, init_report, process_uptime
 
 # --- ANALYTICS TAB CONTENT (Moved from analytics.py) ---
 def analytics_tab(conn, db_type):
+    import pandas as pd # Imported lazily to keep cold start fast
     st.subheader("📊 System Analytics & DBMS Verification")
     st.caption("Data-Driven Insights and DBMS Feature Checks (Stored Procedures, Triggers)")
+    analytics = get_analytics_source(conn)
+    freshness_bar(analytics, key="admin_refresh_snapshot")
     st.markdown("---")
 
     # --- 1. Stored Procedure Verification ---
     st.header("Stored Procedure Check: Application Count")
     
-    jobs_query = "SELECT id, title FROM jobs"
-    jobs = execute_query(conn, jobs_query, fetch=True)
+    # Typeahead picker: ids, not titles, so duplicate titles stay distinct
+    picked = search_picker(conn, 'job', "Select a Job to Check Application Count", key="admin_job")
     
-    if jobs:
-        # Map job titles to IDs
-        job_options = {job['title']: job['id'] for job in jobs}
-        selected_title = st.selectbox("Select a Job to Check Application Count", list(job_options.keys()))
-        selected_job_id = job_options[selected_title]
+    if picked:
+        selected_job_id, selected_title = picked
 
         if st.button("Run Stored Procedure"):
             if db_type == 'mysql':
-                # MySQL Stored Procedure Call
+                # MySQL Stored Procedure Call (result sets come back as lists of dicts)
                 try:
-                    # NOTE: This part assumes your 'database.py' manages the cursor correctly
-                    # For mysql.connector, you often need to fetch the result from the next object
-                    cursor = conn.cursor()
-                    cursor.callproc('get_application_count', (selected_job_id, 0)) # 0 is placeholder for OUT param
-                    
-                    # Retrieve the result set (which contains the OUT variable value)
-                    # Iterate through the stored results, usually the last one has the OUT param
-                    total_apps = None
-                    for result in cursor.stored_results():
-                        data = result.fetchone()
-                        if data and 'total_apps' in data:
-                            total_apps = data['total_apps']
-                        elif data and isinstance(data, tuple) and len(data) > 0: # Basic tuple check if dict wasn't returned
-                             total_apps = data[0]
+                    result_sets = call_procedure(conn, 'get_application_count', (selected_job_id, 0)) # 0 is placeholder for OUT param
+                    total_apps = result_sets[-1][0]['total_apps'] if result_sets and result_sets[-1] else None
 
                     if total_apps is not None:
                         st.success(f"✅ **Stored Procedure Verified:** Job '{selected_title}' (ID: {selected_job_id}) has **{total_apps}** applications.")
                     else:
                          st.warning("Stored Procedure ran, but could not retrieve application count result.")
-                    
-                    cursor.close()
                 except Exception as e:
                     st.error(f"Failed to execute Stored Procedure: {e}. Ensure DDL_DML.sql was run correctly.")
             else:
                 # SQLite fallback: directly execute the logic
-                count_query = "SELECT COUNT(*) FROM applications WHERE job_id = ?"
+                count_query = "SELECT COUNT(*) AS total_apps FROM applications WHERE job_id = ?"
                 result = execute_query(conn, count_query, (selected_job_id,), fetch=True)
-                total_apps = result[0][0] if result and result[0] else 0
+                total_apps = result[0]['total_apps'] if result else 0
                 st.info(f"Using SQLite Fallback Logic: Job '{selected_title}' (ID: {selected_job_id}) has **{total_apps}** applications.")
     else:
-        st.info("No jobs available to check.")
+        st.info("No matching jobs to check.")
 
     st.markdown("---")
 
     # --- 2. Streamlit Charts: Application Status Distribution ---
     st.header("Application Status Distribution")
 
-    status_query = "SELECT status, COUNT(*) as count FROM applications GROUP BY status"
-    status_data = execute_query(conn, status_query, fetch=True)
+    status_df = analytics.status_counts()
     
-    if status_data:
-        # Handle tuple-based data from execute_query if it doesn't return dicts
-        if isinstance(status_data[0], tuple):
-            status_df = pd.DataFrame(status_data, columns=['status', 'count'])
-        else:
-            status_df = pd.DataFrame(status_data)
-
+    if status_df is not None:
         st.bar_chart(status_df, x='status', y='count')
         st.dataframe(status_df, use_container_width=True)
     else:
@@ -82,18 +67,12 @@ def analytics_tab(conn, db_type):
 
     # --- 3. Streamlit Charts: Student CGPA Distribution ---
     st.header("Student Profile CGPA Distribution")
-    cgpa_query = "SELECT cgpa FROM students WHERE cgpa IS NOT NULL"
-    cgpa_data = execute_query(conn, cgpa_query, fetch=True)
-
-    if cgpa_data:
-        # Extract CGPA values, handling potential Decimal/None types
-        cgpa_list = [float(d.get('cgpa')) for d in cgpa_data if d.get('cgpa') is not None]
-        if cgpa_list:
-            cgpa_df = pd.DataFrame({'CGPA': cgpa_list})
-            # Use st.bar_chart for histograms in Streamlit (it handles binning)
-            st.bar_chart(cgpa_df, y='CGPA')
-        else:
-            st.info("CGPA data found, but all values are null or invalid.")
+    cgpa_values = analytics.cgpa_values()
+
+    if cgpa_values.size:
+        cgpa_df = pd.DataFrame({'CGPA': cgpa_values})
+        # Use st.bar_chart for histograms in Streamlit (it handles binning)
+        st.bar_chart(cgpa_df, y='CGPA')
     else:
         st.info("No student CGPA data available yet.")
 
@@ -117,6 +96,7 @@ def admin_dashboard():
 
     # --- Overview & Metrics Tab ---
     with dashboard_tab:
+        import pandas as pd
         st.header("Key System Metrics")
         
         # Get Counts (Optimized for both DB types)
@@ -124,21 +104,15 @@ def admin_dashboard():
         SELECT
             (SELECT COUNT(*) FROM users WHERE role='student') AS total_students,
             (SELECT COUNT(*) FROM users WHERE role='recruiter') AS total_recruiters,
-            (SELECT COUNT(*) FROM jobs) AS total_jobs,
+            (SELECT COUNT(*) FROM jobs WHERE deleted_at IS NULL) AS total_jobs,
             (SELECT COUNT(*) FROM applications) AS total_applications
         """
         
         metrics = {}
-        if db_type == 'sqlite': # SQLite requires separate queries
-            # Use a safe way to get the count result
-            metrics['total_students'] = execute_query(conn, "SELECT COUNT(*) FROM users WHERE role='student'")[0][0]
-            metrics['total_recruiters'] = execute_query(conn, "SELECT COUNT(*) FROM users WHERE role='recruiter'")[0][0]
-            metrics['total_jobs'] = execute_query(conn, "SELECT COUNT(*) FROM jobs")[0][0] if execute_query(conn, "SELECT COUNT(*) FROM jobs") else 0
-            metrics['total_applications'] = execute_query(conn, "SELECT COUNT(*) FROM applications")[0][0] if execute_query(conn, "SELECT COUNT(*) FROM applications") else 0
-        else: # MySQL
-            metrics_data = execute_query(conn, metrics_query, fetch=True)
-            if metrics_data:
-                 metrics = metrics_data[0]
+        # Scalar subqueries work on both MySQL and SQLite, so one round trip covers both backends
+        metrics_data = execute_query(conn, metrics_query, fetch=True)
+        if metrics_data:
+             metrics = metrics_data[0]
 
 
         col1, col2, col3, col4 = st.columns(4)
@@ -149,6 +123,30 @@ def admin_dashboard():
         
         st.markdown("---")
 
+        # 1b. Database Backend Health (process-level circuit breaker state)
+        st.subheader("Database Backend")
+        backend = backend_monitor.status()
+        b1, b2, b3 = st.columns(3)
+        b1.metric("New Sessions Use", backend['backend'].upper())
+        b2.metric("MySQL Breaker", backend['breaker_state'].replace('_', '-').upper())
+        b3.metric("This Session", (db_type or 'none').upper())
+        if len(TENANTS) > 1:
+            st.caption(f"🏫 Campus: {TENANTS[st.session_state.get('tenant_id', DEFAULT_TENANT)]['name']} (each campus has its own database)")
+        if backend['last_error']:
+            st.warning(f"Last MySQL error: {backend['last_error']}")
+        st.caption(
+            f"Last probe: {backend['last_probe_at'] or 'never'} · consecutive failures: {backend['consecutive_failures']} · "
+            f"probe every {backend['probe_interval_s']}s · connect timeout {backend['connect_timeout_s']}s"
+        )
+
+        st.markdown("---")
+
+        # 1c. Placement Season (closing one archives its jobs, applications and audit rows)
+        st.subheader("🗓️ Placement Season")
+        season_admin_widget(conn, db_type)
+
+        st.markdown("---")
+
         # 2. View Audit Logs (Trigger Verification)
         st.subheader("System Audit Logs (Trigger Check)")
         audit_query = "SELECT created_at, action, entity, entity_id, user_email FROM audit_logs ORDER BY created_at DESC LIMIT 10"
@@ -160,6 +158,75 @@ def admin_dashboard():
         else:
             st.info("No audit logs yet. Try posting a job as a recruiter to test the trigger!")
 
+        st.markdown("---")
+
+        # 3. Startup Profile (cold-start cost breakdown)
+        with st.expander("⏱️ Startup Profile"):
+            st.caption(f"Process uptime: {process_uptime():.0f}s. Cold = first run in this process, warm = average of later runs.")
+            init_rows = init_report()
+            if init_rows:
+                st.dataframe(pd.DataFrame(init_rows), use_container_width=True, hide_index=True)
+            else:
+                st.info("No init timings recorded yet (open the app through app.py).")
+
+            if st.button("Measure Import Cost (fresh interpreter)", key="startup_import_report"):
+                with st.spinner("Importing modules in a fresh interpreter..."):
+                    st.dataframe(pd.DataFrame(import_report()), use_container_width=True, hide_index=True)
+
+        # 4. Query Plans (EXPLAIN of every distinct statement while capture is on)
+        with st.expander("🔎 Query Plans"):
+            plan_recorder.enabled = st.toggle(
+                "Capture query plans (all sessions in this process)", value=plan_recorder.enabled, key="plan_capture",
+                help="Runs EXPLAIN once per distinct statement. Leave off in normal operation.",
+            )
+            report = plan_recorder.report()
+            if report:
+                flagged = [r for r in report if r['flags']]
+                st.caption(f"{len(report)} statements captured, {len(flagged)} flagged "
+                           f"({', '.join(PLAN_FLAG_WEIGHTS)}), worst first.")
+                plans_df = pd.DataFrame(report)[['flags', 'calls', 'avg_ms', 'total_ms', 'db_type', 'statement']]
+                st.dataframe(plans_df, use_container_width=True, hide_index=True)
+
+                chosen = st.selectbox("Show plan for", range(len(report)), key="plan_detail",
+                                      format_func=lambda i: f"#{i + 1} {report[i]['statement'][:90]}")
+                st.code(report[chosen]['statement'], language='sql')
+                st.code("\n".join(report[chosen]['plan']) or "(no plan rows)", language='text')
+                if st.button("Clear captured plans", key="plan_clear"):
+                    plan_recorder.clear()
+                    st.rerun()
+            else:
+                st.info("No statements captured yet. Turn capture on and browse the pages to profile.")
+
+        # 5. Page Render Profile (per-page rerun time split, cProfile/sampling captures)
+        with st.expander("📈 Page Render Profile"):
+            st.caption("Mean rerun time per page in this process. DB time is measured exactly; "
+                       "the rest is split into Python vs. rendering (Streamlit/matplotlib) by stack sampling.")
+            page_rows = page_profiler.report()
+            if page_rows:
+                st.dataframe(pd.DataFrame(page_rows), use_container_width=True, hide_index=True)
+            else:
+                st.info("No page reruns recorded yet.")
+
+            c1, c2, c3 = st.columns(3)
+            mode = c1.radio("Profiler", ["cprofile", "sampling"], horizontal=True, key="profile_mode",
+                            format_func={'cprofile': "cProfile", 'sampling': "Sampling"}.get)
+            reruns = c2.number_input("Next reruns", min_value=1, max_value=20, value=3, key="profile_reruns")
+            target = c3.selectbox("Page", ["Any page", *sorted(row['page'] for row in page_rows)], key="profile_page")
+            if st.button("Capture", key="profile_capture"):
+                # This page's own rerun (triggered by the click) is already running, so it is not captured
+                page_profiler.request_capture(mode, int(reruns), None if target == "Any page" else target)
+            pending = page_profiler.pending_capture()
+            if pending:
+                st.caption(f"⏳ Waiting to profile {pending['remaining']} more rerun(s) of {pending['page'] or 'any page'} ({pending['mode']}).")
+
+            captures = list_captures()
+            if captures:
+                chosen = st.selectbox("Saved captures", captures, key="profile_file",
+                                      format_func=lambda c: f"{c['name']} ({c['size_kb']} KB)")
+                st.code(capture_summary(chosen['path']), language='text')
+                st.download_button("Download", data=Path(chosen['path']).read_bytes, file_name=chosen['name'],
+                                   mime="application/octet-stream", on_click="ignore", key="profile_download")
+
     # --- Analytics & DBMS Check Tab ---
     with analytics_tab_btn:
         analytics_tab(conn, db_type) # Call the integrated analytics function
@@ -174,4 +241,31 @@ def admin_dashboard():
         st.button("Go to Recruiter Approval Interface (Future Feature)", key="manage_rec", disabled=True)
         st.button("Manage Students (Future Feature)", key="manage_student", disabled=True)
 
-admin_dashboard()
\ No newline at end of file
+        # 2. Directory lookup (typeahead over student and company names)
+        st.subheader("🔎 Directory Lookup")
+        col1, col2 = st.columns(2)
+        with col1:
+            student = search_picker(conn, 'student', "Find a student (name or roll no.)", key="lookup_student")
+            if student:
+                ph = '%s' if db_type == 'mysql' else '?'
+                rows = execute_query(conn, f"""
+                SELECT s.roll_no, s.full_name, s.branch, s.cgpa, u.email,
+                       (SELECT COUNT(*) FROM applications a WHERE a.student_id = s.id) AS applications
+                FROM students s JOIN users u ON u.id = s.id
+                WHERE s.id = {ph}
+                """, (student[0],), fetch=True)
+                if rows:
+                    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        with col2:
+            company = search_picker(conn, 'company', "Find a company", key="lookup_company")
+            if company:
+                ph = '%s' if db_type == 'mysql' else '?'
+                rows = execute_query(conn, f"""
+                SELECT (SELECT COUNT(*) FROM recruiters WHERE company_id = {ph}) AS recruiters,
+                       (SELECT COUNT(*) FROM jobs WHERE company_id = {ph} AND deleted_at IS NULL) AS jobs
+                """, (company[0], company[0]), fetch=True)
+                if rows:
+                    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+with profiled_page("admin_dashboard"):
+    admin_dashboard()
@@ -1,7 +1,10 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from database import execute_query
+from analytics_snapshot import freshness_bar, get_analytics_source
+from database import call_procedure, execute_query
+from funnel_rollups import FUNNEL_DIMENSIONS, funnel_breakdown, funnel_trend, refresh_funnel
+from page_profiler import profiled_page
+from search_index import search_picker
+from seasons import season_history_widget
 
 # ==========================================================
 # CAREERSPHERE ANALYTICS PAGE
@@ -19,6 +22,9 @@ def analytics_page():
     
     st.title("📊 System Analytics & DBMS Verification")
     st.subheader("Data-Driven Insights for CareerSphere")
+    # Charts come from the columnar snapshot, not the live tables
+    analytics = get_analytics_source(conn)
+    freshness_bar(analytics, key="analytics_refresh_snapshot")
     st.markdown("---")
 
     # ==========================================================
@@ -26,26 +32,19 @@ def analytics_page():
     # ==========================================================
     st.header("Stored Procedure Check: Application Count")
     
-    # Fetch jobs to populate dropdown
-    jobs_query = "SELECT id, title FROM jobs"
-    jobs = execute_query(conn, jobs_query, fetch=True)
+    # Typeahead over the campus's job titles (and company names), served from memory
+    picked = search_picker(conn, 'job', "Select a Job to Check Application Count", key="analytics_job")
     
-    if jobs:
-        job_options = {job['title']: job['id'] for job in jobs}
-        selected_title = st.selectbox("Select a Job to Check Application Count", list(job_options.keys()))
-        selected_job_id = job_options[selected_title]
+    if picked:
+        selected_job_id, selected_title = picked
 
         if st.button("Run Stored Procedure"):
             if db_type == 'mysql':
                 try:
-                    # ✅ Run MySQL stored procedure
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.callproc('get_application_count', (selected_job_id, 0))  # IN, OUT
-                    # Fetch result
-                    result = next(cursor.stored_results()).fetchone()
-                    total_apps = result.get('total_apps', 0) if isinstance(result, dict) else result[0]
+                    # ✅ Run MySQL stored procedure (IN, OUT); result sets come back as lists of dicts
+                    result_sets = call_procedure(conn, 'get_application_count', (selected_job_id, 0))
+                    total_apps = result_sets[-1][0].get('total_apps', 0)
                     st.success(f"✅ **Stored Procedure Verified:** Job '{selected_title}' (ID: {selected_job_id}) has **{total_apps}** applications.")
-                    cursor.close()
                 except Exception as e:
                     st.error(f"❌ Failed to execute Stored Procedure: {e}")
                     st.info("Hint: Ensure the procedure 'get_application_count' is created in your database.")
@@ -56,7 +55,7 @@ def analytics_page():
                 total_apps = result[0]['total'] if isinstance(result[0], dict) else result[0][0]
                 st.info(f"Using SQLite fallback: Job '{selected_title}' (ID: {selected_job_id}) has **{total_apps}** applications.")
     else:
-        st.info("No jobs available to check application count.")
+        st.info("No matching jobs to check application count.")
     
     st.markdown("---")
 
@@ -65,12 +64,12 @@ def analytics_page():
     # ==========================================================
     st.header("📈 Application Status Distribution")
 
-    status_query = "SELECT status, COUNT(*) AS count FROM applications GROUP BY status"
-    status_data = execute_query(conn, status_query, fetch=True)
+    status_df = analytics.status_counts()
     
-    if status_data:
-        # Convert to DataFrame for Streamlit
-        status_df = pd.DataFrame(status_data)
+    if status_df is not None:
+        # Lazy import: matplotlib is only loaded when there is something to plot
+        import matplotlib.pyplot as plt
+
         st.bar_chart(status_df, x='status', y='count', use_container_width=True)
         st.dataframe(status_df, use_container_width=True)
         
@@ -89,42 +88,72 @@ def analytics_page():
     # 3️⃣ Student CGPA Distribution (Histogram + Metric)
     # ==========================================================
     st.header("🎓 Student CGPA Distribution")
-    cgpa_query = "SELECT cgpa FROM students WHERE cgpa IS NOT NULL"
-    cgpa_data = execute_query(conn, cgpa_query, fetch=True)
-
-    if cgpa_data:
-        # Extract valid CGPA values
-        cgpa_list = [float(d.get('cgpa')) for d in cgpa_data if d.get('cgpa') is not None]
-
-        if cgpa_list:
-            fig, ax = plt.subplots()
-            ax.hist(cgpa_list, bins=10, color='#2b83ba', edgecolor='white')
-            ax.set_title("Student CGPA Distribution")
-            ax.set_xlabel("CGPA")
-            ax.set_ylabel("Number of Students")
-            st.pyplot(fig)
-
-            avg_cgpa = sum(cgpa_list) / len(cgpa_list)
-            st.metric("Average CGPA", f"{avg_cgpa:.2f}")
-        else:
-            st.info("CGPA data found, but all values are null or invalid.")
+    cgpa_values = analytics.cgpa_values() # NumPy array, nulls already dropped
+
+    if cgpa_values.size:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots()
+        ax.hist(cgpa_values, bins=10, color='#2b83ba', edgecolor='white')
+        ax.set_title("Student CGPA Distribution")
+        ax.set_xlabel("CGPA")
+        ax.set_ylabel("Number of Students")
+        st.pyplot(fig)
+
+        st.metric("Average CGPA", f"{cgpa_values.mean():.2f}")
     else:
         st.info("No student CGPA data available yet.")
     
     st.markdown("---")
 
     # ==========================================================
-    # 4️⃣ Optional: Trigger Verification (Audit Logs)
+    # 4️⃣ Placement Funnel Trends (from the funnel_daily rollups)
+    # ==========================================================
+    st.header("📉 Placement Funnel Trends")
+    refresh_funnel(conn, db_type) # Consumes only the audit events since the last visit
+
+    col1, col2 = st.columns(2)
+    days = col1.selectbox("Period", [7, 30, 90, 365], index=1, format_func=lambda d: f"Last {d} days")
+    dimension = col2.radio("Conversion by", list(FUNNEL_DIMENSIONS), horizontal=True)
+
+    trend_df = funnel_trend(conn, days)
+    if not trend_df.empty:
+        st.line_chart(trend_df, x='day', y=['applied', 'shortlisted', 'accepted'], use_container_width=True)
+        breakdown_df = funnel_breakdown(conn, dimension, days)
+        st.dataframe(
+            breakdown_df.rename(columns={'label': dimension}), hide_index=True, use_container_width=True,
+            column_config={
+                'shortlist_rate': st.column_config.ProgressColumn("Shortlisted / Applied", format="percent", min_value=0, max_value=1),
+                'accept_rate': st.column_config.ProgressColumn("Accepted / Applied", format="percent", min_value=0, max_value=1),
+            },
+        )
+    else:
+        st.info("No application activity in this period.")
+
+    st.markdown("---")
+
+    # ==========================================================
+    # 5️⃣ Season History (closed seasons, from the archive tables)
+    # ==========================================================
+    st.header("📚 Season History")
+    season_history_widget(conn)
+
+    st.markdown("---")
+
+    # ==========================================================
+    # 6️⃣ Optional: Trigger Verification (Audit Logs)
     # ==========================================================
     st.header("🧾 Trigger Verification Logs")
+    # Read live on purpose: this checks that the triggers fire right now
     logs_query = "SELECT created_at, action, entity, user_email FROM audit_logs ORDER BY created_at DESC LIMIT 10"
     logs = execute_query(conn, logs_query, fetch=True)
     
     if logs:
+        import pandas as pd
         st.dataframe(pd.DataFrame(logs), use_container_width=True)
         st.success("✅ Triggers Verified — System automatically records activity in 'audit_logs'.")
     else:
         st.info("No trigger activity yet. Try registering a user or posting a job.")
 
 # Run the page
-analytics_page()
+with profiled_page("analytics"):
+    analytics_page()
@@ -1,8 +1,16 @@
 # CareerSphere/pages/applications.py
 
+from datetime import datetime, time
+
 import streamlit as st
-import pandas as pd
-from database import execute_query
+from change_feed import POLL_INTERVAL, get_delta_view
+from exports import applicant_export_widget
+from interview_scheduler import (add_slots, clear_schedule, job_interviews, job_slots, remove_empty_slots,
+                                 schedule_job, set_application_status, student_interviews)
+from page_profiler import profiled_page
+from resume_store import resume_download_widget
+from search_index import search, search_picker
+from seasons import student_history
 
 def applications_page():
     # --- Access Control ---
@@ -29,43 +37,91 @@ def applications_page():
 def recruiter_application_review(conn, db_type, recruiter_id):
     st.header("Review & Update Applicant Status (Update)")
 
-    # 1. Select the job to review
-    job_query = "SELECT id, title FROM jobs WHERE recruiter_id = %s" if db_type == 'mysql' else "SELECT id, title FROM jobs WHERE recruiter_id = ?"
-    jobs = execute_query(conn, job_query, (recruiter_id,), fetch=True)
-    
-    if not jobs:
+    # 1. Select the job to review (typeahead over this recruiter's postings)
+    if not search(conn, 'job', '', scope=recruiter_id, limit=1):
         st.info("You must post a job before reviewing applications.")
         st.stop()
         
-    job_options = {job['title']: job['id'] for job in jobs}
-    selected_title = st.selectbox("Select Job Posting to Review", list(job_options.keys()))
-    selected_job_id = job_options[selected_title]
+    picked = search_picker(conn, 'job', "Select Job Posting to Review", key="review_job", scope=recruiter_id)
+    if picked is None:
+        st.info("None of your job postings match that search.")
+        st.stop()
+    selected_job_id, selected_title = picked
     
     st.markdown("---")
+
+    live_applicant_review(conn, db_type, selected_job_id, selected_title)
+
+    # Outside the live fragment: the resume list does not need to be re-read on every poll
+    resume_download_widget(conn, db_type, selected_job_id, selected_title, key_prefix="review")
+
+    interview_scheduling(conn, db_type, selected_job_id)
+
+def interview_scheduling(conn, db_type, job_id):
+    st.markdown("---")
+    st.subheader("📅 Interview Scheduling")
+    st.caption("Shortlisted applicants are booked into your slots so that no student has two overlapping interviews, with any company.")
+
+    # 1. Slots
+    with st.expander("➕ Add interview slots"):
+        with st.form("add_slots_form"):
+            col1, col2 = st.columns(2)
+            day = col1.date_input("Date")
+            first = col2.time_input("First slot starts", value=time(9, 0))
+            col3, col4, col5, col6 = st.columns(4)
+            minutes = col3.number_input("Minutes per slot", min_value=10, max_value=240, value=30, step=5)
+            gap = col4.number_input("Break between slots (min)", min_value=0, max_value=120, value=0, step=5)
+            count = col5.number_input("Number of slots", min_value=1, max_value=200, value=8)
+            capacity = col6.number_input("Panels per slot", min_value=1, max_value=20, value=1)
+            if st.form_submit_button("Add Slots"):
+                added = add_slots(conn, db_type, job_id, datetime.combine(day, first), int(minutes), int(count), int(capacity), int(gap))
+                st.toast(f"Added {added} slot(s).")
+                st.rerun()
+
+    # 2. Scheduling actions
+    col1, col2, col3 = st.columns(3)
+    if col1.button("🗓️ Schedule shortlisted applicants", type="primary"):
+        with st.spinner("Matching applicants to slots..."):
+            result = schedule_job(conn, db_type, job_id)
+        if not result['applicants']:
+            st.info("Every shortlisted applicant already has an interview.")
+        elif result['unbooked']:
+            st.warning(f"Booked {result['booked']} of {result['applicants']} applicant(s) in {result['seconds']:.1f}s. "
+                       f"{result['unbooked']} could not be fitted: add slots, or they are busy at every free slot.")
+        else:
+            st.success(f"Booked all {result['booked']} applicant(s) in {result['seconds']:.1f}s.")
+    if col2.button("Remove empty slots"):
+        st.toast(f"Removed {remove_empty_slots(conn, db_type, job_id)} empty slot(s).")
+    if col3.button("Cancel all bookings"):
+        st.toast(f"Cancelled {clear_schedule(conn, db_type, job_id)} booking(s).")
+
+    # 3. Current schedule
+    slots = job_slots(conn, job_id)
+    if not slots:
+        st.info("No interview slots yet. Add some above.")
+        return
+    import pandas as pd # Lazy import
+    slots_df = pd.DataFrame(slots)
+    st.caption(f"{len(slots_df)} slot(s) · {int(slots_df['booked'].sum())} of {int(slots_df['capacity'].sum())} places booked")
+    st.dataframe(slots_df.drop(columns=['id']), use_container_width=True, hide_index=True)
+    interviews = job_interviews(conn, job_id)
+    if interviews:
+        st.dataframe(pd.DataFrame(interviews).rename(columns={'app_id': 'App ID'}), use_container_width=True, hide_index=True)
+
+@st.fragment(run_every=POLL_INTERVAL)
+def live_applicant_review(conn, db_type, selected_job_id, selected_title):
+    # 2. Applicants for the selected job: polled on a timer, only changed rows are fetched
+    view = get_delta_view('job_applicants', selected_job_id)
+    view.refresh(conn, db_type)
     
-    # 2. Fetch applicants for the selected job
-    applicants_query = """
-    SELECT 
-        a.id AS app_id, s.full_name, s.roll_no, s.branch, s.cgpa, a.status, s.resume_url
-    FROM applications a
-    JOIN students s ON a.student_id = s.id
-    WHERE a.job_id = %s
-    ORDER BY a.applied_at DESC
-    """ if db_type == 'mysql' else """
-    SELECT 
-        a.id AS app_id, s.full_name, s.roll_no, s.branch, s.cgpa, a.status, s.resume_url
-    FROM applications a
-    JOIN students s ON a.student_id = s.id
-    WHERE a.job_id = ?
-    ORDER BY a.applied_at DESC
-    """
-    
-    applicants = execute_query(conn, applicants_query, (selected_job_id,), fetch=True)
-    
-    if applicants:
+    if view:
         st.subheader(f"Applicants for {selected_title}")
-        applicants_df = pd.DataFrame(applicants).rename(columns={'app_id': 'App ID'})
+        applicants_df = view.frame().rename(columns={'app_id': 'App ID'})
         st.dataframe(applicants_df, use_container_width=True, hide_index=True)
+        st.caption(f"🔄 Live: checked for changes every {POLL_INTERVAL}s ({view.last_changes} changed in the last check).")
+
+        # Streamed export (large jobs never get materialized in full)
+        applicant_export_widget(conn, db_type, selected_job_id, selected_title, key_prefix="review")
         
         # 3. Update Status Form
         with st.form("status_update_form"):
@@ -74,46 +130,49 @@ def recruiter_application_review(conn, db_type, recruiter_id):
             update_button = st.form_submit_button("Update Status", type="secondary")
 
             if update_button:
-                update_query = "UPDATE applications SET status = %s WHERE id = %s" if db_type == 'mysql' else "UPDATE applications SET status = ? WHERE id = ?"
-                update_params = (new_status, app_id)
-
-                if execute_query(conn, update_query, update_params, commit=True) is not None:
+                try:
+                    # Leaving 'shortlisted' also cancels the applicant's interview booking
+                    updated = set_application_status(conn, db_type, app_id, new_status)
+                except Exception as e:
+                    updated = False
+                    st.error(f"Failed to update status. Details: {e}")
+                else:
+                    if not updated:
+                        st.error("Failed to update status. Check Application ID.")
+                if updated:
                     st.success(f"Application {app_id} status updated to **{new_status.upper()}**!")
                     st.rerun()
-                else:
-                    st.error("Failed to update status. Check Application ID.")
     else:
         st.info("No applications received for this job yet.")
 
 # --- Student Functions ---
 def student_application_tracking(conn, db_type, student_id):
     st.header("Your Application Status (Read)")
+    live_application_tracking(conn, db_type, student_id)
+
+    interviews = student_interviews(conn, student_id)
+    if interviews:
+        import pandas as pd # Lazy import
+        st.subheader("📅 Your Interviews")
+        st.dataframe(pd.DataFrame(interviews), use_container_width=True, hide_index=True)
+
+    history = student_history(conn, student_id)
+    if history:
+        import pandas as pd # Lazy import
+        with st.expander(f"📚 Past seasons ({len(history)} applications)"):
+            st.dataframe(pd.DataFrame(history), use_container_width=True, hide_index=True)
+
+@st.fragment(run_every=POLL_INTERVAL)
+def live_application_tracking(conn, db_type, student_id):
+    # Polled on a timer; each poll only fetches applications (or their jobs) changed since the last one
+    view = get_delta_view('student_applications', student_id)
+    view.refresh(conn, db_type)
     
-    tracking_query = """
-    SELECT 
-        j.title as job_title, c.name as company, a.applied_at, a.status 
-    FROM applications a
-    JOIN jobs j ON a.job_id = j.id
-    JOIN companies c ON j.company_id = c.id
-    WHERE a.student_id = %s
-    ORDER BY a.applied_at DESC
-    """ if db_type == 'mysql' else """
-    SELECT 
-        j.title as job_title, c.name as company, a.applied_at, a.status 
-    FROM applications a
-    JOIN jobs j ON a.job_id = j.id
-    JOIN companies c ON j.company_id = c.id
-    WHERE a.student_id = ?
-    ORDER BY a.applied_at DESC
-    """
-    
-    applications = execute_query(conn, tracking_query, (student_id,), fetch=True)
-    
-    if applications:
-        app_df = pd.DataFrame(applications)
-        st.dataframe(app_df, use_container_width=True)
+    if view:
+        st.dataframe(view.frame().drop(columns=['app_id']), use_container_width=True)
         st.info("Status Legend: Applied $\rightarrow$ Shortlisted $\rightarrow$ Accepted/Rejected")
     else:
         st.info("You have not submitted any job applications yet.")
 
-applications_page()
\ No newline at end of file
+with profiled_page("applications"):
+    applications_page()
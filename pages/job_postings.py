@@ -1,8 +1,12 @@
 # CareerSphere/pages/job_postings.py (UPDATED)
 
 import streamlit as st
-import pandas as pd
 from database import execute_query
+from eligibility_index import eligibility_text, get_eligibility_index
+from page_profiler import profiled_page
+from profile_cache import get_recruiter_profile, get_student_profile
+from workflows import apply_to_job, post_job
+from write_queue import WriteQueueFull
 
 def job_postings_page():
     # --- Access Control ---
@@ -29,55 +33,44 @@ def job_postings_page():
 def recruiter_job_management(conn, db_type, recruiter_id):
     st.header("Post a New Job (Create)")
     
-    # ... (Recruiter Company ID setup remains the same)
+    # Recruiter's company (resolved at registration, cached for the session)
+    profile = get_recruiter_profile(conn, db_type, recruiter_id)
     
-    # Get Recruiter's Company ID
-    company_name_query = "SELECT company_name FROM recruiters WHERE id = %s" if db_type == 'mysql' else "SELECT company_name FROM recruiters WHERE id = ?"
-    company_name_data = execute_query(conn, company_name_query, (recruiter_id,), fetch=True)
-    
-    if not company_name_data:
+    if profile is None or profile.company_id is None:
         st.error("Recruiter profile incomplete. Cannot post jobs.")
         return
         
-    company_name = company_name_data[0]['company_name']
-    
-    # Fetch or Create Company ID
-    company_check_query = "SELECT id FROM companies WHERE name = %s" if db_type == 'mysql' else "SELECT id FROM companies WHERE name = ?"
-    company_id_data = execute_query(conn, company_check_query, (company_name,), fetch=True)
-    
-    if not company_id_data:
-        insert_company_query = "INSERT INTO companies (name) VALUES (%s)" if db_type == 'mysql' else "INSERT INTO companies (name) VALUES (?)"
-        execute_query(conn, insert_company_query, (company_name,), commit=True)
-        # Re-fetch the ID after insertion
-        company_id = execute_query(conn, company_check_query, (company_name,), fetch=True)[0]['id']
-    else:
-        company_id = company_id_data[0]['id']
+    company_name = profile.company_name
 
     st.info(f"Posting job under company: **{company_name}**")
 
+    # Criteria builder outside the form, so the eligible count updates as it changes
+    st.subheader("Eligibility Preview")
+    index = get_eligibility_index(conn, db_type)
+    col1, col2, col3 = st.columns([1, 2, 3])
+    min_cgpa = col1.number_input("Min CGPA", min_value=0.0, max_value=10.0, value=0.0, step=0.25, key="elig_min_cgpa")
+    branches = col2.multiselect("Branches (any)", index.branch_names(), key="elig_branches")
+    skills = col3.multiselect("Skills (all)", index.top_skills(), key="elig_skills", accept_new_options=True)
+    eligible = index.count(min_cgpa, branches, skills)
+    st.metric("Eligible students", f"{eligible:,}", help=f"Out of {len(index):,} student profiles on this campus.")
+
     with st.form("new_job_form"):
         title = st.text_input("Job Title")
         location = st.text_input("Location")
-        # Critical field for recruiter shortlisting logic
-        eligibility = st.text_area("Eligibility Criteria (e.g., CGPA > 7.5, Branch: CSE/IT, Skills: Python, SQL)", height=100)
+        # Critical field for recruiter shortlisting logic (prefilled from the preview criteria)
+        eligibility = st.text_area("Eligibility Criteria (e.g., CGPA > 7.5, Branch: CSE/IT, Skills: Python, SQL)",
+                                   value=eligibility_text(min_cgpa, branches, skills), height=100)
         description = st.text_area("Job Description", height=200)
         
         submit_button = st.form_submit_button("Post Job", type="primary")
 
         if submit_button:
-            insert_query = """
-            INSERT INTO jobs (recruiter_id, company_id, title, location, eligibility, description) 
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """ if db_type == 'mysql' else """
-            INSERT INTO jobs (recruiter_id, company_id, title, location, eligibility, description) 
-            VALUES (?, ?, ?, ?, ?, ?)
-            """
-            insert_params = (recruiter_id, company_id, title, location, eligibility, description)
-            
-            if execute_query(conn, insert_query, insert_params, commit=True) is not None:
-                st.success(f"Job '{title}' posted successfully! (Trigger logged the action)")
-            else:
-                st.error("Failed to post job.")
+            # One round trip: the job row takes the recruiter's company_id server-side
+            try:
+                job_id = post_job(conn, db_type, recruiter_id, title, location, eligibility, description)
+                st.success(f"Job '{title}' posted successfully! (Job ID {job_id}, trigger logged the action)")
+            except Exception as e:
+                st.error(f"Failed to post job. Details: {e}")
 
 # --- Student Functions (View and Apply) ---
 def student_job_application(conn, db_type, student_id):
@@ -91,6 +84,7 @@ def student_job_application(conn, db_type, student_id):
     FROM jobs j
     JOIN companies c ON j.company_id = c.id
     LEFT JOIN applications a ON j.id = a.job_id AND a.student_id = %s
+    WHERE j.deleted_at IS NULL
     ORDER BY j.created_at DESC
     """ if db_type == 'mysql' else """
     SELECT 
@@ -99,12 +93,14 @@ def student_job_application(conn, db_type, student_id):
     FROM jobs j
     JOIN companies c ON j.company_id = c.id
     LEFT JOIN applications a ON j.id = a.job_id AND a.student_id = ?
+    WHERE j.deleted_at IS NULL
     ORDER BY j.created_at DESC
     """
     
     available_jobs = execute_query(conn, jobs_query, (student_id,), fetch=True)
     
     if available_jobs:
+        import pandas as pd # Lazy import (heavy module, not needed for empty feeds)
         jobs_df = pd.DataFrame(available_jobs).rename(columns={'id': 'Job ID'})
         st.dataframe(jobs_df, use_container_width=True, hide_index=True)
         
@@ -112,11 +108,10 @@ def student_job_application(conn, db_type, student_id):
         
         st.subheader("Apply for a Job")
         
-        # Fetch full student profile for eligibility check
-        profile_query = "SELECT cgpa, skills FROM students WHERE id = %s" if db_type == 'mysql' else "SELECT cgpa, skills FROM students WHERE id = ?"
-        student_profile_data = execute_query(conn, profile_query, (student_id,), fetch=True)
+        # Student profile for eligibility check (cached for the session)
+        student_profile = get_student_profile(conn, db_type, student_id)
         
-        is_profile_ready = student_profile_data and student_profile_data[0].get('cgpa') and student_profile_data[0].get('skills')
+        is_profile_ready = student_profile is not None and student_profile.is_ready_to_apply
         
         if not is_profile_ready:
             st.error("⚠️ **CRITICAL:** Your **CGPA** and **Skills** must be set on the Student Dashboard before you can apply.")
@@ -136,22 +131,21 @@ def student_job_application(conn, db_type, student_id):
             apply_button = st.form_submit_button("Submit Application", type="primary", disabled=not is_profile_ready)
             
             if apply_button:
-                # Check if already applied
-                check_query = "SELECT id FROM applications WHERE job_id = %s AND student_id = %s" if db_type == 'mysql' else "SELECT id FROM applications WHERE job_id = ? AND student_id = ?"
-                already_applied = execute_query(conn, check_query, (job_to_apply, student_id), fetch=True)
-                
-                if already_applied:
-                    st.warning("You have already applied for this job.")
+                # Duplicate check and insert happen in one server-side call
+                try:
+                    applied = apply_to_job(conn, db_type, int(job_to_apply), student_id)
+                except WriteQueueFull as e:
+                    # Deadline surge: the SQLite write queue is at capacity
+                    st.warning(f"⏳ {e}")
+                    st.stop()
+
+                if applied:
+                    st.success(f"Application submitted successfully for Job ID {job_to_apply}! Recruiter can now view your full profile.")
+                    st.rerun()
                 else:
-                    apply_query = "INSERT INTO applications (job_id, student_id) VALUES (%s, %s)" if db_type == 'mysql' else "INSERT INTO applications (job_id, student_id) VALUES (?, ?)"
-                    apply_params = (job_to_apply, student_id)
-                    
-                    if execute_query(conn, apply_query, apply_params, commit=True) is not None:
-                        st.success(f"Application submitted successfully for Job ID {job_to_apply}! Recruiter can now view your full profile.")
-                        st.rerun()
-                    else:
-                        st.error("Failed to submit application.")
+                    st.warning("You have already applied for this job.")
     else:
         st.info("No job postings are available at the moment.")
 
-job_postings_page()
\ No newline at end of file
+with profiled_page("job_postings"):
+    job_postings_page()
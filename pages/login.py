@@ -1,7 +1,9 @@
 # CareerSphere/login.py (FINALIZED WITH LOGOUT BUTTON)
 
 import streamlit as st
-from database import execute_query
+from database import DEFAULT_TENANT, TENANTS, execute_query, release_session_connection, switch_tenant
+from page_profiler import profiled_page
+from profile_cache import clear_profile_cache
 # NOTE: If you haven't implemented the DB safeguard from previous steps, 
 # you'll need to import get_db_connection here as well.
 
@@ -11,6 +13,8 @@ def logout_page_action():
     st.session_state['user_role'] = None
     st.session_state['user_id'] = None
     st.session_state['user_email'] = None
+    clear_profile_cache()
+    release_session_connection() # Back to the campus pool for the next login
     st.success("Logged out successfully! Redirecting...")
     st.rerun()
 
@@ -28,11 +32,20 @@ def login_page():
         # Stop the rest of the login form from rendering
         return 
 
+    # Campus picker (only shown when more than one campus is configured)
+    tenant_id = st.session_state.get('tenant_id', DEFAULT_TENANT)
+    if len(TENANTS) > 1:
+        tenant_ids = list(TENANTS.keys())
+        tenant_id = st.selectbox("Campus", tenant_ids, index=tenant_ids.index(tenant_id), format_func=lambda t: TENANTS[t]['name'])
+
     email = st.text_input("Email")
     password = st.text_input("Password", type="password")
 
     if st.button("Login", type="primary"):
         if email and password:
+            # Each campus has its own database; point this session at the chosen one
+            switch_tenant(tenant_id)
+
             # Safely check for db_conn before use
             if 'db_conn' not in st.session_state or st.session_state['db_conn'] is None:
                 st.error("Database connection not established. Cannot log in.")
@@ -53,6 +66,7 @@ def login_page():
                 st.session_state['user_role'] = user['role']
                 st.session_state['user_id'] = user['id']
                 st.session_state['user_email'] = user['email']
+                clear_profile_cache() # Profiles are cached per user; start fresh
                 st.success(f"Login successful as {user['role'].upper()}! Redirecting...")
                 
                 # Rerun to update the sidebar and navigate to the dashboard
@@ -63,4 +77,5 @@ def login_page():
         else:
             st.warning("Please enter both email and password.")
 
-login_page()
\ No newline at end of file
+with profiled_page("login"):
+    login_page()
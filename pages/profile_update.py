@@ -1,8 +1,68 @@
 # CareerSphere/pages/profile_update.py
 
 import streamlit as st
-import pandas as pd
-from database import execute_query
+from page_profiler import profiled_page
+from profile_cache import get_student_details, get_student_profile, note_resume, update_student_profile
+from recruiter_queue import (RECRUITER_PAGE_SIZE, page_cursor, queue_companies, recruiter_count,
+                             recruiter_page, review_recruiters)
+from resume_store import RESUME_MAX_BYTES, ResumeRejected, get_resume_info, read_resume, save_resume, store_root
+from write_queue import WriteQueueFull
+
+def recruiter_queue_view(conn, db_type, pending):
+    """Filterable, keyset-paginated recruiter list with bulk approve/reject."""
+    key = 'pending' if pending else 'reviewed'
+
+    # --- Filters ---
+    companies = {c['name']: c['id'] for c in queue_companies(conn, pending)}
+    col1, col2 = st.columns(2)
+    company = col1.selectbox("Company", ["All companies", *companies], key=f"queue_{key}_company")
+    dates = col2.date_input("Signed up between", value=[], key=f"queue_{key}_signed_up")
+    company_id = companies.get(company)
+    signed_up = tuple(dates) if len(dates) == 2 else None
+
+    # Cursors of the pages visited so far; a filter change starts over at page 1
+    state = st.session_state.setdefault(f"queue_{key}_pages", {'filters': None, 'cursors': [None]})
+    if state['filters'] != (company_id, signed_up):
+        state.update(filters=(company_id, signed_up), cursors=[None])
+    cursors = state['cursors']
+
+    rows = recruiter_page(conn, pending, company_id, signed_up, after=cursors[-1], limit=RECRUITER_PAGE_SIZE + 1)
+    has_next = len(rows) > RECRUITER_PAGE_SIZE
+    rows = rows[:RECRUITER_PAGE_SIZE]
+    total = recruiter_count(conn, pending, company_id, signed_up)
+    if not rows:
+        st.info("No recruiters awaiting review." if pending else "No reviewed recruiter accounts.")
+        if len(cursors) > 1 and st.button("⬅️ Back to first page", key=f"queue_{key}_first"):
+            cursors[1:] = []
+            st.rerun()
+        return
+
+    import pandas as pd # Lazy import
+    st.caption(f"{total} recruiter(s) · page {len(cursors)} of {-(-total // RECRUITER_PAGE_SIZE)} · select rows to act on them")
+    columns = ['id', 'email', 'company_name', 'signed_up_at'] + ([] if pending else ['is_approved', 'reviewed_at'])
+    event = st.dataframe(pd.DataFrame(rows)[columns], hide_index=True, use_container_width=True,
+                         on_select="rerun", selection_mode="multi-row", key=f"queue_{key}_table")
+    selected = [rows[i]['id'] for i in event.selection.rows]
+
+    # --- Bulk actions (one UPDATE per batch of ids) ---
+    col1, col2, col3, col4 = st.columns(4)
+    approve = col1.button(f"✅ Approve ({len(selected)})", disabled=not selected, key=f"queue_{key}_approve")
+    reject = col2.button(f"🚫 {'Reject' if pending else 'Block'} ({len(selected)})", disabled=not selected,
+                         key=f"queue_{key}_reject")
+    if approve or reject:
+        changed = review_recruiters(conn, db_type, selected, approve=approve)
+        st.toast(f"{changed} recruiter account(s) {'approved' if approve else 'rejected'}.")
+        # Reviewed rows leave the pending queue; the keyset cursor stays valid, so
+        # the same page now simply shows the next recruiters
+        st.rerun()
+
+    # --- Pagination ---
+    if col3.button("⬅️ Previous", disabled=len(cursors) == 1, key=f"queue_{key}_prev"):
+        cursors.pop()
+        st.rerun()
+    if col4.button("Next ➡️", disabled=not has_next, key=f"queue_{key}_next"):
+        cursors.append(page_cursor(rows))
+        st.rerun()
 
 def profile_update_page():
     # --- Access Control ---
@@ -19,79 +79,77 @@ def profile_update_page():
         st.title("📝 Update Your Extended Profile")
         st.subheader("Internships, Hackathons, Certificates, and Links")
         
-        # Fetch current data for TEXT fields
-        profile_query = "SELECT internships, hackathons, certificates, resume_url, coding_profiles FROM students WHERE id = %s" if db_type == 'mysql' else "SELECT internships, hackathons, certificates, resume_url, coding_profiles FROM students WHERE id = ?"
-        current_data = execute_query(conn, profile_query, (st.session_state['user_id'],), fetch=True)
+        # Current data for TEXT fields (cached for the session)
+        profile = get_student_profile(conn, db_type, st.session_state['user_id'])
         
-        if not current_data:
+        if profile is None:
              st.warning("Please complete initial registration via the student dashboard first.")
              st.stop()
-        
-        current_data = current_data[0]
+
+        # The long free-text sections live in student_details and are only loaded here
+        details = get_student_details(conn, db_type, st.session_state['user_id'])
 
         with st.form("extra_curricular_form"):
-            internships = st.text_area("Internships (List Company, Role, Duration)", value=current_data.get('internships', ''), height=150)
-            hackathons = st.text_area("Hackathons/Projects (List relevant projects, awards)", value=current_data.get('hackathons', ''), height=150)
-            certificates = st.text_area("Certificates/Courses (List platform and course name)", value=current_data.get('certificates', ''), height=150)
-            resume_url = st.text_input("Resume Link (Google Drive/GitHub)", value=current_data.get('resume_url', ''))
-            coding_profiles = st.text_area("Coding Profiles Links (e.g., LeetCode, HackerRank)", value=current_data.get('coding_profiles', ''))
+            internships = st.text_area("Internships (List Company, Role, Duration)", value=details.internships or '', height=150)
+            hackathons = st.text_area("Hackathons/Projects (List relevant projects, awards)", value=details.hackathons or '', height=150)
+            certificates = st.text_area("Certificates/Courses (List platform and course name)", value=details.certificates or '', height=150)
+            resume_url = st.text_input("Resume Link (Google Drive/GitHub)", value=profile.resume_url or '')
+            coding_profiles = st.text_area("Coding Profiles Links (e.g., LeetCode, HackerRank)", value=details.coding_profiles or '')
             
             submit_button = st.form_submit_button("Save Extended Profile", type="primary")
 
             if submit_button:
-                update_query = """
-                UPDATE students 
-                SET internships = %s, hackathons = %s, certificates = %s, resume_url = %s, coding_profiles = %s
-                WHERE id = %s
-                """ if db_type == 'mysql' else """
-                UPDATE students 
-                SET internships = ?, hackathons = ?, certificates = ?, resume_url = ?, coding_profiles = ?
-                WHERE id = ?
-                """
-                update_params = (internships, hackathons, certificates, resume_url, coding_profiles, st.session_state['user_id'])
-                
-                if execute_query(conn, update_query, update_params, commit=True) is not None:
+                if update_student_profile(conn, db_type, st.session_state['user_id'], internships=internships, hackathons=hackathons,
+                                          certificates=certificates, resume_url=resume_url, coding_profiles=coding_profiles):
                     st.success("Extended profile details saved successfully!")
                 else:
                     st.error("Failed to save profile.")
 
+        # --- Resume Upload (stored on the portal, deduplicated by content) ---
+        st.markdown("---")
+        st.subheader("📎 Resume File")
+        if profile.resume_sha256:
+            info = get_resume_info(conn, db_type, profile.resume_sha256)
+            if info:
+                st.caption(f"Current resume: {info['size_bytes'] / 1024:.0f} KB, uploaded {info['created_at']}")
+                root = store_root(conn)
+                st.download_button("Download My Resume", data=lambda: read_resume(root, info['sha256']),
+                                   file_name="my_resume." + ('pdf' if info['mime_type'] == 'application/pdf' else 'docx'),
+                                   mime=info['mime_type'], on_click="ignore")
+
+        with st.form("resume_upload_form", clear_on_submit=True):
+            resume_file = st.file_uploader(f"Upload Resume (PDF/DOCX, max {RESUME_MAX_BYTES // (1024 * 1024)} MB)", type=['pdf', 'docx'])
+            upload_button = st.form_submit_button("Upload Resume")
+
+            if upload_button:
+                if resume_file is None:
+                    st.warning("Choose a file to upload first.")
+                else:
+                    try:
+                        sha256 = save_resume(conn, db_type, st.session_state['user_id'], resume_file)
+                        note_resume(st.session_state['user_id'], sha256)
+                        st.success("Resume uploaded! Recruiters can now download it with your applications.")
+                        st.rerun()
+                    except ResumeRejected as e:
+                        st.error(f"❌ {e}")
+                    except WriteQueueFull as e:
+                        st.warning(f"⏳ {e}")
+                    except Exception as e:
+                        st.error(f"Failed to upload resume. Details: {e}")
+
     elif role == 'admin':
         # Admin view: Manage (Approve/Block) Recruiters
         st.title("👥 Admin User Management")
         st.subheader("Approve Recruiter Accounts")
 
-        # Fetch all recruiters
-        recruiter_query = "SELECT u.id, u.email, r.company_name, r.is_approved FROM users u JOIN recruiters r ON u.id = r.id"
-        recruiters = execute_query(conn, recruiter_query, fetch=True)
-        
-        if recruiters:
-            st.dataframe(pd.DataFrame(recruiters), use_container_width=True)
-            
-            # Form for approval/blocking
-            with st.form("recruiter_action_form"):
-                rec_ids = [r['id'] for r in recruiters]
-                if not rec_ids:
-                    st.info("No recruiters to manage.")
-                    st.stop()
-                    
-                rec_id = st.selectbox("Recruiter User ID to Act On", rec_ids)
-                action = st.radio("Action", ["Approve", "Block"])
-                action_button = st.form_submit_button(f"{action} Recruiter", type="secondary")
-
-                if action_button:
-                    is_approved = 1 if action == "Approve" else 0
-                    action_query = "UPDATE recruiters SET is_approved = %s WHERE id = %s" if db_type == 'mysql' else "UPDATE recruiters SET is_approved = ? WHERE id = ?"
-                    action_params = (is_approved, rec_id)
-
-                    if execute_query(conn, action_query, action_params, commit=True) is not None:
-                        st.success(f"Recruiter ID {rec_id} has been **{action}d** successfully!")
-                        st.rerun()
-                    else:
-                        st.error("Action failed. Check ID.")
-        else:
-            st.info("No recruiter accounts found.")
+        tab_pending, tab_reviewed = st.tabs(["⏳ Awaiting Review", "🗂️ Reviewed"])
+        with tab_pending:
+            recruiter_queue_view(conn, db_type, pending=True)
+        with tab_reviewed:
+            recruiter_queue_view(conn, db_type, pending=False)
 
     else:
         st.error("Only Students and Admins can use this page for profile management.")
 
-profile_update_page()
\ No newline at end of file
+with profiled_page("profile_update"):
+    profile_update_page()
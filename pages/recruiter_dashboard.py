@@ -1,8 +1,12 @@
 # CareerSphere/pages/recruiter_dashboard.py (UPDATED with NumPy Fix)
 
 import streamlit as st
-import pandas as pd
 from database import execute_query
+from exports import applicant_export_widget
+from job_purge import deletion_progress_widget, request_job_deletion
+from page_profiler import profiled_page
+from profile_cache import get_recruiter_profile
+from text_match import text_match_scores
 import re 
 
 def recruiter_dashboard():
@@ -18,18 +22,13 @@ def recruiter_dashboard():
     st.title("🧑‍💼 Recruiter Dashboard")
     st.subheader(f"Welcome, {st.session_state['user_email']}!")
     
-    # Check for admin approval 
-    approval_query = "SELECT is_approved FROM recruiters WHERE id = %s" if db_type == 'mysql' else "SELECT is_approved FROM recruiters WHERE id = ?"
-    is_approved_data = execute_query(conn, approval_query, (recruiter_id,), fetch=True)
+    # Check for admin approval (re-read from the primary on every render; company details are cached)
+    profile = get_recruiter_profile(conn, db_type, recruiter_id)
     
-    # Safely get approval status, assuming default unapproved if data is missing
+    # Safely get approval status, assuming approved if the profile row is missing
     is_approved_status = 1 
-    if is_approved_data:
-        # Check if the result is a dictionary or a tuple/list and extract the value
-        if isinstance(is_approved_data[0], dict):
-            is_approved_status = is_approved_data[0].get('is_approved', 0)
-        elif isinstance(is_approved_data[0], (list, tuple)) and len(is_approved_data[0]) > 0:
-             is_approved_status = is_approved_data[0][0]
+    if profile is not None:
+        is_approved_status = 1 if profile.is_approved else 0
     
     if is_approved_status == 0:
         st.warning("⚠️ Your recruiter account is pending Admin approval. You cannot post jobs yet.")
@@ -37,17 +36,17 @@ def recruiter_dashboard():
     st.markdown("---")
 
     # --- Metrics Overview (Simplified) ---
-    job_count_query = "SELECT COUNT(*) as total_jobs FROM jobs WHERE recruiter_id = %s" if db_type == 'mysql' else "SELECT COUNT(*) as total_jobs FROM jobs WHERE recruiter_id = ?"
+    job_count_query = "SELECT COUNT(*) as total_jobs FROM jobs WHERE recruiter_id = %s AND deleted_at IS NULL" if db_type == 'mysql' else "SELECT COUNT(*) as total_jobs FROM jobs WHERE recruiter_id = ? AND deleted_at IS NULL"
     app_count_query = """
     SELECT COUNT(a.id) as total_apps 
     FROM applications a
     JOIN jobs j ON a.job_id = j.id
-    WHERE j.recruiter_id = %s
+    WHERE j.recruiter_id = %s AND j.deleted_at IS NULL
     """ if db_type == 'mysql' else """
     SELECT COUNT(a.id) as total_apps 
     FROM applications a
     JOIN jobs j ON a.job_id = j.id
-    WHERE j.recruiter_id = ?
+    WHERE j.recruiter_id = ? AND j.deleted_at IS NULL
     """
     
     total_jobs_data = execute_query(conn, job_count_query, (recruiter_id,), fetch=True)
@@ -84,7 +83,7 @@ def recruiter_dashboard():
     JOIN recruiters r ON j.recruiter_id = r.id
     JOIN companies c ON j.company_id = c.id
     LEFT JOIN applications a ON j.id = a.job_id
-    WHERE j.recruiter_id = %s
+    WHERE j.recruiter_id = %s AND j.deleted_at IS NULL
     GROUP BY j.id, j.title, c.name, j.location, j.eligibility, j.created_at
     ORDER BY j.created_at DESC
     """ if db_type == 'mysql' else """
@@ -93,16 +92,17 @@ def recruiter_dashboard():
     FROM jobs j
     JOIN recruiters r ON j.recruiter_id = r.id
     JOIN companies c ON j.company_id = c.id
-    WHERE j.recruiter_id = ?
+    WHERE j.recruiter_id = ? AND j.deleted_at IS NULL
     ORDER BY j.created_at DESC
     """
     
     job_posts = execute_query(conn, job_list_query, (recruiter_id,), fetch=True)
+    deletion_progress_widget(conn, recruiter_id)
     
     if job_posts:
         # Ensure the list of dictionaries can be converted to a DataFrame safely
+        import pandas as pd # Lazy import: skipped entirely for recruiters with no jobs
         job_df = pd.DataFrame(job_posts)
-        job_options = {job['title']: job['id'] for job in job_posts}
         st.dataframe(job_df, use_container_width=True)
 
         st.page_link("pages/applications.py", label="Review Applicants & Change Status", icon="🔍")
@@ -117,12 +117,9 @@ def recruiter_dashboard():
                 # CRITICAL FIX: Convert numpy type to standard Python int for the query
                 job_to_delete = int(job_to_delete_numpy)
                 
-                # ON DELETE CASCADE handles applications
-                delete_query = "DELETE FROM jobs WHERE id = %s AND recruiter_id = %s" if db_type == 'mysql' else "DELETE FROM jobs WHERE id = ? AND recruiter_id = ?"
-                delete_params = (job_to_delete, recruiter_id)
-                
-                if execute_query(conn, delete_query, delete_params, commit=True) is not None:
-                    st.success(f"Job ID {job_to_delete} deleted successfully!")
+                # Hidden right away; its applications are purged in the background (job_purge.py)
+                if request_job_deletion(conn, db_type, job_to_delete, recruiter_id) is not None:
+                    st.success(f"Job ID {job_to_delete} deleted. Its applications are being removed in the background.")
                     st.rerun()
                 else:
                     st.error("Failed to delete job. Check ID.")
@@ -135,29 +132,33 @@ def recruiter_dashboard():
     st.header("🔍 Applicant Shortlisting Tool (Matching Logic)")
     
     if job_posts:
-        shortlist_job_title = st.selectbox("Select a Job for Shortlisting Analysis", job_df['title'].tolist(), key='shortlist_job_select')
-        
-        # Select the ID from the DataFrame (this results in a NumPy type)
-        selected_job_id_numpy = job_df[job_df['title'] == shortlist_job_title]['id'].iloc[0]
-        
-        # CRITICAL FIX: Convert the numpy type to a standard Python integer
-        selected_job_id = int(selected_job_id_numpy)
+        # Pick by ID: two postings may share a title
+        job_titles = dict(zip(job_df['id'].tolist(), job_df['title'].tolist()))
+        selected_job_id = st.selectbox("Select a Job for Shortlisting Analysis", list(job_titles), key='shortlist_job_select',
+                                       format_func=lambda job_id: f"{job_titles[job_id]} (ID {job_id})")
+        shortlist_job_title = job_titles[selected_job_id]
 
 
-        # Fetch applicants with full profile data
+        # Fetch applicants; scoring only needs the byte lengths of the free-text sections
+        # (on SQLite, LENGTH() of TEXT would decode every character, hence the BLOB cast)
         shortlist_query = """
         SELECT 
-            s.full_name, s.cgpa, s.branch, s.skills, s.projects, s.internships, s.hackathons, 
+            s.id AS student_id, s.full_name, s.cgpa, s.branch, s.skills,
+            LENGTH(d.projects) AS projects_len, LENGTH(d.internships) AS internships_len, LENGTH(d.hackathons) AS hackathons_len,
             a.status, a.applied_at
         FROM applications a
         JOIN students s ON a.student_id = s.id
+        LEFT JOIN student_details d ON d.student_id = s.id
         WHERE a.job_id = %s
         """ if db_type == 'mysql' else """
         SELECT 
-            s.full_name, s.cgpa, s.branch, s.skills, s.projects, s.internships, s.hackathons, 
+            s.id AS student_id, s.full_name, s.cgpa, s.branch, s.skills,
+            LENGTH(CAST(d.projects AS BLOB)) AS projects_len, LENGTH(CAST(d.internships AS BLOB)) AS internships_len,
+            LENGTH(CAST(d.hackathons AS BLOB)) AS hackathons_len,
             a.status, a.applied_at
         FROM applications a
         JOIN students s ON a.student_id = s.id
+        LEFT JOIN student_details d ON d.student_id = s.id
         WHERE a.job_id = ?
         """
         
@@ -190,11 +191,11 @@ def recruiter_dashboard():
                 score += skill_matches * 5
                 
                 # 3. Project/Hackathon Experience (Presence check)
-                if row['projects'] and len(row['projects']) > 10:
+                if (row['projects_len'] or 0) > 10:
                     score += 5
-                if row['internships'] and len(row['internships']) > 10:
+                if (row['internships_len'] or 0) > 10:
                     score += 5
-                if row['hackathons'] and len(row['hackathons']) > 10: # Added hackathons check
+                if (row['hackathons_len'] or 0) > 10: # Added hackathons check
                     score += 5
 
                 return round(score, 1)
@@ -204,16 +205,24 @@ def recruiter_dashboard():
             job_eligibility = execute_query(conn, job_eligibility_query, (selected_job_id,), fetch=True)[0]['eligibility']
 
             applicants_df['Match Score'] = applicants_df.apply(lambda row: calculate_match_score(row, job_eligibility), axis=1)
+            # TF-IDF similarity of the full profile text to the job posting (campus-wide index, see text_match.py)
+            applicants_df['Text Match'] = text_match_scores(conn, db_type, selected_job_id, applicants_df['student_id'].tolist())
             
-            # Sort by Match Score
-            applicants_df = applicants_df.sort_values(by='Match Score', ascending=False)
+            # Sort by Match Score (Text Match breaks ties)
+            applicants_df = applicants_df.sort_values(by=['Match Score', 'Text Match'], ascending=False)
             
             st.success(f"Showing {len(applicants_df)} applicants, sorted by best match score.")
-            st.dataframe(applicants_df[['full_name', 'Match Score', 'cgpa', 'branch', 'skills', 'status', 'applied_at']], use_container_width=True)
-            st.caption("Match Score: Calculated based on CGPA, skills, and project experience relative to the job's Eligibility text.")
+            st.dataframe(applicants_df[['full_name', 'Match Score', 'Text Match', 'cgpa', 'branch', 'skills', 'status', 'applied_at']], use_container_width=True)
+            st.caption("Match Score: Calculated based on CGPA, skills, and project experience relative to the job's Eligibility text. "
+                       "Text Match (0-100): how closely the applicant's skills, projects, internships, hackathons and certificates "
+                       "read like the job's title, eligibility and description.")
+
+            # Streamed export of the same applicant pool
+            applicant_export_widget(conn, db_type, selected_job_id, shortlist_job_title, key_prefix="shortlist")
 
         else:
             st.info("No applicants for this job yet.")
 
 
-recruiter_dashboard()
\ No newline at end of file
+with profiled_page("recruiter_dashboard"):
+    recruiter_dashboard()
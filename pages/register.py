@@ -161,8 +161,10 @@
 # CareerSphere/pages/register.py (FINAL, ROBUST VERSION with ADMIN)
 
 import streamlit as st
-# Import both DB functions as they are needed for the safeguard logic
-from database import execute_query, get_db_connection 
+# get_db_connection is needed for the safeguard logic; registration itself runs through workflows
+from database import DEFAULT_TENANT, TENANTS, get_db_connection, switch_tenant
+from page_profiler import profiled_page
+from workflows import register_account
 # Import specific database error classes if possible for precise error handling
 
 # --- CRITICAL: SESSION STATE CHECK AND DB INITIALIZATION SAFEGUARD ---
@@ -171,7 +173,7 @@ from database import execute_query, get_db_connection
 if 'db_conn' not in st.session_state or st.session_state.get('db_conn') is None:
     try:
         st.info("Initializing database connection from register page...")
-        st.session_state['db_conn'], st.session_state['db_type'] = get_db_connection()
+        st.session_state['db_conn'], st.session_state['db_type'] = get_db_connection(st.session_state.get('tenant_id', DEFAULT_TENANT))
         
     except ImportError:
         st.error("Error: The 'database.py' file is missing. Cannot register users.")
@@ -182,103 +184,35 @@ if 'db_conn' not in st.session_state or st.session_state.get('db_conn') is None:
         st.session_state['db_type'] = 'error'
         st.stop() 
 
-# --- UTILITY FUNCTION FOR CLEANUP ---
-def cleanup_user(conn, db_type, email):
-    """Deletes the newly created user from the 'users' table if the subsequent
-    role-specific insert fails (to prevent orphaned records).
-    """
-    st.warning("Attempting to clean up partial user record...")
-    delete_query = "DELETE FROM users WHERE email = %s" if db_type == 'mysql' else "DELETE FROM users WHERE email = ?"
-    execute_query(conn, delete_query, (email,), commit=True)
-
-
 def register_user(email, password, role, profile_data=None):
     conn = st.session_state['db_conn'] 
     db_type = st.session_state['db_type']
     
-    # --- 1. Insert into users table (with robust error handling) ---
+    # --- One round trip: stored procedure on MySQL, single transaction on SQLite ---
+    # The users row and the role-specific row are created together, so a failure
+    # leaves nothing behind and no cleanup step is needed.
     try:
-        user_insert_query = "INSERT INTO users (email, password, role) VALUES (%s, %s, %s)" if db_type == 'mysql' else "INSERT INTO users (email, password, role) VALUES (?, ?, ?)"
-        user_params = (email, password, role)
-        execute_query(conn, user_insert_query, user_params, commit=True)
+        register_account(conn, db_type, email, password, role, profile_data)
 
+    except ValueError as e:
+        st.error(f"Internal error: {e}")
+        return False
     except Exception as e:
         error_message = str(e).lower()
         if 'duplicate entry' in error_message or 'unique constraint' in error_message:
-            st.error("Registration failed: The email address is already in use. Please use a different email.")
+            st.error("Registration failed: The email address (or roll number) is already in use. Please use a different one.")
         else:
             st.error(f"Registration failed due to a database error. Details: {e}")
             st.exception(e) 
         return False
-    
-    # --- 2. Get the ID of the newly inserted user ---
-    
-    new_user_id = None # Initialize as None
-    
-    if db_type == 'mysql':
-        user_id_query = "SELECT LAST_INSERT_ID() as id"
-        result = execute_query(conn, user_id_query, fetch=True)
-        
-        # 🟢 SAFE CHECK: Check if result is not None and not empty
-        if result and len(result) > 0: 
-            new_user_id = result[0]['id']
-        
-    elif db_type == 'sqlite':
-        user_id_query = "SELECT id FROM users WHERE email = ? ORDER BY id DESC LIMIT 1"
-        result = execute_query(conn, user_id_query, (email,), fetch=True)
-        
-        # 🟢 SAFE CHECK: Check if result is not None and not empty
-        if result and len(result) > 0:
-            new_user_id = result[0]['id']
-            
-    else:
-        st.error(f"Unsupported database type for getting user ID: {db_type}")
-        cleanup_user(conn, db_type, email)
-        return False
-
-    
-    # --- Check if ID retrieval was successful ---
-    if new_user_id is None:
-        st.error("Critical error: Could not retrieve new user ID after insertion. Rolling back registration.")
-        cleanup_user(conn, db_type, email)
-        return False
-    
-    # --- 3. Insert into role-specific table (Admin logic added) ---
-    try:
-        if role == 'student':
-            student_insert_query = "INSERT INTO students (id, roll_no, full_name, branch) VALUES (%s, %s, %s, %s)" if db_type == 'mysql' else "INSERT INTO students (id, roll_no, full_name, branch) VALUES (?, ?, ?, ?)"
-            student_params = (new_user_id, profile_data['roll_no'], profile_data['full_name'], profile_data['branch'])
-            execute_query(conn, student_insert_query, student_params, commit=True)
-            st.success("Student registration complete! Please log in.")
-            return True
-        
-        elif role == 'recruiter':
-            recruiter_insert_query = "INSERT INTO recruiters (id, company_name) VALUES (%s, %s)" if db_type == 'mysql' else "INSERT INTO recruiters (id, company_name) VALUES (?, ?)"
-            recruiter_params = (new_user_id, profile_data['company_name'])
-            execute_query(conn, recruiter_insert_query, recruiter_params, commit=True)
-            st.success("Recruiter account created. **Pending Admin Approval.** You may log in now.")
-            return True
-            
-        elif role == 'admin':
-            # Assuming 'admins' table structure is (id, department)
-            admin_insert_query = "INSERT INTO admins (id, department) VALUES (%s, %s)" if db_type == 'mysql' else "INSERT INTO admins (id, department) VALUES (?, ?)"
-            admin_params = (new_user_id, profile_data['department'])
-            execute_query(conn, admin_insert_query, admin_params, commit=True)
-            st.success(f"Admin registration complete for department: {profile_data['department']}! Please log in.")
-            return True
-        
-        else:
-            st.error(f"Internal error: Unsupported role '{role}'.")
-            return False
 
-    except Exception as e:
-        # 4. Rollback/Cleanup if role-specific insert failed
-        st.error(f"Failed to complete profile for role {role} due to a database error. Cleaning up...")
-        st.exception(e)
-        cleanup_user(conn, db_type, email)
-        return False
-        
-    return False
+    if role == 'student':
+        st.success("Student registration complete! Please log in.")
+    elif role == 'recruiter':
+        st.success("Recruiter account created. **Pending Admin Approval.** You may log in now.")
+    else:
+        st.success(f"Admin registration complete for department: {profile_data['department']}! Please log in.")
+    return True
 
 # --- Streamlit Page Logic ---
 def register_page():
@@ -288,6 +222,12 @@ def register_page():
         st.info("You must log out to register a new account.")
         return
 
+    # Campus picker (only shown when more than one campus is configured)
+    tenant_id = st.session_state.get('tenant_id', DEFAULT_TENANT)
+    if len(TENANTS) > 1:
+        tenant_ids = list(TENANTS.keys())
+        tenant_id = st.selectbox("Campus", tenant_ids, index=tenant_ids.index(tenant_id), format_func=lambda t: TENANTS[t]['name'])
+
     # Updated role selection to include 'admin'
     selected_role = st.selectbox("I am registering as a...", ["student", "recruiter", "admin"], index=0)
 
@@ -328,13 +268,15 @@ def register_page():
         # Role-specific validation checks
         elif selected_role == 'student' and (not profile_data.get('full_name') or not profile_data.get('roll_no') or not profile_data.get('branch')):
             st.error("Student: Please fill in your name, roll number, and branch.")
-        elif selected_role == 'recruiter' and not profile_data.get('company_name'):
+        elif selected_role == 'recruiter' and not profile_data.get('company_name', '').strip():
             st.error("Recruiter: Please fill in your company name.")
         elif selected_role == 'admin' and not profile_data.get('department'):
             st.error("Admin: Please fill in your department.")
             
         else:
-            # All checks pass - attempt registration
+            # All checks pass - attempt registration in the chosen campus database
+            switch_tenant(tenant_id)
             register_user(email, password, selected_role, profile_data)
 
-register_page()
\ No newline at end of file
+with profiled_page("register"):
+    register_page()
@@ -0,0 +1,215 @@
+# CareerSphere/profile_cache.py
+# Per-session cache of the logged-in user's own profile row.
+# Pages read the typed profile from here instead of issuing their own SELECTs;
+# the update helpers write through to the database and refresh the cached copy.
+# A student's long free-text sections (student_details) are cached separately and
+# only loaded by the pages that show them.
+
+from dataclasses import dataclass, fields, replace
+
+import streamlit as st
+from database import STUDENT_DETAIL_COLUMNS, execute_query, run_in_transaction
+
+CACHE_KEY = 'profile_cache'
+
+# Columns a student may change on their own profile: core (students) + extended (student_details)
+STUDENT_CORE_FIELDS = ('full_name', 'branch', 'cgpa', 'skills', 'resume_url')
+STUDENT_EDITABLE_FIELDS = STUDENT_CORE_FIELDS + STUDENT_DETAIL_COLUMNS
+
+
+@dataclass(frozen=True)
+class StudentProfile:
+    id: int
+    roll_no: str = None
+    full_name: str = None
+    branch: str = None
+    cgpa: float = None
+    skills: str = None
+    resume_url: str = None
+    resume_sha256: str = None  # Set by resume_store.save_resume(), not edited directly
+
+    @property
+    def is_ready_to_apply(self):
+        """CGPA and skills are required before a student can apply."""
+        return bool(self.cgpa) and bool(self.skills)
+
+
+@dataclass(frozen=True)
+class StudentDetails:
+    student_id: int
+    internships: str = None
+    hackathons: str = None
+    projects: str = None
+    certificates: str = None
+    coding_profiles: str = None
+
+
+@dataclass(frozen=True)
+class RecruiterProfile:
+    id: int
+    company_name: str = None
+    company_id: int = None
+    is_approved: bool = False
+
+
+def _cache():
+    if CACHE_KEY not in st.session_state:
+        st.session_state[CACHE_KEY] = {}
+    return st.session_state[CACHE_KEY]
+
+
+def clear_profile_cache():
+    """Drops every cached profile (called on login/logout)."""
+    st.session_state[CACHE_KEY] = {}
+
+
+def invalidate_profile(role, user_id):
+    """Forces the next read of this profile to go back to the database."""
+    _cache().pop((role, user_id), None)
+
+
+def note_resume(student_id, sha256):
+    """Writes a committed resume upload (resume_store.save_resume) through to the cached profile."""
+    cached = _cache().get(('student', student_id))
+    if cached is not None:
+        _cache()[('student', student_id)] = replace(cached, resume_sha256=sha256)
+
+
+# --- STUDENT PROFILE ---
+def _load_student_profile(conn, db_type, student_id):
+    columns = [f.name for f in fields(StudentProfile)]
+    ph = '%s' if db_type == 'mysql' else '?'
+    query = f"SELECT {', '.join(columns)} FROM students WHERE id = {ph}"
+    data = execute_query(conn, query, (student_id,), fetch=True)
+    if not data:
+        return None
+
+    row = dict(data[0])
+    # CRITICAL FIX: Convert Decimal type (from MySQL) to float once, here
+    if row.get('cgpa') is not None:
+        row['cgpa'] = float(row['cgpa'])
+    return StudentProfile(**row)
+
+
+def get_student_profile(conn, db_type, student_id):
+    """Returns the cached StudentProfile, loading it on first use in this session."""
+    cache = _cache()
+    key = ('student', student_id)
+    if key not in cache:
+        profile = _load_student_profile(conn, db_type, student_id)
+        if profile is None:
+            return None
+        cache[key] = profile
+    return cache[key]
+
+
+def _load_student_details(conn, db_type, student_id):
+    ph = '%s' if db_type == 'mysql' else '?'
+    query = f"SELECT {', '.join(STUDENT_DETAIL_COLUMNS)} FROM student_details WHERE student_id = {ph}"
+    data = execute_query(conn, query, (student_id,), fetch=True)
+    # No row yet just means none of the sections has been filled in
+    return StudentDetails(student_id, **data[0]) if data else StudentDetails(student_id)
+
+
+def get_student_details(conn, db_type, student_id):
+    """Returns the cached StudentDetails (the free-text sections), loading them on first use."""
+    cache = _cache()
+    key = ('student_details', student_id)
+    if key not in cache:
+        cache[key] = _load_student_details(conn, db_type, student_id)
+    return cache[key]
+
+
+def update_student_profile(conn, db_type, student_id, **changes):
+    """Writes the given student fields and, once committed, refreshes the cached copies.
+
+    Core fields go to `students`, free-text sections to `student_details` (created
+    on first save); both happen in one transaction. Returns True on success.
+    """
+    unknown = set(changes) - set(STUDENT_EDITABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Not an editable student field: {', '.join(sorted(unknown))}")
+
+    core = {col: value for col, value in changes.items() if col in STUDENT_CORE_FIELDS}
+    details = {col: value for col, value in changes.items() if col in STUDENT_DETAIL_COLUMNS}
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def save(cursor):
+        if core:
+            set_clause = ", ".join(f"{col} = {ph}" for col in core)
+            cursor.execute(f"UPDATE students SET {set_clause} WHERE id = {ph}", (*core.values(), student_id))
+        if details:
+            cols = ", ".join(details)
+            values = ", ".join([ph] * (len(details) + 1))
+            if db_type == 'mysql':
+                upsert = ", ".join(f"{col} = VALUES({col})" for col in details)
+                query = f"INSERT INTO student_details (student_id, {cols}) VALUES ({values}) ON DUPLICATE KEY UPDATE {upsert}"
+            else:
+                upsert = ", ".join(f"{col} = excluded.{col}" for col in details)
+                query = f"INSERT INTO student_details (student_id, {cols}) VALUES ({values}) ON CONFLICT(student_id) DO UPDATE SET {upsert}"
+            cursor.execute(query, (student_id, *details.values()))
+        return True
+
+    result = run_in_transaction(conn, save)
+
+    if core.get('cgpa') is not None:
+        core['cgpa'] = float(core['cgpa'])
+    for key, part in ((('student', student_id), core), (('student_details', student_id), details)):
+        if not part:
+            continue
+        cached = _cache().get(key)
+        if cached is not None:
+            _cache()[key] = replace(cached, **part)
+    return result
+
+
+# --- RECRUITER PROFILE ---
+def _load_recruiter_profile(conn, db_type, recruiter_id):
+    query = """
+    SELECT r.id, c.name AS company_name, r.company_id, r.is_approved
+    FROM recruiters r
+    LEFT JOIN companies c ON c.id = r.company_id
+    WHERE r.id = %s
+    """ if db_type == 'mysql' else """
+    SELECT r.id, c.name AS company_name, r.company_id, r.is_approved
+    FROM recruiters r
+    LEFT JOIN companies c ON c.id = r.company_id
+    WHERE r.id = ?
+    """
+    data = execute_query(conn, query, (recruiter_id,), fetch=True)
+    if not data:
+        return None
+
+    row = data[0]
+    return RecruiterProfile(
+        id=row['id'],
+        company_name=row['company_name'],
+        company_id=row['company_id'],
+        is_approved=bool(row['is_approved']),
+    )
+
+
+def get_recruiter_profile(conn, db_type, recruiter_id):
+    """Returns the cached RecruiterProfile with its approval re-read on every call.
+
+    Approval is granted and revoked by an admin from another session, so only the
+    company details are cached; is_approved is one primary-key lookup per render.
+    """
+    cache = _cache()
+    key = ('recruiter', recruiter_id)
+    cached = cache.get(key)
+    if cached is None:
+        profile = _load_recruiter_profile(conn, db_type, recruiter_id)
+        if profile is not None:
+            cache[key] = profile
+        return profile
+
+    # On the primary: a lagging replica would keep a revoked recruiter in for REPLICA_MAX_LAG
+    data = execute_query(conn, "SELECT is_approved FROM recruiters WHERE id = %s", (recruiter_id,), fetch=True, primary=True)
+    if not data:
+        cache.pop(key, None)
+        return None
+    is_approved = bool(data[0]['is_approved'])
+    if is_approved != cached.is_approved:
+        cache[key] = replace(cached, is_approved=is_approved)
+    return cache[key]
@@ -0,0 +1,96 @@
+# CareerSphere/recruiter_queue.py
+# Admin approval queue for recruiter sign-ups.
+#
+# Pending recruiters are those with reviewed_at IS NULL. Pages are read with keyset
+# pagination on (created_at, id) through idx_recruiters_queue, so page 20 costs the
+# same as page 1, and approve/reject runs as one UPDATE ... WHERE id IN (...) per
+# batch of selected accounts instead of one statement (and rerun) per recruiter.
+
+from datetime import timedelta
+
+from database import execute_query, run_in_transaction
+
+# Recruiters shown per page of the queue
+RECRUITER_PAGE_SIZE = 25
+# Ids per UPDATE when approving/rejecting in bulk
+REVIEW_BATCH_SIZE = 500
+
+
+def _filters(pending, company_id=None, signed_up=None):
+    """WHERE clause and params shared by the page and count queries.
+
+    `signed_up` is an optional (from_date, to_date) pair, both inclusive.
+    """
+    clauses = ["r.reviewed_at IS NULL" if pending else "r.reviewed_at IS NOT NULL"]
+    params = []
+    if company_id is not None:
+        clauses.append("r.company_id = %s")
+        params.append(company_id)
+    if signed_up:
+        start, end = signed_up
+        clauses.append("r.created_at >= %s AND r.created_at < %s")
+        params.extend([start.isoformat(), (end + timedelta(days=1)).isoformat()])
+    return " AND ".join(clauses), params
+
+
+def recruiter_page(conn, pending=True, company_id=None, signed_up=None, after=None, limit=RECRUITER_PAGE_SIZE):
+    """One page of recruiters, oldest sign-up first.
+
+    `after` is the (created_at, id) of the previous page's last row (see page_cursor).
+    """
+    where, params = _filters(pending, company_id, signed_up)
+    if after is not None:
+        where += " AND (r.created_at > %s OR (r.created_at = %s AND r.id > %s))"
+        params.extend([after[0], after[0], after[1]])
+    query = f"""
+    SELECT r.id, u.email, c.name AS company_name, r.created_at AS signed_up_at, r.is_approved, r.reviewed_at
+    FROM recruiters r
+    JOIN users u ON u.id = r.id
+    LEFT JOIN companies c ON c.id = r.company_id
+    WHERE {where}
+    ORDER BY r.created_at, r.id
+    LIMIT {int(limit)}
+    """
+    return execute_query(conn, query, tuple(params), fetch=True) or []
+
+
+def page_cursor(rows):
+    """The keyset cursor that continues after `rows`."""
+    return (rows[-1]['signed_up_at'], rows[-1]['id']) if rows else None
+
+
+def recruiter_count(conn, pending=True, company_id=None, signed_up=None):
+    where, params = _filters(pending, company_id, signed_up)
+    data = execute_query(conn, f"SELECT COUNT(*) AS n FROM recruiters r WHERE {where}", tuple(params), fetch=True)
+    return data[0]['n'] if data else 0
+
+
+def queue_companies(conn, pending=True):
+    """[{'id', 'name'}] of companies with recruiters in the queue, for the company filter."""
+    query = f"""
+    SELECT DISTINCT c.id, c.name
+    FROM recruiters r JOIN companies c ON c.id = r.company_id
+    WHERE {_filters(pending)[0]}
+    ORDER BY c.name
+    """
+    return execute_query(conn, query, fetch=True) or []
+
+
+def review_recruiters(conn, db_type, recruiter_ids, approve):
+    """Approves (or rejects) recruiters in one transaction; returns how many rows changed."""
+    ph = '%s' if db_type == 'mysql' else '?'
+    ids = list(recruiter_ids)
+
+    def review(cursor):
+        changed = 0
+        for start in range(0, len(ids), REVIEW_BATCH_SIZE):
+            batch = ids[start:start + REVIEW_BATCH_SIZE]
+            cursor.execute(
+                f"UPDATE recruiters SET is_approved = {ph}, reviewed_at = CURRENT_TIMESTAMP "
+                f"WHERE id IN ({', '.join([ph] * len(batch))})",
+                (1 if approve else 0, *batch),
+            )
+            changed += cursor.rowcount
+        return changed
+
+    return run_in_transaction(conn, review) if ids else 0
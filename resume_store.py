@@ -0,0 +1,237 @@
+# CareerSphere/resume_store.py
+# Local content-addressed resume storage.
+#
+# Uploaded resumes are stored once per distinct content under
+# resumes/<campus>/<sha256[:2]>/<sha256>; students.resume_sha256 points at the file
+# and resume_files records its size and type. Identical uploads share one file.
+# Reads go through mmap: a byte range (or a chunk of a file being streamed into a
+# ZIP) is copied out of the page cache without reading the rest of the file.
+
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+import zipfile
+
+import streamlit as st
+from database import DEFAULT_TENANT, execute_query, run_in_transaction
+
+RESUME_STORE_DIR = "resumes"
+# Largest single resume accepted (checked while the upload streams in)
+RESUME_MAX_BYTES = 5 * 1024 * 1024
+# Total size of all stored resumes per campus
+RESUME_STORE_QUOTA_BYTES = 2 * 1024 * 1024 * 1024
+# Bytes read/written per step while streaming
+RESUME_CHUNK_BYTES = 256 * 1024
+# A replaced resume's file is only removed if nobody re-uploaded it this recently
+RESUME_GC_GRACE_SECONDS = 60
+# ZIP archives kept in memory before they spill over to disk
+RESUME_ZIP_SPOOL_BYTES = 16 * 1024 * 1024
+
+# Leading bytes -> (MIME type, file extension)
+RESUME_TYPES = {
+    b'%PDF-': ('application/pdf', 'pdf'),
+    b'PK\x03\x04': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'docx'),
+}
+
+
+class ResumeRejected(Exception):
+    """Raised when an upload is empty, too large, of an unsupported type, or over quota."""
+
+
+def store_root(conn):
+    """The resume directory of the connection's campus."""
+    return os.path.join(RESUME_STORE_DIR, getattr(conn, 'tenant_id', DEFAULT_TENANT))
+
+
+def resume_path(root, sha256):
+    return os.path.join(root, sha256[:2], sha256)
+
+
+def _sniff(head):
+    for magic, kind in RESUME_TYPES.items():
+        if head.startswith(magic):
+            return kind
+    raise ResumeRejected("Only PDF and DOCX resumes are accepted.")
+
+
+def _write_blob(root, upload):
+    """Streams `upload` into the store; returns (sha256, size, mime_type, created).
+
+    The bytes go to a temp file while being hashed, then are renamed onto their
+    content address (an existing identical file is simply replaced by itself).
+    `created` is False when that file was already there.
+    """
+    os.makedirs(root, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    mime_type = None
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = upload.read(RESUME_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if mime_type is None:
+                    mime_type = _sniff(chunk)[0]
+                size += len(chunk)
+                if size > RESUME_MAX_BYTES:
+                    raise ResumeRejected(f"Resume is larger than {RESUME_MAX_BYTES // (1024 * 1024)} MB.")
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        if size == 0:
+            raise ResumeRejected("The uploaded file is empty.")
+
+        sha256 = digest.hexdigest()
+        final_path = resume_path(root, sha256)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        created = not os.path.exists(final_path)
+        os.replace(tmp_path, final_path)
+        return sha256, size, mime_type, created
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_resume(conn, db_type, student_id, upload):
+    """Stores an uploaded resume and points the student at it; returns its sha256.
+
+    Raises ResumeRejected for invalid or over-quota uploads.
+    """
+    root = store_root(conn)
+    sha256, size, mime_type, created = _write_blob(root, upload)
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def attach(cursor):
+        # fetchall() throughout: MySQL's unbuffered cursors refuse a new execute with rows left unread
+        cursor.execute(f"SELECT resume_sha256 FROM students WHERE id = {ph}", (student_id,))
+        rows = cursor.fetchall()
+        previous = rows[0][0] if rows else None
+
+        cursor.execute(f"SELECT 1 FROM resume_files WHERE sha256 = {ph}", (sha256,))
+        if not cursor.fetchall():
+            cursor.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM resume_files")
+            if int(cursor.fetchall()[0][0]) + size > RESUME_STORE_QUOTA_BYTES:
+                raise ResumeRejected("Resume storage is full. Please contact the placement cell.")
+            cursor.execute(f"INSERT INTO resume_files (sha256, size_bytes, mime_type) VALUES ({ph}, {ph}, {ph})",
+                           (sha256, size, mime_type))
+        cursor.execute(f"UPDATE students SET resume_sha256 = {ph} WHERE id = {ph}", (sha256, student_id))
+        return previous
+
+    try:
+        previous = run_in_transaction(conn, attach)
+    except BaseException:
+        # Rejected, queue full, database error...: new content that was never registered.
+        # A file that was already there belongs to another upload and stays.
+        if created:
+            os.remove(resume_path(root, sha256))
+        raise
+    if previous and previous != sha256:
+        _release(conn, db_type, root, previous)
+    return sha256
+
+
+def _release(conn, db_type, root, sha256):
+    """Drops a resume nobody references any more (row first, then the file)."""
+    query = """
+    DELETE FROM resume_files
+    WHERE sha256 = %s AND NOT EXISTS (SELECT 1 FROM students WHERE resume_sha256 = %s)
+    """
+
+    def delete(cursor):
+        cursor.execute(query if db_type == 'mysql' else query.replace('%s', '?'), (sha256, sha256))
+        return cursor.rowcount
+
+    deleted = run_in_transaction(conn, delete)
+    path = resume_path(root, sha256)
+    # A concurrent identical upload re-creates (and touches) the file; leave it alone then
+    if deleted and os.path.exists(path) and time.time() - os.path.getmtime(path) > RESUME_GC_GRACE_SECONDS:
+        os.remove(path)
+
+
+def get_resume_info(conn, db_type, sha256):
+    """Returns the resume_files row (sha256, size_bytes, mime_type, created_at) or None."""
+    query = "SELECT sha256, size_bytes, mime_type, created_at FROM resume_files WHERE sha256 = %s" if db_type == 'mysql' else \
+            "SELECT sha256, size_bytes, mime_type, created_at FROM resume_files WHERE sha256 = ?"
+    data = execute_query(conn, query, (sha256,), fetch=True)
+    return data[0] if data else None
+
+
+# --- READS (memory-mapped) ---
+def read_resume(root, sha256, start=0, end=None):
+    """Returns bytes [start, end) of a stored resume (end=None means to the end of the file)."""
+    with open(resume_path(root, sha256), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return m[start:end]
+
+
+def iter_resume(root, sha256, chunk_size=RESUME_CHUNK_BYTES):
+    """Yields a stored resume in chunks straight from the mapped file."""
+    with open(resume_path(root, sha256), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        for offset in range(0, len(m), chunk_size):
+            yield m[offset:offset + chunk_size]
+
+
+# --- BULK DOWNLOAD ---
+def _safe_name(text):
+    return "".join(c if c.isalnum() else "_" for c in str(text or '')).strip("_") or "student"
+
+
+def job_resumes(conn, db_type, job_id):
+    """Applicants of a job who uploaded a resume, with what the archive needs."""
+    query = """
+    SELECT s.roll_no, s.full_name, r.sha256, r.mime_type, r.size_bytes
+    FROM applications a
+    JOIN students s ON a.student_id = s.id
+    JOIN resume_files r ON r.sha256 = s.resume_sha256
+    WHERE a.job_id = %s
+    ORDER BY s.roll_no
+    """
+    return execute_query(conn, query, (job_id,), fetch=True) or []
+
+
+def build_resume_zip(conn, db_type, job_id):
+    """Streams every applicant's resume for a job into a spooled ZIP and returns it rewound."""
+    root = store_root(conn)
+    extensions = {mime: ext for mime, ext in RESUME_TYPES.values()}
+    out = tempfile.SpooledTemporaryFile(max_size=RESUME_ZIP_SPOOL_BYTES, mode='w+b')
+    # PDFs/DOCX are already compressed: store them as-is
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for row in job_resumes(conn, db_type, job_id):
+            name = f"{_safe_name(row['roll_no'])}_{_safe_name(row['full_name'])}.{extensions.get(row['mime_type'], 'bin')}"
+            with archive.open(name, 'w') as entry:
+                for chunk in iter_resume(root, row['sha256']):
+                    entry.write(chunk)
+    out.seek(0)
+    return out
+
+
+def resume_download_widget(conn, db_type, job_id, job_title, key_prefix):
+    """Per-applicant resume downloads plus one ZIP of all of them; files are read only on click."""
+    resumes = job_resumes(conn, db_type, job_id)
+    with st.expander(f"📎 Uploaded Resumes ({len(resumes)})"):
+        if not resumes:
+            st.info("No applicant for this job has uploaded a resume yet.")
+            return
+
+        root = store_root(conn)
+        labels = {f"{r['roll_no']} - {r['full_name']} ({r['size_bytes'] / 1024:.0f} KB)": r for r in resumes}
+        col1, col2 = st.columns(2)
+        chosen = labels[col1.selectbox("Applicant", list(labels), key=f"{key_prefix}_resume_pick")]
+        ext = 'pdf' if chosen['mime_type'] == 'application/pdf' else 'docx'
+        col1.download_button(
+            "Download Resume", data=lambda: read_resume(root, chosen['sha256']),
+            file_name=f"{_safe_name(chosen['roll_no'])}_resume.{ext}", mime=chosen['mime_type'],
+            on_click="ignore", key=f"{key_prefix}_resume_one",
+        )
+
+        safe_title = _safe_name(job_title)
+        col2.download_button(
+            f"Download All ({len(resumes)}) as ZIP", data=lambda: build_resume_zip(conn, db_type, job_id),
+            file_name=f"resumes_{safe_title}_{job_id}.zip", mime="application/zip",
+            on_click="ignore", key=f"{key_prefix}_resume_zip",
+        )
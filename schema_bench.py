@@ -0,0 +1,119 @@
+# CareerSphere/schema_bench.py
+# Applicant-join throughput before and after moving the free-text profile sections
+# out of `students` into `student_details` (hot/cold column split).
+#
+#   python schema_bench.py [students] [jobs] [applications_per_student] [text_bytes]
+#
+# Builds a throwaway SQLite file with the old wide layout, copies it, migrates the
+# copy with create_sqlite_tables() (the same code path a deployed cs.db takes), then
+# times the recruiter pages' applicant queries against both.
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from database import create_sqlite_tables
+
+WIDE_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL, password TEXT NOT NULL, role TEXT NOT NULL);
+CREATE TABLE students (
+    id INTEGER PRIMARY KEY, roll_no TEXT UNIQUE, full_name TEXT, branch TEXT, cgpa REAL, skills TEXT,
+    internships TEXT, hackathons TEXT, projects TEXT, certificates TEXT, resume_url TEXT, coding_profiles TEXT
+);
+CREATE TABLE applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER, student_id INTEGER,
+    status TEXT DEFAULT 'applied', applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+-- Stands in for uq_application on MySQL so the timings measure the join, not a scan of applications
+CREATE INDEX idx_applications_job ON applications (job_id);
+"""
+
+# Same shape as pages/applications.py (review list) and pages/recruiter_dashboard.py (shortlisting)
+APPLICANT_QUERY = """
+SELECT a.id AS app_id, s.full_name, s.roll_no, s.branch, s.cgpa, a.status, s.resume_url
+FROM applications a JOIN students s ON a.student_id = s.id
+WHERE a.job_id = ? ORDER BY a.applied_at DESC
+"""
+SHORTLIST_QUERY = {
+    'wide': """
+    SELECT s.full_name, s.cgpa, s.branch, s.skills, s.projects, s.internships, s.hackathons, a.status, a.applied_at
+    FROM applications a JOIN students s ON a.student_id = s.id
+    WHERE a.job_id = ?
+    """,
+    'split': """
+    SELECT s.full_name, s.cgpa, s.branch, s.skills,
+        LENGTH(CAST(d.projects AS BLOB)) AS projects_len, LENGTH(CAST(d.internships AS BLOB)) AS internships_len,
+        LENGTH(CAST(d.hackathons AS BLOB)) AS hackathons_len,
+        a.status, a.applied_at
+    FROM applications a JOIN students s ON a.student_id = s.id
+    LEFT JOIN student_details d ON d.student_id = s.id
+    WHERE a.job_id = ?
+    """,
+}
+
+
+def _seed(path, students, jobs, apps_per_student, text_bytes):
+    rng = random.Random(344)
+    conn = sqlite3.connect(path)
+    conn.executescript(WIDE_SCHEMA)
+
+    def text():
+        return ''.join(rng.choice('abcdefghij klmnop,.') for _ in range(rng.randint(text_bytes // 2, text_bytes)))
+
+    for sid in range(1, students + 1):
+        conn.execute("INSERT INTO users (id, email, password, role) VALUES (?, ?, 'x', 'student')", (sid, f"s{sid}@cs.edu"))
+        conn.execute(
+            "INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (sid, f"R{sid:06d}", f"Student {sid}", rng.choice(['CSE', 'ISE', 'ECE']), round(rng.uniform(5, 10), 2),
+             'python, sql', text(), text(), text(), text(), f"https://drive/{sid}", text()),
+        )
+        for job_id in rng.sample(range(1, jobs + 1), min(apps_per_student, jobs)):
+            conn.execute("INSERT INTO applications (job_id, student_id) VALUES (?, ?)", (job_id, sid))
+    conn.commit()
+    conn.close()
+
+
+def _time_queries(path, layout, jobs, rounds=3):
+    conn = sqlite3.connect(path)
+    results = {}
+    for label, query in (('applicant list', APPLICANT_QUERY), ('shortlisting', SHORTLIST_QUERY[layout])):
+        rows = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for job_id in range(1, jobs + 1):
+                rows += len(conn.execute(query, (job_id,)).fetchall())
+        elapsed = time.perf_counter() - start
+        results[label] = (rows / elapsed, elapsed / (rounds * jobs) * 1000)
+    pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.close()
+    return results, pages
+
+
+if __name__ == '__main__':
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    apps = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    text_bytes = int(sys.argv[4]) if len(sys.argv) > 4 else 2000
+
+    workdir = tempfile.mkdtemp(prefix='cs_schema_bench_')
+    wide_path = os.path.join(workdir, 'wide.db')
+    split_path = os.path.join(workdir, 'split.db')
+
+    print(f"{students} students x {apps} applications over {jobs} jobs, ~{text_bytes} bytes per free-text field")
+    _seed(wide_path, students, jobs, apps, text_bytes)
+    shutil.copy(wide_path, split_path)
+    conn = sqlite3.connect(split_path)
+    create_sqlite_tables(conn) # Runs the student_details migration
+    conn.close()
+
+    for layout, path in (('wide', wide_path), ('split', split_path)):
+        results, pages = _time_queries(path, layout, jobs)
+        print(f"  {layout:<6} live pages={pages}")
+        for label, (rows_per_s, ms_per_query) in results.items():
+            print(f"    {label:<15} rows/s={rows_per_s:>10.0f}  ms/query={ms_per_query:.2f}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,162 @@
+# CareerSphere/search_index.py
+# Typeahead search over job titles, company names and student names.
+#
+# Each campus keeps one PrefixIndex per entity in memory (database.tenant_cache):
+# every word of every entry, sorted, so the entries with a word starting with the
+# typed prefix are one bisect range away. All typed words must match (in any
+# order); hits are ranked by whether the name itself starts with the query, then
+# newest first, and only the top SEARCH_RESULTS reach the picker. Pickers hold ids,
+# so two jobs with the same title stay two separate choices.
+#
+# Writes committed by this process to an index's source tables mark it stale
+# (database.add_write_listener) and the next search rebuilds it, at most every
+# SEARCH_INDEX_MIN_AGE seconds unless the searching session made the write itself
+# (a recruiter sees the job they just posted). Writes made by other processes are
+# picked up once an index is SEARCH_INDEX_MAX_AGE old.
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import streamlit as st
+from database import DEFAULT_TENANT, add_write_listener, execute_query, tenant_cache
+
+# Matches shown in a picker
+SEARCH_RESULTS = 20
+# Seconds an index is trusted without a rebuild (covers writes from other processes)
+SEARCH_INDEX_MAX_AGE = 60
+# Minimum seconds between rebuilds while other sessions' writes keep coming in
+SEARCH_INDEX_MIN_AGE = 5
+
+# entity -> rows as (id, name, detail, scope); detail words are searchable too,
+# scope restricts a search (e.g. a recruiter's own jobs). 'tables' are the tables
+# whose writes make the index stale, cascading deletes included
+ENTITIES = {
+    'job': {
+        'noun': 'jobs',
+        'query': """
+        SELECT j.id, j.title AS name, c.name AS detail, j.recruiter_id AS scope
+        FROM jobs j LEFT JOIN companies c ON c.id = j.company_id
+        WHERE j.deleted_at IS NULL
+        """,
+        'tables': frozenset({'jobs', 'companies', 'recruiters', 'users'}),
+    },
+    'company': {
+        'noun': 'companies',
+        'query': "SELECT id, name, NULL AS detail, NULL AS scope FROM companies",
+        'tables': frozenset({'companies'}),
+    },
+    'student': {
+        'noun': 'students',
+        'query': "SELECT id, full_name AS name, roll_no AS detail, NULL AS scope FROM students",
+        'tables': frozenset({'students', 'users'}),
+    },
+}
+
+# (tenant_id, entity) -> writes to the entity's tables committed by this process so far
+_writes = defaultdict(int)
+
+
+def _count_write(tenant_id, tables):
+    for entity, spec in ENTITIES.items():
+        if tables is None or tables & spec['tables']:
+            _writes[tenant_id, entity] += 1
+
+
+add_write_listener(_count_write)
+
+
+def _words(text):
+    return (text or '').lower().split()
+
+
+class PrefixIndex:
+    """Sorted (word, id) pairs of one entity on one campus."""
+
+    def __init__(self, rows, writes_seen, built_at):
+        self.entries = {}                   # id -> (name, detail)
+        self.by_scope = defaultdict(list)   # scope -> ids, newest first
+        words, ids = [], []
+        for row in rows:
+            self.entries[row['id']] = (row['name'] or '', row['detail'] or '')
+            if row['scope'] is not None:
+                self.by_scope[row['scope']].append(row['id'])
+            entry_words = set(_words(row['name']) + _words(row['detail']))
+            words.extend(entry_words)
+            ids.extend([row['id']] * len(entry_words))
+        order = sorted(range(len(words)), key=words.__getitem__)
+        self.words = [words[i] for i in order]
+        self.ids = [ids[i] for i in order]
+        self.newest = sorted(self.entries, reverse=True)
+        for ids in self.by_scope.values():
+            ids.sort(reverse=True)
+        self.built_at = built_at
+        self.writes_seen = writes_seen
+
+    def _prefix_ids(self, prefix):
+        start = bisect_left(self.words, prefix)
+        end = bisect_left(self.words, prefix + '\uffff', lo=start)
+        return set(self.ids[start:end])
+
+    def search(self, text, scope=None, limit=SEARCH_RESULTS):
+        """[(id, name, detail)] of the best `limit` matches for `text` (newest entries if it is empty)."""
+        terms = _words(text)
+        if not terms:
+            ids = self.by_scope.get(scope, []) if scope is not None else self.newest
+            return [(i, *self.entries[i]) for i in ids[:limit]]
+
+        # Narrowest prefix first, so the intersections stay small
+        matches = None
+        for term in sorted(terms, key=len, reverse=True):
+            found = self._prefix_ids(term)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        if scope is not None:
+            matches &= set(self.by_scope.get(scope, ()))
+
+        query = " ".join(terms)
+        best = heapq.nsmallest(limit, matches, key=lambda i: (not self.entries[i][0].lower().startswith(query), -i))
+        return [(i, *self.entries[i]) for i in best]
+
+
+def get_index(conn, entity):
+    """The campus's PrefixIndex for `entity`, rebuilt first if it is stale."""
+    tenant_id = getattr(conn, 'tenant_id', DEFAULT_TENANT)
+    cache = tenant_cache(tenant_id, 'search_index')
+    lock = cache.setdefault('lock', threading.Lock())
+    with lock:
+        index = cache.get(entity)
+        writes = _writes[tenant_id, entity]
+        if index is not None:
+            age = time.monotonic() - index.built_at
+            own_write = getattr(conn, 'last_write_at', None)
+            throttled = age < SEARCH_INDEX_MIN_AGE and (own_write is None or own_write < index.built_at)
+            if age < SEARCH_INDEX_MAX_AGE and (index.writes_seen == writes or throttled):
+                return index
+        # Timed before the query, so a write committed while it runs still counts as newer
+        started = time.monotonic()
+        rows = execute_query(conn, ENTITIES[entity]['query'], fetch=True) or []
+        cache[entity] = index = PrefixIndex(rows, writes, started)
+        return index
+
+
+def search(conn, entity, text, scope=None, limit=SEARCH_RESULTS):
+    """Top matches for `text` among a campus's jobs, companies or students: [(id, name, detail)]."""
+    return get_index(conn, entity).search(text, scope=scope, limit=limit)
+
+
+def search_picker(conn, entity, label, key, scope=None):
+    """Search box plus a dropdown of the top matches; returns (id, name) or None."""
+    text = st.text_input(label, key=f"{key}_query", placeholder=f"Type to search {ENTITIES[entity]['noun']}…")
+    hits = search(conn, entity, text, scope=scope)
+    if not hits:
+        return None
+    names = {hit_id: (name, detail) for hit_id, name, detail in hits}
+    picked = st.selectbox(
+        label, list(names), key=f"{key}_pick", label_visibility="collapsed",
+        format_func=lambda i: f"{names[i][0]} · {names[i][1]} (ID {i})" if names[i][1] else f"{names[i][0]} (ID {i})",
+    )
+    return picked, names[picked][0]
@@ -0,0 +1,341 @@
+# CareerSphere/seasons.py
+# Placement seasons: the hot tables hold only the open season, closed ones are
+# archived.
+#
+# Closing a season first brings the audit_logs consumers (funnel rollups,
+# notifications) up to date. It then records the season's last job id and last
+# consumed audit_logs id and opens the next season, all in one short
+# transaction. A background worker per campus moves the rows up to those ids
+# into archived_applications, archived_jobs and archived_audit_logs: first the
+# applications, then the jobs (with any late applications), then the audit rows.
+# Each transaction moves at most SEASON_CHUNK_SIZE rows by primary key, and the
+# worker pauses between chunks as job_purge.py does. The history views read only
+# the archive tables, and feeds and applicant queries only ever see the current
+# season.
+#
+#   CLI:  python seasons.py [campus]   (finish archiving closed seasons now)
+
+import threading
+import time
+from collections import defaultdict
+
+import streamlit as st
+from database import DEFAULT_TENANT, execute_query, open_background_connection, run_in_transaction
+
+# Rows moved per transaction (jobs: SEASON_JOB_CHUNK_SIZE, each with its late applications)
+SEASON_CHUNK_SIZE = 1000
+SEASON_JOB_CHUNK_SIZE = 100
+# Minimum seconds between two chunks (the pause is never shorter than the chunk itself)
+SEASON_PAUSE = 0.05
+# Seconds between checks without a wake-up (seasons closed by other processes)
+SEASON_INTERVAL = 300
+# Seconds between refreshes of the archiving progress
+SEASON_PROGRESS_POLL = 2
+
+# hot table -> (archive table, columns copied besides season_id)
+ARCHIVES = {
+    'applications': ('archived_applications', ('id', 'job_id', 'student_id', 'status', 'applied_at', 'updated_at')),
+    'jobs': ('archived_jobs', ('id', 'recruiter_id', 'company_id', 'title', 'location', 'eligibility', 'description', 'created_at')),
+    'audit_logs': ('archived_audit_logs', ('id', 'created_at', 'action', 'entity', 'entity_id', 'user_email')),
+}
+
+
+# --- CLOSING ---
+def close_season(conn, db_type, season_id, next_name):
+    """Closes open season `season_id` and opens one named `next_name`; returns True if it did.
+
+    `season_id` is the season the admin was shown, so a repeated submit returns
+    False instead of closing the season it just opened. Raises ValueError while
+    an earlier season is still being archived. The rows themselves are archived
+    in the background (see archive_pending).
+    """
+    from funnel_rollups import refresh_funnel
+    from notifications import fan_out
+
+    next_name = next_name.strip()
+    if not next_name:
+        raise ValueError("The new season needs a name.")
+    # Audit rows are archived only once both consumers are past them
+    refresh_funnel(conn, db_type)
+    fan_out(conn, db_type)
+
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def close(cursor):
+        # fetchall() throughout: MySQL's unbuffered cursors refuse a new execute with rows left unread
+        cursor.execute(f"SELECT COUNT(*) FROM seasons WHERE id = {ph} AND closing_at IS NULL", (season_id,))
+        if not cursor.fetchall()[0][0]:
+            return False # Already closed (e.g. a repeated submit)
+        cursor.execute("SELECT COUNT(*) FROM seasons WHERE closing_at IS NOT NULL AND closed_at IS NULL")
+        if cursor.fetchall()[0][0]:
+            raise ValueError("The previous season is still being archived. Try again once it has finished.")
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM jobs")
+        job_cutoff = int(cursor.fetchall()[0][0])
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM audit_logs")
+        audit_cutoff = int(cursor.fetchall()[0][0])
+        cursor.execute("SELECT MIN(last_id) FROM rollup_state")
+        consumed = cursor.fetchall()[0][0]
+        if consumed is not None:
+            audit_cutoff = min(audit_cutoff, int(consumed))
+
+        cursor.execute(f"""
+        UPDATE seasons SET closing_at = CURRENT_TIMESTAMP, job_cutoff = {ph}, audit_cutoff = {ph}
+        WHERE id = {ph} AND closing_at IS NULL
+        """, (job_cutoff, audit_cutoff, season_id))
+        if cursor.rowcount != 1:
+            return False # Closed by a concurrent request
+        cursor.execute(f"INSERT INTO seasons (name) VALUES ({ph})", (next_name,))
+        return True
+
+    closed = run_in_transaction(conn, close)
+    if closed:
+        tenant_id = getattr(conn, 'tenant_id', DEFAULT_TENANT)
+        start_archive_worker(tenant_id)
+        _wakeups[tenant_id].set()
+    return closed
+
+
+# --- ARCHIVING ---
+def _move(cursor, db_type, ph, table, season_id, ids):
+    """Copies rows `ids` of `table` into its archive table and deletes them; returns how many moved."""
+    archive, columns = ARCHIVES[table]
+    cols = ", ".join(columns)
+    marks = ", ".join([ph] * len(ids))
+    insert = "INSERT IGNORE INTO" if db_type == 'mysql' else "INSERT OR IGNORE INTO"
+    cursor.execute(f"{insert} {archive} (season_id, {cols}) SELECT {ph}, {cols} FROM {table} WHERE id IN ({marks})",
+                   (season_id, *ids))
+    cursor.execute(f"DELETE FROM {table} WHERE id IN ({marks})", ids)
+    return cursor.rowcount
+
+
+def _move_applications(cursor, db_type, ph, season_id, ids):
+    # Interview bookings are not archived; they only matter while the season runs
+    cursor.execute(f"DELETE FROM interview_assignments WHERE application_id IN ({', '.join([ph] * len(ids))})", ids)
+    return _move(cursor, db_type, ph, 'applications', season_id, ids)
+
+
+def _archive_chunk(conn, db_type, season_id, job_cutoff, audit_cutoff):
+    """Moves the next chunk of a closing season; returns how many rows, or None once the season is archived."""
+    ph = '%s' if db_type == 'mysql' else '?'
+
+    def archive(cursor):
+        # 1. Applications of the season's jobs (jobs being deleted are left to job_purge.py)
+        cursor.execute(f"""
+        SELECT id FROM applications
+        WHERE job_id <= {ph} AND job_id NOT IN (SELECT id FROM jobs WHERE id <= {ph} AND deleted_at IS NOT NULL)
+        LIMIT {SEASON_CHUNK_SIZE}
+        """, (job_cutoff, job_cutoff))
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            moved = _move_applications(cursor, db_type, ph, season_id, ids)
+            cursor.execute(f"UPDATE seasons SET applications = applications + {ph} WHERE id = {ph}", (moved, season_id))
+            return moved
+
+        # 2. The jobs, each with applications that arrived after step 1 and its interview slots
+        cursor.execute(f"SELECT id FROM jobs WHERE id <= {ph} AND deleted_at IS NULL LIMIT {SEASON_JOB_CHUNK_SIZE}", (job_cutoff,))
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            marks = ", ".join([ph] * len(ids))
+            cursor.execute(f"SELECT id FROM applications WHERE job_id IN ({marks})", ids)
+            late = [row[0] for row in cursor.fetchall()]
+            late_moved = _move_applications(cursor, db_type, ph, season_id, late) if late else 0
+            cursor.execute(f"DELETE FROM interview_slots WHERE job_id IN ({marks})", ids)
+            moved = _move(cursor, db_type, ph, 'jobs', season_id, ids)
+            cursor.execute(f"UPDATE seasons SET jobs = jobs + {ph}, applications = applications + {ph} WHERE id = {ph}",
+                           (moved, late_moved, season_id))
+            return moved + late_moved
+
+        # 3. The audit rows logged up to the close
+        cursor.execute(f"SELECT id FROM audit_logs WHERE id <= {ph} ORDER BY id LIMIT {SEASON_CHUNK_SIZE}", (audit_cutoff,))
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            moved = _move(cursor, db_type, ph, 'audit_logs', season_id, ids)
+            cursor.execute(f"UPDATE seasons SET audit_rows = audit_rows + {ph} WHERE id = {ph}", (moved, season_id))
+            return moved
+
+        cursor.execute(f"UPDATE seasons SET closed_at = CURRENT_TIMESTAMP WHERE id = {ph}", (season_id,))
+        return None
+
+    return run_in_transaction(conn, archive)
+
+
+def archive_season(conn, db_type, season_id, job_cutoff, audit_cutoff, pause=SEASON_PAUSE):
+    """Archives a closing season chunk by chunk; returns how many rows it moved."""
+    total = 0
+    while True:
+        started = time.monotonic()
+        moved = _archive_chunk(conn, db_type, season_id, job_cutoff, audit_cutoff)
+        if moved is None:
+            return total
+        total += moved
+        time.sleep(max(pause, time.monotonic() - started))
+
+
+def archive_pending(conn, db_type):
+    """Finishes archiving every closed season of the campus; returns how many rows were moved."""
+    query = "SELECT id, job_cutoff, audit_cutoff FROM seasons WHERE closing_at IS NOT NULL AND closed_at IS NULL ORDER BY id"
+    pending = execute_query(conn, query, fetch=True) or []
+    return sum(archive_season(conn, db_type, s['id'], s['job_cutoff'], s['audit_cutoff']) for s in pending)
+
+
+# --- WORKER ---
+# tenant_id -> set when this process closes a season
+_wakeups = defaultdict(threading.Event)
+_worker_lock = threading.Lock()
+_workers = {}
+
+
+def _run_worker(tenant_id):
+    wake = _wakeups[tenant_id]
+    while True:
+        wake.clear()
+        try:
+            conn, db_type = open_background_connection(tenant_id)
+            try:
+                archive_pending(conn, db_type)
+            finally:
+                conn.close()
+        except Exception:
+            pass # e.g. database briefly unavailable; the next round resumes where this one stopped
+        wake.wait(SEASON_INTERVAL)
+
+
+def start_archive_worker(tenant_id=DEFAULT_TENANT):
+    """Starts the campus's background archiving thread once per process."""
+    with _worker_lock:
+        thread = _workers.get(tenant_id)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_run_worker, args=(tenant_id,), name=f"season-archive:{tenant_id}", daemon=True)
+            thread.start()
+            _workers[tenant_id] = thread
+
+
+# --- READS ---
+def list_seasons(conn):
+    """Every season, newest first."""
+    query = """
+    SELECT id, name, started_at, closing_at, closed_at, jobs, applications, audit_rows
+    FROM seasons ORDER BY id DESC
+    """
+    return execute_query(conn, query, fetch=True) or []
+
+
+def season_companies(conn, season_id):
+    """Per-company jobs, applications and outcomes of an archived season."""
+    query = """
+    SELECT COALESCE(c.name, 'Unknown company') AS company, COUNT(DISTINCT j.id) AS jobs,
+           COUNT(a.id) AS applications, COALESCE(SUM(a.status = 'shortlisted'), 0) AS shortlisted,
+           COALESCE(SUM(a.status = 'accepted'), 0) AS accepted
+    FROM archived_jobs j
+    LEFT JOIN archived_applications a ON a.season_id = j.season_id AND a.job_id = j.id
+    LEFT JOIN companies c ON c.id = j.company_id
+    WHERE j.season_id = %s
+    GROUP BY c.name
+    ORDER BY applications DESC
+    """
+    return execute_query(conn, query, (season_id,), fetch=True) or []
+
+
+def season_jobs(conn, season_id):
+    """An archived season's jobs with their application counts."""
+    query = """
+    SELECT j.id, j.title, COALESCE(c.name, 'Unknown company') AS company, j.location, j.created_at,
+           COUNT(a.id) AS applications, COALESCE(SUM(a.status = 'accepted'), 0) AS accepted
+    FROM archived_jobs j
+    LEFT JOIN archived_applications a ON a.season_id = j.season_id AND a.job_id = j.id
+    LEFT JOIN companies c ON c.id = j.company_id
+    WHERE j.season_id = %s
+    GROUP BY j.id, j.title, c.name, j.location, j.created_at
+    ORDER BY j.created_at DESC
+    """
+    return execute_query(conn, query, (season_id,), fetch=True) or []
+
+
+def student_history(conn, student_id):
+    """A student's applications from closed seasons, newest first."""
+    query = """
+    SELECT s.name AS season, j.title AS job_title, c.name AS company, a.status, a.applied_at
+    FROM archived_applications a
+    JOIN seasons s ON s.id = a.season_id
+    LEFT JOIN archived_jobs j ON j.id = a.job_id
+    LEFT JOIN companies c ON c.id = j.company_id
+    WHERE a.student_id = %s
+    ORDER BY a.applied_at DESC
+    """
+    return execute_query(conn, query, (student_id,), fetch=True) or []
+
+
+# --- WIDGETS ---
+def season_admin_widget(conn, db_type):
+    """Current season, archiving progress of closed ones, and the form that closes the season."""
+    seasons = list_seasons(conn)
+    current = next((s for s in seasons if s['closing_at'] is None), None)
+    if current is None:
+        return
+    st.caption(f"Current season: **{current['name']}**, started {current['started_at']}.")
+    if any(s['closing_at'] is not None and s['closed_at'] is None for s in seasons):
+        _live_archive_progress(conn)
+        return # The next close waits until this archiving has finished
+
+    with st.form("close_season_form"):
+        next_name = st.text_input("Name of the next season", placeholder="e.g. 2026-27")
+        confirm = st.checkbox(f"Move every job and application of {current['name']} to the archive")
+        if st.form_submit_button("Close Season", type="primary"):
+            if not confirm:
+                st.warning("Tick the confirmation box to close the season.")
+            else:
+                try:
+                    closed = close_season(conn, db_type, current['id'], next_name)
+                except Exception as e:
+                    st.error(f"Could not close the season: {e}")
+                else:
+                    if not closed:
+                        st.info(f"{current['name']} has already been closed.")
+                    else:
+                        st.rerun()
+
+
+@st.fragment(run_every=SEASON_PROGRESS_POLL)
+def _live_archive_progress(conn):
+    closing = [s for s in list_seasons(conn) if s['closing_at'] is not None and s['closed_at'] is None]
+    for s in closing:
+        st.info(f"📦 Archiving **{s['name']}**: {s['jobs']:,} jobs, {s['applications']:,} applications "
+                f"and {s['audit_rows']:,} audit rows moved so far.")
+    if not closing:
+        st.rerun() # Done: redraw the page once and stop polling
+
+
+def season_history_widget(conn):
+    """Closed seasons: per-company outcomes and the job list, read from the archive tables."""
+    import pandas as pd # Lazy import
+    closed = [s for s in list_seasons(conn) if s['closed_at'] is not None]
+    if not closed:
+        st.info("No closed seasons yet. Close the current season from the Admin Dashboard to archive it.")
+        return
+    names = {s['id']: s for s in closed}
+    season_id = st.selectbox("Season", list(names), format_func=lambda i: names[i]['name'], key="history_season")
+    season = names[season_id]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Jobs", f"{season['jobs']:,}")
+    col2.metric("Applications", f"{season['applications']:,}")
+    col3.metric("Audit Rows", f"{season['audit_rows']:,}")
+    st.caption(f"{season['started_at']} to {season['closing_at']}")
+
+    companies = season_companies(conn, season_id)
+    if companies:
+        st.dataframe(pd.DataFrame(companies), use_container_width=True, hide_index=True)
+    with st.expander("Jobs of this season"):
+        jobs = season_jobs(conn, season_id)
+        if jobs:
+            st.dataframe(pd.DataFrame(jobs), use_container_width=True, hide_index=True)
+
+
+if __name__ == '__main__':
+    import sys
+
+    tenant = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TENANT
+    db_conn, backend = open_background_connection(tenant)
+    try:
+        print(f"Archived {archive_pending(db_conn, backend)} rows of closed seasons for '{tenant}' ({backend}).")
+    finally:
+        db_conn.close()
@@ -0,0 +1,101 @@
+# CareerSphere/startup_profile.py
+# Startup timing report: how much of a cold start goes to imports vs. init steps.
+#
+#   In-app:  app.py wraps its init steps in timed(); the admin dashboard shows the report.
+#   CLI:     python startup_profile.py   (fresh interpreter, per-module import cost)
+
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules whose import cost matters for the first request after a deploy
+PROFILED_MODULES = [
+    'streamlit', 'sqlite3', 'mysql.connector', 'pandas', 'matplotlib.pyplot', 'pyarrow',
+    'database', 'profile_cache', 'exports',
+]
+
+_PROCESS_START = time.perf_counter()
+
+# label -> {'first': seconds of the cold run, 'calls': n, 'total': seconds}
+_timings = {}
+
+
+@contextmanager
+def timed(label):
+    """Times a block and records it under `label` (the first call is the cold-start cost)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        entry = _timings.setdefault(label, {'first': elapsed, 'calls': 0, 'total': 0.0})
+        entry['calls'] += 1
+        entry['total'] += elapsed
+
+
+def init_report():
+    """Returns the in-process init timings as rows for st.dataframe."""
+    rows = []
+    for label, entry in _timings.items():
+        rows.append({
+            'step': label,
+            'cold_ms': round(entry['first'] * 1000, 2),
+            'warm_avg_ms': round((entry['total'] - entry['first']) / (entry['calls'] - 1) * 1000, 2) if entry['calls'] > 1 else None,
+            'calls': entry['calls'],
+        })
+    return sorted(rows, key=lambda r: r['cold_ms'], reverse=True)
+
+
+def process_uptime():
+    """Seconds since this module (and therefore the app process) was first imported."""
+    return time.perf_counter() - _PROCESS_START
+
+
+def import_report(modules=None):
+    """Measures import cost per module in a fresh interpreter using `python -X importtime`.
+
+    Each module is imported in order, so shared dependencies are charged to the first
+    module that pulls them in. Modules that fail to import are reported as missing.
+    """
+    modules = modules or PROFILED_MODULES
+    # __import__ (not importlib.import_module) so that -X importtime logs the top-level entry
+    code = (
+        "import sys\n"
+        "for name in sys.argv[1:]:\n"
+        "    try:\n"
+        "        __import__(name)\n"
+        "    except Exception:\n"
+        "        print('MISSING ' + name)\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code, *modules],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+    missing = {line.split(' ', 1)[1] for line in proc.stdout.splitlines() if line.startswith('MISSING ')}
+
+    # importtime lines: "import time: self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|').split('|')]
+        cumulative[name] = int(cumulative_us)
+
+    rows = []
+    for name in modules:
+        rows.append({
+            'module': name,
+            'import_ms': None if name in missing else round(cumulative.get(name, 0) / 1000, 1),
+            'status': 'missing' if name in missing else ('already loaded' if name not in cumulative else 'ok'),
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    print(f"{'module':<22}{'import ms':>12}  status")
+    for row in import_report():
+        ms = '-' if row['import_ms'] is None else f"{row['import_ms']:.1f}"
+        print(f"{row['module']:<22}{ms:>12}  {row['status']}")
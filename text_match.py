@@ -0,0 +1,194 @@
+# CareerSphere/text_match.py
+# TF-IDF text similarity between job postings and applicant profiles.
+#
+# A job's document is its title, eligibility and description; a student's is their
+# skills plus the free-text profile sections (projects, internships, hackathons,
+# certificates). Each campus keeps one TextIndex per process with the term counts
+# of every document and the document frequency of every term. A refresh re-reads
+# only the jobs / profiles past the updated_at watermarks (see
+# database.WATERMARKED_TABLES) and swaps just those documents' counts, so IDF
+# weights stay current without re-tokenizing the corpus.
+#
+# Vectors are kept CSR-style in numpy arrays (term ids + log term frequencies);
+# scoring builds the applicants' TF-IDF matrix and takes one sparse
+# matrix-vector product with the job's normalized vector (cosine similarity).
+
+import re
+import threading
+import time
+from collections import Counter
+
+from database import DEFAULT_TENANT, iter_query, tenant_cache, watermark_cutoff
+
+# Seconds between watermark checks (scoring in between uses the index as it is)
+TEXT_INDEX_REFRESH = 5
+# The index is rebuilt from scratch this often anyway (drops deleted jobs/students)
+TEXT_INDEX_RESYNC = 3600
+TEXT_INDEX_BATCH_SIZE = 1000
+
+# Single letters are kept only when they are a language name (c, r)
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or our the their this to we with will you your
+who using used use able work working etc per any all can must should also into across well strong good
+""".split())
+
+# source -> document query; {since} is filled with the incremental condition
+SOURCES = {
+    'job': {
+        'query': "SELECT id, title, eligibility, description, updated_at FROM jobs {since}",
+        'since': "WHERE updated_at >= {cutoff}",
+        'text': ('title', 'eligibility', 'description'),
+    },
+    'student': {
+        'query': """
+        SELECT s.id, s.skills, d.projects, d.internships, d.hackathons, d.certificates,
+               s.updated_at, d.updated_at AS details_updated_at
+        FROM students s
+        LEFT JOIN student_details d ON d.student_id = s.id
+        {since}
+        """,
+        'since': """
+        WHERE s.id IN (SELECT id FROM students WHERE updated_at >= {cutoff}
+                       UNION SELECT student_id FROM student_details WHERE updated_at >= {cutoff})
+        """,
+        'text': ('skills', 'projects', 'internships', 'hackathons', 'certificates'),
+    },
+}
+
+
+def tokenize(text):
+    """Lower-cased terms of a document (keeps c++, c#, node.js intact)."""
+    return [t for t in _TOKEN_RE.findall((text or '').lower())
+            if t not in STOP_WORDS and (len(t) > 1 or t in ('c', 'r'))]
+
+
+class TextIndex:
+    """One campus's term statistics and per-document sparse term-frequency vectors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        self.vocab = {}             # term -> id
+        self.df = []                # term id -> documents containing it
+        self.docs = {}              # (source, id) -> (term ids, 1 + log(tf)) numpy arrays
+        self.watermarks = {source: None for source in SOURCES}
+        self.synced_at = time.monotonic()
+
+    # --- documents ---
+    def _term_ids(self, terms):
+        ids = []
+        for term in terms:
+            if term not in self.vocab:
+                self.vocab[term] = len(self.df)
+                self.df.append(0)
+            ids.append(self.vocab[term])
+        return ids
+
+    def upsert(self, source, doc_id, text):
+        """Replaces a document's vector, adjusting document frequencies by the difference."""
+        import numpy as np # Lazy import
+        self.remove(source, doc_id)
+        counts = Counter(self._term_ids(tokenize(text)))
+        if not counts:
+            return
+        term_ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        for term_id in counts:
+            self.df[term_id] += 1
+        self.docs[(source, doc_id)] = (term_ids, tf)
+
+    def remove(self, source, doc_id):
+        old = self.docs.pop((source, doc_id), None)
+        if old is not None:
+            for term_id in old[0]:
+                self.df[term_id] -= 1
+
+    # --- refresh ---
+    def refresh(self, conn, db_type, force=False):
+        """Applies the jobs / profiles changed since the last refresh; returns how many."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self.checked_at < TEXT_INDEX_REFRESH:
+                return 0
+            if now - self.synced_at > TEXT_INDEX_RESYNC:
+                self._reset()
+            changed = sum(self._refresh_source(conn, db_type, source) for source in SOURCES)
+            self.checked_at = time.monotonic()
+            return changed
+
+    def _refresh_source(self, conn, db_type, source):
+        spec = SOURCES[source]
+        watermark = self.watermarks[source]
+        if watermark is None:
+            query, params = spec['query'].format(since=''), ()
+        else:
+            condition = spec['since']
+            params = (watermark,) * condition.count('{cutoff}')
+            query = spec['query'].format(since=condition.format(cutoff=watermark_cutoff(db_type)))
+
+        changed = 0
+        for batch in iter_query(conn, query, params, batch_size=TEXT_INDEX_BATCH_SIZE):
+            for row in batch:
+                self.upsert(source, row['id'], " ".join(row[col] or '' for col in spec['text']))
+                stamps = [row['updated_at'], row.get('details_updated_at')]
+                latest = max(stamp for stamp in stamps if stamp is not None)
+                watermark = latest if watermark is None else max(watermark, latest)
+                changed += 1
+        self.watermarks[source] = watermark
+        return changed
+
+    # --- scoring ---
+    def _idf(self):
+        import numpy as np # Lazy import
+        df = np.asarray(self.df, dtype=np.float32)
+        return np.log((1.0 + len(self.docs)) / (1.0 + df)) + 1.0 # Smoothed: never zero or negative
+
+    def similarity(self, job_id, student_ids):
+        """Cosine similarity (0-1) of each student's profile to the job, in `student_ids` order."""
+        import numpy as np # Lazy import
+        with self._lock:
+            scores = np.zeros(len(student_ids), dtype=np.float32)
+            job = self.docs.get(('job', job_id))
+            if job is None or not len(student_ids):
+                return scores
+            idf = self._idf()
+
+            # The job as a dense, unit-length query vector
+            query = np.zeros(len(idf), dtype=np.float32)
+            query[job[0]] = job[1] * idf[job[0]]
+            query /= np.linalg.norm(query)
+
+            # Applicants as a CSR matrix: row i holds student_ids[i]'s TF-IDF weights
+            rows = [self.docs.get(('student', sid)) for sid in student_ids]
+            lengths = np.array([len(r[0]) if r else 0 for r in rows], dtype=np.int64)
+            if not lengths.sum():
+                return scores
+            indices = np.concatenate([r[0] for r in rows if r])
+            data = np.concatenate([r[1] for r in rows if r]) * idf[indices]
+            row_of = np.repeat(np.arange(len(rows)), lengths)
+
+            # Sparse matrix-vector product, then divide by the row norms
+            dots = np.bincount(row_of, weights=data * query[indices], minlength=len(rows))
+            norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=len(rows)))
+            np.divide(dots, norms, out=scores, where=norms > 0, casting='unsafe')
+            return scores
+
+    def __len__(self):
+        return len(self.docs)
+
+
+def get_text_index(conn):
+    """The process-level TextIndex of the connection's campus."""
+    cache = tenant_cache(getattr(conn, 'tenant_id', DEFAULT_TENANT), 'text_match')
+    return cache.setdefault('index', TextIndex())
+
+
+def text_match_scores(conn, db_type, job_id, student_ids):
+    """Refreshes the campus index if due and scores the students against the job (0-100)."""
+    index = get_text_index(conn)
+    index.refresh(conn, db_type)
+    return [round(float(score) * 100, 1) for score in index.similarity(job_id, list(student_ids))]
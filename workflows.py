@@ -0,0 +1,95 @@
+# CareerSphere/workflows.py
+# Hot multi-statement workflows (register, apply, post job) as ONE round trip:
+# a stored procedure on MySQL (see DDL_DML.sql), a single transaction on SQLite.
+
+from database import call_procedure, run_in_transaction
+
+REGISTRATION_PROCS = {
+    'student': ('register_student_proc', ('roll_no', 'full_name', 'branch')),
+    'recruiter': ('register_recruiter_proc', ('company_name',)),
+    'admin': ('register_admin_proc', ('department',)),
+}
+
+
+def register_account(conn, db_type, email, password, role, profile_data):
+    """Creates the users row and the role-specific row atomically; returns the new user id.
+
+    Database errors (e.g. a duplicate email) propagate unchanged so the caller can
+    report them; nothing is left behind when they happen.
+    """
+    if role not in REGISTRATION_PROCS:
+        raise ValueError(f"Unsupported role '{role}'.")
+    proc_name, profile_fields = REGISTRATION_PROCS[role]
+    profile_values = tuple(profile_data[field] for field in profile_fields)
+
+    if db_type == 'mysql':
+        result_sets = call_procedure(conn, proc_name, (email, password, *profile_values), commit=True)
+        return result_sets[-1][0]['user_id']
+
+    def register(cursor):
+        cursor.execute("INSERT INTO users (email, password, role) VALUES (?, ?, ?)", (email, password, role))
+        user_id = cursor.lastrowid
+        if role == 'student':
+            cursor.execute("INSERT INTO students (id, roll_no, full_name, branch) VALUES (?, ?, ?, ?)", (user_id, *profile_values))
+        elif role == 'recruiter':
+            cursor.execute("INSERT INTO recruiters (id, company_id) VALUES (?, ?)", (user_id, _resolve_company(cursor, *profile_values)))
+        else:
+            cursor.execute("INSERT INTO admins (id, department) VALUES (?, ?)", (user_id, *profile_values))
+        return user_id
+
+    return run_in_transaction(conn, register)
+
+
+def _resolve_company(cursor, company_name):
+    """Returns the id of the company named `company_name` (case/space-insensitive), creating it if new."""
+    company_name = company_name.strip()
+    cursor.execute("SELECT id FROM companies WHERE name = ? COLLATE NOCASE ORDER BY id LIMIT 1", (company_name,))
+    row = cursor.fetchone()
+    if row is not None:
+        return row[0]
+    cursor.execute("INSERT INTO companies (name) VALUES (?)", (company_name,))
+    return cursor.lastrowid
+
+
+def apply_to_job(conn, db_type, job_id, student_id):
+    """Submits an application unless one already exists (or the job is being deleted); returns True if a row was inserted."""
+    if db_type == 'mysql':
+        try:
+            result_sets = call_procedure(conn, 'apply_job_proc', (job_id, student_id), commit=True)
+        except Exception as e:
+            # Two concurrent submits: the UNIQUE key rejects the second one
+            if 'duplicate entry' in str(e).lower():
+                return False
+            raise
+        return bool(result_sets[-1][0]['applied'])
+
+    def apply(cursor):
+        cursor.execute("""
+        INSERT INTO applications (job_id, student_id)
+        SELECT ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM applications WHERE job_id = ? AND student_id = ?)
+          AND EXISTS (SELECT 1 FROM jobs WHERE id = ? AND deleted_at IS NULL)
+        """, (job_id, student_id, job_id, student_id, job_id))
+        return cursor.rowcount == 1
+
+    return run_in_transaction(conn, apply)
+
+
+def post_job(conn, db_type, recruiter_id, title, location, eligibility, description):
+    """Inserts the job under the recruiter's company (fixed at registration); returns the new job id."""
+    if db_type == 'mysql':
+        result_sets = call_procedure(conn, 'post_job_proc', (recruiter_id, title, location, eligibility, description), commit=True)
+        return result_sets[-1][0]['job_id']
+
+    def post(cursor):
+        cursor.execute("""
+        INSERT INTO jobs (recruiter_id, company_id, title, location, eligibility, description)
+        SELECT id, company_id, ?, ?, ?, ?
+        FROM recruiters
+        WHERE id = ? AND company_id IS NOT NULL
+        """, (title, location, eligibility, description, recruiter_id))
+        if cursor.rowcount != 1:
+            raise ValueError("Recruiter profile incomplete. Cannot post jobs.")
+        return cursor.lastrowid
+
+    return run_in_transaction(conn, post)
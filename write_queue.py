@@ -0,0 +1,200 @@
+# CareerSphere/write_queue.py
+# Single-writer queue for SQLite.
+#
+# SQLite allows one writer at a time; with many sessions committing through their
+# own connections at once (e.g. the minutes before an application deadline) the
+# losers get "database is locked". Instead, every write is queued to ONE writer
+# thread per database file, which applies queued writes in group commits and
+# acknowledges each caller only after the COMMIT that contains its write returned.
+#
+#   Benchmark:  python write_queue.py  (simulated surge, direct commits vs. writer)
+
+import queue
+import sqlite3
+import threading
+import time
+
+# Max writes waiting for the writer; further submits are rejected immediately
+WRITE_QUEUE_MAX = 1000
+# Max writes folded into one COMMIT
+GROUP_COMMIT_MAX = 64
+# How long the writer waits for more writes to join a group (seconds)
+GROUP_COMMIT_WINDOW = 0.002
+# How long a caller waits for its acknowledgement (seconds)
+WRITE_ACK_TIMEOUT = 30
+
+
+class WriteQueueFull(Exception):
+    """Raised when the write queue is at capacity; the caller should retry shortly."""
+
+
+class _WriteTicket:
+    """One queued write: a function run with the writer's cursor, plus its outcome."""
+
+    __slots__ = ('fn', 'done', 'result', 'error')
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=WRITE_ACK_TIMEOUT):
+        if not self.done.wait(timeout):
+            raise TimeoutError("Write was not acknowledged in time (writer overloaded).")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SQLiteWriter:
+    """Owns the only writing connection to one SQLite file."""
+
+    def __init__(self, path, max_queue=WRITE_QUEUE_MAX):
+        self.path = path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=f"sqlite-writer:{path}", daemon=True)
+        self.commits = 0
+        self.writes = 0
+        self.rejected = 0
+        self._thread.start()
+
+    def submit(self, fn):
+        """Queues fn(cursor) and returns a ticket; raises WriteQueueFull if the queue is full."""
+        ticket = _WriteTicket(fn)
+        try:
+            self._queue.put_nowait(ticket)
+        except queue.Full:
+            self.rejected += 1
+            raise WriteQueueFull("The system is busy processing other submissions. Please retry in a few seconds.")
+        return ticket
+
+    def execute(self, fn, timeout=WRITE_ACK_TIMEOUT):
+        """Queues fn(cursor) and blocks until the commit containing it is durable."""
+        return self.submit(fn).wait(timeout)
+
+    def stats(self):
+        return {'queued': self._queue.qsize(), 'commits': self.commits, 'writes': self.writes, 'rejected': self.rejected}
+
+    def _run(self):
+        # isolation_level=None: transactions are controlled explicitly below
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")   # Readers never block the writer (and vice versa)
+        conn.execute("PRAGMA synchronous=FULL")   # A returned COMMIT is on disk
+        conn.execute("PRAGMA busy_timeout=5000")  # Tolerate schema scripts / other processes
+        cursor = conn.cursor()
+
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + GROUP_COMMIT_WINDOW
+            while len(batch) < GROUP_COMMIT_MAX:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit_group(conn, cursor, batch)
+
+    def _commit_group(self, conn, cursor, batch):
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for ticket in batch:
+                # Each write gets its own savepoint so one failure doesn't sink the group
+                cursor.execute("SAVEPOINT write_item")
+                try:
+                    ticket.result = ticket.fn(cursor)
+                    cursor.execute("RELEASE write_item")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write_item")
+                    cursor.execute("RELEASE write_item")
+                    ticket.error = e
+            cursor.execute("COMMIT")
+            self.commits += 1
+            self.writes += sum(1 for t in batch if t.error is None)
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for ticket in batch:
+                if ticket.error is None:
+                    ticket.error = e
+        finally:
+            # Acknowledge only now: every successful write above is committed
+            for ticket in batch:
+                ticket.done.set()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_sqlite_writer(path):
+    """Returns the process-wide writer for a SQLite file, starting it on first use."""
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = SQLiteWriter(path)
+        return _writers[path]
+
+
+# --- SURGE BENCHMARK ---
+def _bench(path, sessions, writes_per_session, use_writer):
+    import os
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    setup = sqlite3.connect(path)
+    setup.execute("CREATE TABLE applications (id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER, student_id INTEGER, status TEXT DEFAULT 'applied')")
+    setup.commit()
+    setup.close()
+
+    errors = []
+    writer = SQLiteWriter(path, max_queue=sessions * writes_per_session) if use_writer else None
+
+    def session(student_id):
+        # Each simulated session has its own connection, like each Streamlit session does
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=1)
+        for job_id in range(writes_per_session):
+            params = (job_id, student_id)
+            try:
+                if writer is not None:
+                    writer.execute(lambda cur, p=params: cur.execute("INSERT INTO applications (job_id, student_id) VALUES (?, ?)", p))
+                else:
+                    conn.execute("INSERT INTO applications (job_id, student_id) VALUES (?, ?)", params)
+                    conn.commit()
+            except Exception as e:
+                errors.append(str(e))
+                if conn.in_transaction:
+                    conn.rollback()
+        conn.close()
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    check = sqlite3.connect(path)
+    rows = check.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+    check.close()
+    commits = writer.commits if writer is not None else rows
+    return {'rows': rows, 'errors': len(errors), 'seconds': elapsed,
+            'rows_per_s': rows / elapsed, 'commits_per_s': commits / elapsed,
+            'sample_error': errors[0] if errors else ''}
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import tempfile
+
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    path = os.path.join(tempfile.gettempdir(), 'cs_write_bench.db')
+
+    print(f"Simulated surge: {sessions} concurrent sessions x {writes} applications each")
+    for label, use_writer in (("direct commits", False), ("single writer", True)):
+        r = _bench(path, sessions, writes, use_writer)
+        print(f"  {label:<15} rows={r['rows']:<6} errors={r['errors']:<5} {r['seconds']:.2f}s  "
+              f"rows/s={r['rows_per_s']:.0f}  commits/s={r['commits_per_s']:.0f}  {r['sample_error']}")